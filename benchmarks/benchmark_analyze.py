@@ -0,0 +1,71 @@
+# Benchmarks of the analyze functions over synthetic plot grids
+import numpy as np
+import matplotlib
+import plantcv.geospatial as gcv
+from matplotlib import pyplot as plt
+from plantcv.plantcv import outputs, params
+from benchmarks.synthetic import synthetic_geotif, synthetic_plot_grid, data_path
+
+SIZE = 2048
+
+
+class Analyze:
+    """Analyze a synthetic orthomosaic and DSM with different numbers of plots."""
+
+    params = [100, 1000]
+    param_names = ["n_plots"]
+    timeout = 300
+
+    def setup_cache(self):
+        files = {"rgb": synthetic_geotif(data_path("rgb.tif"), width=SIZE, height=SIZE, bands=3),
+                 "multispectral": synthetic_geotif(data_path("multispectral.tif"), width=SIZE, height=SIZE,
+                                                   bands=5, dtype="uint16", seed=1),
+                 "dsm": synthetic_geotif(data_path("dsm.tif"), width=SIZE, height=SIZE, bands=1,
+                                         dtype="float32", seed=2)}
+        for n_plots in self.params:
+            files[n_plots] = synthetic_plot_grid(data_path(f"plots_{n_plots}.geojson"), n_plots=n_plots,
+                                                 width=SIZE, height=SIZE)
+        return files
+
+    def setup(self, files, n_plots):
+        matplotlib.use("Agg")
+        params.debug = None
+        outputs.clear()
+        self.rgb = gcv.read.geotif(filename=files["rgb"], bands="R,G,B")
+        self.multispectral = gcv.read.geotif(filename=files["multispectral"], bands="B,G,R,RE,N")
+        self.dsm = gcv.read.geotif(filename=files["dsm"], bands="gray")
+        self.mask = (np.asarray(self.rgb)[:, :, 1] > 100).astype(np.uint8) * 255
+        self.geojson = files[n_plots]
+
+    def teardown(self, files, n_plots):
+        plt.close("all")
+
+    def time_coverage(self, files, n_plots):
+        gcv.analyze.coverage(img=self.rgb, bin_mask=self.mask, geojson=self.geojson)
+
+    def peakmem_coverage(self, files, n_plots):
+        gcv.analyze.coverage(img=self.rgb, bin_mask=self.mask, geojson=self.geojson)
+
+    def time_color(self, files, n_plots):
+        gcv.analyze.color(img=self.rgb, bin_mask=self.mask, geojson=self.geojson, colorspaces="all")
+
+    def peakmem_color(self, files, n_plots):
+        gcv.analyze.color(img=self.rgb, bin_mask=self.mask, geojson=self.geojson, colorspaces="all")
+
+    def time_spectral_index(self, files, n_plots):
+        gcv.analyze.spectral_index(img=self.multispectral, geojson=self.geojson, index="ndvi")
+
+    def peakmem_spectral_index(self, files, n_plots):
+        gcv.analyze.spectral_index(img=self.multispectral, geojson=self.geojson, index="ndvi")
+
+    def time_height_percentile(self, files, n_plots):
+        gcv.analyze.height_percentile(dsm=self.dsm, geojson=self.geojson)
+
+    def peakmem_height_percentile(self, files, n_plots):
+        gcv.analyze.height_percentile(dsm=self.dsm, geojson=self.geojson)
+
+    def time_chm(self, files, n_plots):
+        gcv.analyze.chm(dsm=self.dsm, geojson=self.geojson)
+
+    def peakmem_chm(self, files, n_plots):
+        gcv.analyze.chm(dsm=self.dsm, geojson=self.geojson)
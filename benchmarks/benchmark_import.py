@@ -0,0 +1,19 @@
+# Import time benchmarks, each measured in a fresh interpreter
+
+
+def timeraw_import_geospatial():
+    """Time importing the package."""
+    return "import plantcv.geospatial"
+
+
+def timeraw_import_read_analyze():
+    """Time importing read and analyze, as a headless batch worker does."""
+    return """
+import plantcv.geospatial as gcv
+gcv.read.geotif
+gcv.analyze.coverage
+gcv.analyze.color
+gcv.analyze.spectral_index
+gcv.analyze.height_percentile
+gcv.analyze.chm
+"""
@@ -0,0 +1,83 @@
+# Benchmarks of reading GeoTIFFs
+import plantcv.geospatial as gcv
+from plantcv.plantcv import params
+from benchmarks.synthetic import synthetic_geotif, data_path
+
+
+class ReadGeotif:
+    """Read synthetic orthomosaics of different sizes and data types."""
+
+    params = ([1024, 4096], ["uint8", "uint16", "float32"])
+    param_names = ["size", "dtype"]
+    timeout = 300
+
+    def setup_cache(self):
+        files = {}
+        for size in self.params[0]:
+            for dtype in self.params[1]:
+                files[size, dtype] = synthetic_geotif(data_path(f"ortho_{size}_{dtype}.tif"), width=size,
+                                                      height=size, bands=5, dtype=dtype)
+        return files
+
+    def setup(self, files, size, dtype):
+        params.debug = None
+
+    def time_geotif(self, files, size, dtype):
+        gcv.read.geotif(filename=files[size, dtype], bands="B,G,R,RE,N")
+
+    def peakmem_geotif(self, files, size, dtype):
+        gcv.read.geotif(filename=files[size, dtype], bands="B,G,R,RE,N")
+
+    def time_geotif_lazy_overview(self, files, size, dtype):
+        img = gcv.read.geotif(filename=files[size, dtype], bands="B,G,R,RE,N", lazy=True)
+        img.overview()
+        img.close()
+
+    def peakmem_geotif_lazy_overview(self, files, size, dtype):
+        img = gcv.read.geotif(filename=files[size, dtype], bands="B,G,R,RE,N", lazy=True)
+        img.overview()
+        img.close()
+
+    def time_geotif_reduced(self, files, size, dtype):
+        gcv.read.geotif(filename=files[size, dtype], bands="B,G,R,RE,N", out_shape=(size // 4, size // 4))
+
+    def peakmem_geotif_reduced(self, files, size, dtype):
+        gcv.read.geotif(filename=files[size, dtype], bands="B,G,R,RE,N", out_shape=(size // 4, size // 4))
+
+    def time_geotif_subset(self, files, size, dtype):
+        gcv.read.geotif(filename=files[size, dtype], bands="B,G,R,RE,N", subset="R,N")
+
+    def peakmem_geotif_subset(self, files, size, dtype):
+        gcv.read.geotif(filename=files[size, dtype], bands="B,G,R,RE,N", subset="R,N")
+
+
+class ReadDSMCutoff:
+    """Read synthetic DSMs with a cutoff quantile."""
+
+    params = ([1024, 4096], ["exact", "histogram"])
+    param_names = ["size", "cutoff_method"]
+    timeout = 300
+
+    def setup_cache(self):
+        return {size: synthetic_geotif(data_path(f"dsm_cutoff_{size}.tif"), width=size, height=size, bands=1,
+                                       dtype="float32")
+                for size in self.params[0]}
+
+    def setup(self, files, size, cutoff_method):
+        params.debug = None
+
+    def time_geotif_cutoff(self, files, size, cutoff_method):
+        gcv.read.geotif(filename=files[size], bands="gray", cutoff=0.99, cutoff_method=cutoff_method)
+
+    def peakmem_geotif_cutoff(self, files, size, cutoff_method):
+        gcv.read.geotif(filename=files[size], bands="gray", cutoff=0.99, cutoff_method=cutoff_method)
+
+    def time_lazy_cutoff_value(self, files, size, cutoff_method):
+        with gcv.read.geotif(filename=files[size], bands="gray", cutoff=0.99, lazy=True,
+                             cutoff_method=cutoff_method) as img:
+            img.cutoff_value()
+
+    def peakmem_lazy_cutoff_value(self, files, size, cutoff_method):
+        with gcv.read.geotif(filename=files[size], bands="gray", cutoff=0.99, lazy=True,
+                             cutoff_method=cutoff_method) as img:
+            img.cutoff_value()
@@ -0,0 +1,59 @@
+# Benchmarks of plot shape creation and transformation
+import math
+import matplotlib
+import plantcv.geospatial as gcv
+from matplotlib import pyplot as plt
+from plantcv.plantcv import params
+from benchmarks.synthetic import GSD, synthetic_geotif, synthetic_plot_grid, synthetic_field_corners, data_path
+
+SIZE = 2048
+
+
+class Shapes:
+    """Create and transform synthetic plot grids of different sizes."""
+
+    params = [100, 1000, 10000]
+    param_names = ["n_plots"]
+    timeout = 300
+
+    def setup_cache(self):
+        files = {"img": synthetic_geotif(data_path("field.tif"), width=SIZE, height=SIZE, bands=3),
+                 "corners": synthetic_field_corners(data_path("corners.geojson"), width=SIZE, height=SIZE)}
+        for n_plots in self.params:
+            files[n_plots] = synthetic_plot_grid(data_path(f"grid_{n_plots}.geojson"), n_plots=n_plots,
+                                                 width=SIZE, height=SIZE)
+            files[f"points_{n_plots}"] = synthetic_plot_grid(data_path(f"points_{n_plots}.geojson"),
+                                                             n_plots=n_plots, width=SIZE, height=SIZE, points=True)
+        return files
+
+    def setup(self, files, n_plots):
+        matplotlib.use("Agg")
+        params.debug = None
+        self.img = gcv.read.geotif(filename=files["img"], bands="R,G,B")
+        self.columns = math.ceil(math.sqrt(n_plots))
+        self.ranges = math.ceil(n_plots / self.columns)
+
+    def teardown(self, files, n_plots):
+        plt.close("all")
+
+    def time_auto_grid(self, files, n_plots):
+        gcv.create_shapes.auto_grid(img=self.img, field_corners_path=files["corners"], out_path="auto_grid.geojson",
+                                    num_ranges=self.ranges, num_columns=self.columns,
+                                    range_length=SIZE * GSD / self.ranges, row_length=SIZE * GSD / self.columns)
+
+    def peakmem_auto_grid(self, files, n_plots):
+        gcv.create_shapes.auto_grid(img=self.img, field_corners_path=files["corners"], out_path="auto_grid.geojson",
+                                    num_ranges=self.ranges, num_columns=self.columns,
+                                    range_length=SIZE * GSD / self.ranges, row_length=SIZE * GSD / self.columns)
+
+    def time_transform_polygons(self, files, n_plots):
+        gcv.transform_polygons(img=self.img, geojson=files[n_plots])
+
+    def peakmem_transform_polygons(self, files, n_plots):
+        gcv.transform_polygons(img=self.img, geojson=files[n_plots])
+
+    def time_transform_polygons_packed(self, files, n_plots):
+        gcv.transform_polygons(img=self.img, geojson=files[n_plots], packed=True)
+
+    def time_to_roi_circles(self, files, n_plots):
+        gcv.convert.to_roi(img=self.img, geojson=files[f"points_{n_plots}"], radius=0.05)
@@ -0,0 +1,58 @@
+# Benchmarks of image transformations
+import plantcv.geospatial as gcv
+from plantcv.plantcv import params
+from benchmarks.synthetic import synthetic_geotif, data_path
+
+
+class Resize:
+    """Resize synthetic orthomosaics."""
+
+    params = ([1024, 4096], ["uint8", "float32"])
+    param_names = ["size", "dtype"]
+    timeout = 300
+
+    def setup_cache(self):
+        files = {}
+        for size in self.params[0]:
+            for dtype in self.params[1]:
+                files[size, dtype] = synthetic_geotif(data_path(f"resize_{size}_{dtype}.tif"), width=size,
+                                                      height=size, bands=3, dtype=dtype)
+        return files
+
+    def setup(self, files, size, dtype):
+        params.debug = None
+        self.img = gcv.read.geotif(filename=files[size, dtype], bands="R,G,B")
+
+    def time_resize(self, files, size, dtype):
+        gcv.resize(img=self.img, size=(size // 2, size // 2))
+
+    def peakmem_resize(self, files, size, dtype):
+        gcv.resize(img=self.img, size=(size // 2, size // 2))
+
+
+class SubtractDSM:
+    """Subtract synthetic DSMs."""
+
+    params = [1024, 4096]
+    param_names = ["size"]
+    timeout = 300
+
+    def setup_cache(self):
+        files = {}
+        for size in self.params:
+            files[size] = (synthetic_geotif(data_path(f"dsm1_{size}.tif"), width=size, height=size, bands=1,
+                                            dtype="float32", seed=1),
+                           synthetic_geotif(data_path(f"dsm0_{size}.tif"), width=size, height=size, bands=1,
+                                            dtype="float32", seed=2))
+        return files
+
+    def setup(self, files, size):
+        params.debug = None
+        self.dsm1 = gcv.read.geotif(filename=files[size][0], bands="gray")
+        self.dsm0 = gcv.read.geotif(filename=files[size][1], bands="gray")
+
+    def time_subtract_dsm(self, files, size):
+        gcv.subtract_dsm(dsm1=self.dsm1, dsm0=self.dsm0)
+
+    def peakmem_subtract_dsm(self, files, size):
+        gcv.subtract_dsm(dsm1=self.dsm1, dsm0=self.dsm0)
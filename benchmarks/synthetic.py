@@ -0,0 +1,156 @@
+# Synthetic orthomosaics and plot grids for the benchmarks
+import os
+import math
+import tempfile
+import numpy as np
+import rasterio
+import geopandas
+from affine import Affine
+from shapely.geometry import box, Point
+
+# Upper left corner (UTM zone 15N) and ground sampling distance of synthetic images
+ORIGIN = (500000.0, 4300000.0)
+GSD = 0.01
+CRS = "EPSG:32615"
+# Synthetic data are written outside of the source tree
+DATA_DIR = os.path.join(tempfile.gettempdir(), "plantcv-geospatial-benchmarks")
+
+
+def data_path(filename):
+    """Path of a synthetic data file in the temporary benchmark data directory.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file
+
+    Returns
+    -------
+    str
+        Absolute path of the file, its directory is created if needed
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
+
+
+def synthetic_geotif(filename, width=2048, height=2048, bands=3, dtype="uint8", nodata=None, seed=0):
+    """Write a tiled GeoTIFF of smooth random data.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the GeoTIFF to write
+    width : int, optional
+        Image width in pixels, default is 2048
+    height : int, optional
+        Image height in pixels, default is 2048
+    bands : int, optional
+        Number of bands, default is 3
+    dtype : str, optional
+        Data type, e.g. "uint8", "uint16" or "float32", default is "uint8"
+    nodata : float, optional
+        Nodata value, written to the border rows and columns, default is None
+    seed : int, optional
+        Random seed, default is 0
+
+    Returns
+    -------
+    str
+        Path of the GeoTIFF
+    """
+    rng = np.random.default_rng(seed)
+    dtype = np.dtype(dtype)
+    high = np.iinfo(dtype).max if dtype.kind in "ui" else 1.0
+    profile = {"driver": "GTiff", "width": width, "height": height, "count": bands, "dtype": dtype.name,
+               "crs": CRS, "transform": synthetic_transform(), "nodata": nodata,
+               "tiled": True, "blockxsize": 256, "blockysize": 256}
+    # Low resolution noise upsampled in blocks looks like canopy and soil patches
+    coarse = rng.random((bands, math.ceil(height / 16), math.ceil(width / 16)))
+    with rasterio.open(filename, "w", **profile) as dst:
+        for row in range(0, height, 1024):
+            rows = min(1024, height - row)
+            block = coarse[:, row // 16:(row + rows + 15) // 16].repeat(16, axis=1).repeat(16, axis=2)
+            block = block[:, (row % 16):(row % 16) + rows, :width]
+            block = block + rng.normal(0, 0.05, block.shape)
+            data = (np.clip(block, 0, 1) * high).astype(dtype)
+            if nodata is not None:
+                data[:, :, [0, -1]] = nodata
+                if row == 0:
+                    data[:, 0] = nodata
+                if row + rows == height:
+                    data[:, -1] = nodata
+            dst.write(data, window=((row, row + rows), (0, width)))
+    return filename
+
+
+def synthetic_transform():
+    """Transform of synthetic images.
+
+    Returns
+    -------
+    affine.Affine
+        North up transform at ORIGIN with GSD pixels
+    """
+    return Affine(GSD, 0, ORIGIN[0], 0, -GSD, ORIGIN[1])
+
+
+def synthetic_plot_grid(filename, n_plots=100, width=2048, height=2048, fill=0.8, points=False):
+    """Write a geojson grid of rectangular plots covering a synthetic image.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the geojson to write
+    n_plots : int, optional
+        Number of plots, default is 100
+    width : int, optional
+        Width in pixels of the image covered by the grid, default is 2048
+    height : int, optional
+        Height in pixels of the image covered by the grid, default is 2048
+    fill : float, optional
+        Fraction of each grid cell covered by its plot (the rest are alleys), default is 0.8
+    points : bool, optional
+        Write the center points of the plots instead of the rectangles, default is False
+
+    Returns
+    -------
+    str
+        Path of the geojson
+    """
+    columns = math.ceil(math.sqrt(n_plots * width / height))
+    ranges = math.ceil(n_plots / columns)
+    cell_x = width * GSD / columns
+    cell_y = height * GSD / ranges
+    plots = []
+    for i in range(n_plots):
+        x = ORIGIN[0] + (i % columns) * cell_x
+        y = ORIGIN[1] - (i // columns) * cell_y
+        plot = box(x, y - cell_y * fill, x + cell_x * fill, y)
+        plots.append(plot.centroid if points else plot)
+    gdf = geopandas.GeoDataFrame({"ID": [f"plot_{i}" for i in range(n_plots)]}, geometry=plots, crs=CRS)
+    gdf.to_file(filename, driver="GeoJSON")
+    return filename
+
+
+def synthetic_field_corners(filename, width=2048, height=2048):
+    """Write the four field corner points of a synthetic image, in the order auto_grid expects.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the geojson to write
+    width : int, optional
+        Width in pixels of the field, default is 2048
+    height : int, optional
+        Height in pixels of the field, default is 2048
+
+    Returns
+    -------
+    str
+        Path of the geojson
+    """
+    x0, y0 = ORIGIN
+    x1, y1 = x0 + width * GSD, y0 - height * GSD
+    corners = [Point(x0, y0), Point(x1, y0), Point(x1, y1), Point(x0, y1)]
+    geopandas.GeoDataFrame(geometry=corners, crs=CRS).to_file(filename, driver="GeoJSON")
+    return filename
@@ -1,14 +1,5 @@
 from importlib.metadata import version
-from plantcv.geospatial._globals import Field_layout, field_layout
-from plantcv.geospatial.transform_polygons import transform_polygons
-from plantcv.geospatial import read
-from plantcv.geospatial import convert
-from plantcv.geospatial import analyze
-from plantcv.geospatial import create_shapes
-from plantcv.geospatial.center_grid_rois import center_grid_rois
-from plantcv.geospatial.images import Image, GEO, DSM
-from plantcv.geospatial.resize import resize
-from plantcv.geospatial.subtract_dsm import subtract_dsm
+from plantcv.geospatial._lazy import _attach
 
 # Auto versioning
 __version__ = version("plantcv-geospatial")
@@ -16,8 +7,13 @@ __version__ = version("plantcv-geospatial")
 __all__ = [
     "Field_layout",
     "field_layout",
+    "Plot_results",
+    "plot_results",
+    "Profiler",
+    "profiler",
     "transform_polygons",
     "read",
+    "write",
     "analyze",
     "create_shapes",
     "center_grid_rois",
@@ -25,6 +21,34 @@ __all__ = [
     "Image",
     "GEO",
     "DSM",
+    "LazyGEO",
+    "LazyDSM",
+    "PlotIndex",
     "resize",
     "subtract_dsm"
 ]
+
+# Subpackages and functions are imported on first access, so e.g. read and analyze never import napari
+__getattr__, __dir__ = _attach(__name__, {
+    "Field_layout": ("plantcv.geospatial._globals", "Field_layout"),
+    "field_layout": ("plantcv.geospatial._globals", "field_layout"),
+    "Plot_results": ("plantcv.geospatial._globals", "Plot_results"),
+    "plot_results": ("plantcv.geospatial._globals", "plot_results"),
+    "Profiler": ("plantcv.geospatial._globals", "Profiler"),
+    "profiler": ("plantcv.geospatial._globals", "profiler"),
+    "transform_polygons": ("plantcv.geospatial.transform_polygons", "transform_polygons"),
+    "read": ("plantcv.geospatial.read", None),
+    "write": ("plantcv.geospatial.write", None),
+    "analyze": ("plantcv.geospatial.analyze", None),
+    "create_shapes": ("plantcv.geospatial.create_shapes", None),
+    "center_grid_rois": ("plantcv.geospatial.center_grid_rois", "center_grid_rois"),
+    "convert": ("plantcv.geospatial.convert", None),
+    "Image": ("plantcv.geospatial.images", "Image"),
+    "GEO": ("plantcv.geospatial.images", "GEO"),
+    "DSM": ("plantcv.geospatial.images", "DSM"),
+    "LazyGEO": ("plantcv.geospatial.images", "LazyGEO"),
+    "LazyDSM": ("plantcv.geospatial.images", "LazyDSM"),
+    "PlotIndex": ("plantcv.geospatial.plot_index", "PlotIndex"),
+    "resize": ("plantcv.geospatial.resize", "resize"),
+    "subtract_dsm": ("plantcv.geospatial.subtract_dsm", "subtract_dsm"),
+})
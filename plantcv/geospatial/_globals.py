@@ -1,3 +1,16 @@
+import sys
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from plantcv.plantcv import outputs
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Peak memory is not recorded where the resource module is unavailable (Windows)
+    resource = None
+
+
 class Field_layout:
     """PlantCV-Geospatial field layout metadata class."""
 
@@ -34,3 +47,285 @@ class Field_layout:
 # Initialize an instance of Field_layout class with default values
 # Field_layout is available when PlantCV-Geospatial is imported
 field_layout = Field_layout()
+
+
+class Plot_results:
+    """PlantCV-Geospatial columnar buffer of per-plot observations."""
+
+    def __init__(self, buffered=False):
+        """Initialize parameters.
+
+        Parameters
+        ----------
+        buffered : bool, optional
+            Keep observations of analyze functions in the buffer until they are exported
+            or converted with to_outputs. When False, observations are added to the PlantCV
+            outputs right away. Defaults to False.
+        """
+        self.buffered = buffered
+        self.tables = {}
+
+    def clear(self):
+        """Remove all buffered observations."""
+        self.tables = {}
+
+    def add(self, samples, variable, trait, method, scale, datatype, value, label, empty=None):
+        """Add one variable for many samples (plots).
+
+        Parameters
+        ----------
+        samples : list
+            Sample names, one per plot.
+        variable : str
+            A local unique identifier of a variable.
+        trait : str
+            A name of the trait, or an informative description of the trait.
+        method : str
+            A name of the measurement method.
+        scale : str
+            Units of the measurement.
+        datatype : type
+            The type of each value, e.g. int, float or list.
+        value : numpy.ndarray or list
+            Values with one entry (or one row of a frequency table) per sample.
+        label : str or list
+            The label for each value, shared by all samples.
+        empty : numpy.ndarray, optional
+            Boolean flag per sample of plots without valid pixels, whose values are saved as None.
+            Defaults to None (values are saved as they are, including NaN).
+        """
+        value = np.asarray(value)
+        if not self.buffered:
+            with profiler.stage("outputs"):
+                _add_to_outputs(samples, variable, trait, method, scale, datatype, value, label, empty)
+            return
+        key = tuple(samples)
+        if key not in self.tables:
+            self.tables[key] = {}
+        self.tables[key][variable] = {"trait": trait, "method": method, "scale": scale,
+                                      "datatype": datatype, "value": value, "label": label, "empty": empty}
+
+    def to_outputs(self):
+        """Add all buffered observations to the PlantCV outputs."""
+        with profiler.stage("outputs", "plot_results.to_outputs"):
+            for samples, table in self.tables.items():
+                for variable, column in table.items():
+                    _add_to_outputs(samples, variable, **column)
+
+    def to_dataframe(self):
+        """Buffered observations as a table with one row per sample and one column per variable.
+
+        Frequency tables are expanded into one column per entry, named variable_0, variable_1, ...
+
+        Returns
+        -------
+        pandas.DataFrame
+            Observations indexed by sample name
+        """
+        frames = []
+        for samples, table in self.tables.items():
+            columns = {}
+            for variable, column in table.items():
+                value = column["value"]
+                if value.ndim == 2:
+                    for i in range(value.shape[1]):
+                        columns[f"{variable}_{i}"] = value[:, i]
+                else:
+                    columns[variable] = value
+            frames.append(pd.DataFrame(columns, index=pd.Index(samples, name="sample")))
+        if not frames:
+            return pd.DataFrame(index=pd.Index([], name="sample"))
+        df = frames[0]
+        for frame in frames[1:]:
+            df = df.combine_first(frame)
+        return df
+
+    def to_csv(self, filename):
+        """Save buffered observations to a CSV file, one row per sample.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the CSV file.
+        """
+        self.to_dataframe().to_csv(filename)
+
+    def to_parquet(self, filename):
+        """Save buffered observations to a Parquet file, one row per sample.
+
+        Requires pyarrow (or fastparquet).
+
+        Parameters
+        ----------
+        filename : str
+            Path of the Parquet file.
+        """
+        self.to_dataframe().to_parquet(filename)
+
+    def to_arrow(self):
+        """Buffered observations as an Arrow table, one row per sample.
+
+        Requires pyarrow.
+
+        Returns
+        -------
+        pyarrow.Table
+            Observations with a "sample" column
+        """
+        import pyarrow
+        return pyarrow.Table.from_pandas(self.to_dataframe().reset_index())
+
+
+def _add_to_outputs(samples, variable, trait, method, scale, datatype, value, label, empty=None):
+    """Add one variable for many samples to the PlantCV outputs.
+
+    Parameters
+    ----------
+    samples : list
+        Sample names, one per plot.
+    variable : str
+        A local unique identifier of a variable.
+    trait : str
+        A name of the trait.
+    method : str
+        A name of the measurement method.
+    scale : str
+        Units of the measurement.
+    datatype : type
+        The type of each value.
+    value : numpy.ndarray
+        Values with one entry (or one row of a frequency table) per sample.
+    label : str or list
+        The label for each value.
+    empty : numpy.ndarray, optional
+        Boolean flag per sample of plots without valid pixels, whose values are saved as None.
+        Defaults to None.
+    """
+    values = value.tolist()
+    if empty is not None:
+        values = [None if is_empty else v for v, is_empty in zip(values, empty)]
+    for sample, sample_value in zip(samples, values):
+        outputs.add_observation(sample=sample, variable=variable, trait=trait, method=method, scale=scale,
+                                datatype=datatype, value=sample_value, label=label)
+
+
+class Profiler:
+    """PlantCV-Geospatial opt-in profiler of processing stages."""
+
+    def __init__(self, enabled=False, callback=None):
+        """Initialize parameters.
+
+        Parameters
+        ----------
+        enabled : bool, optional
+            Record processing stages. Defaults to False.
+        callback : callable, optional
+            Called with each record (dict) as it is made, e.g. to emit structured log events.
+            Defaults to None.
+        """
+        self.enabled = enabled
+        self.callback = callback
+        self.records = []
+
+    def clear(self):
+        """Remove all records."""
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, function=None):
+        """Record the wall time and peak memory of a processing stage, if enabled.
+
+        Parameters
+        ----------
+        name : str
+            Stage name, e.g. "read", "crop", "mask_detection", "thumbnail", "rasterize",
+            "zonal_stats", "outputs" or "debug".
+        function : str, optional
+            Name of the function running the stage. Defaults to None.
+        """
+        if not self.enabled:
+            yield
+            return
+        start_rss = _peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_rss = _peak_rss_mb()
+            record = {"stage": name, "function": function, "seconds": seconds, "peak_rss_mb": peak_rss,
+                      "peak_rss_increase_mb": None if peak_rss is None else peak_rss - start_rss}
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    @contextmanager
+    def profile(self, callback=None):
+        """Enable the profiler within a with block.
+
+        Parameters
+        ----------
+        callback : callable, optional
+            Called with each record made within the block. Defaults to the profiler callback.
+
+        Yields
+        ------
+        plantcv.geospatial.Profiler
+            The profiler
+        """
+        previous = (self.enabled, self.callback)
+        self.enabled = True
+        if callback is not None:
+            self.callback = callback
+        try:
+            yield self
+        finally:
+            self.enabled, self.callback = previous
+
+    def to_dataframe(self):
+        """Records as a table.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per record
+        """
+        return pd.DataFrame(self.records, columns=["stage", "function", "seconds", "peak_rss_mb",
+                                                   "peak_rss_increase_mb"])
+
+    def summary(self):
+        """Summary table of the records of each stage.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Number of calls, total and longest wall time (seconds), and process peak memory (MB)
+            reached by the end of each stage
+        """
+        return self.to_dataframe().groupby("stage", sort=False).agg(
+            calls=("seconds", "size"), seconds=("seconds", "sum"), max_seconds=("seconds", "max"),
+            peak_rss_mb=("peak_rss_mb", "max"))
+
+
+def _peak_rss_mb():
+    """Peak resident memory of the process.
+
+    Returns
+    -------
+    float or None
+        Peak resident set size in MB, None if it is not available
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Initialize an instance of Plot_results class with default values
+# plot_results is available when PlantCV-Geospatial is imported
+plot_results = Plot_results()
+
+# Initialize an instance of Profiler class, disabled by default
+# profiler is available when PlantCV-Geospatial is imported
+profiler = Profiler()
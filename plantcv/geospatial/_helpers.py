@@ -4,36 +4,15 @@ from rasterio.plot import plotting_extent
 from matplotlib import pyplot as plt
 from plantcv.plantcv import params
 from plantcv.plantcv.fatal_error import fatal_error
+from plantcv.geospatial.plot_index import PlotIndex
+from plantcv.geospatial.images import GEO, LazyImage
 import numpy as np
 import geopandas
 import fiona
-import cv2
 import os
 
-
-def _histogram_stats(masked_array, bins, histrange):
-    """Helper function to calculate a histogram from a masked array
-
-    Parameters
-    ----------
-    masked_array : np.ndarray
-        Single channel from a masked image
-    bins : int
-        Number of bins in the output histogram
-    histrange : tuple
-        Range for the histogram, format (min, max)
-
-    Returns
-    -------
-    dict
-        Dictionary of counts and bin edges
-    """
-    counts, bin_edges = np.histogram(masked_array, bins, range=histrange)
-
-    return {
-        'counts': counts.tolist(),
-        'bin_edges': bin_edges.tolist()
-    }
+# Largest edge in pixels of images rendered in debug figures
+_DEBUG_MAX_SIZE = 2048
 
 
 def _transform_geojson_crs(img, geojson):
@@ -43,8 +22,8 @@ def _transform_geojson_crs(img, geojson):
 
     Parameters:
     -----------
-    geojson : str
-        Path to the shapefile.
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shapefile, or a PlotIndex.
     img : plantcv.geospatial.images.GEO object
         A GEO image object returned by ``read_geotif``.
 
@@ -52,11 +31,15 @@ def _transform_geojson_crs(img, geojson):
     --------
     gdf     : geopandas.GeoDataFrame
     """
-    gdf = geopandas.read_file(geojson)
+    if isinstance(geojson, PlotIndex):
+        gdf = geojson.gdf
+    else:
+        gdf = geopandas.read_file(geojson)
 
     # Check spectral object and geojson have the same CRS, if not then convert
-    if not gdf.crs == img.crs:
-        gdf = gdf.to_crs(crs=img.crs)
+    img_crs = getattr(img, "crs", None)
+    if gdf.crs is not None and img_crs is not None and not gdf.crs == img_crs:
+        gdf = gdf.to_crs(crs=img_crs)
 
     return gdf
 
@@ -188,34 +171,60 @@ def _calc_plot_corners(anchor_point, horizontal_dir, vertical_dir, col_num,
     return p1, p2, p3, p4
 
 
+def _decimate(arr, max_size=_DEBUG_MAX_SIZE):
+    """Strided view of an image whose largest edge is at most max_size pixels.
+
+    Parameters
+    ----------
+    arr : numpy.ndarray
+        Image with shape (rows, columns) or (rows, columns, bands)
+    max_size : int, optional
+        Largest edge in pixels
+
+    Returns
+    -------
+    numpy.ndarray
+        Decimated view of the image
+    """
+    step = max(1, -(-max(arr.shape[:2]) // max_size))
+    return arr[::step, ::step]
+
+
 def _show_geojson(img, geojson, ids, **kwargs):
     """
-    Helper function to split a polygon into equidistant subplots
+    Helper function to plot shapes from a geojson on an image. The figure is only rendered,
+    from a decimated image, when params.debug is set.
 
     Parameters:
     -----------
-    img : plantcv.geospatial.images.GEO object
+    img : plantcv.geospatial.images.GEO, DSM, LazyGEO or LazyDSM object
         geotif data, generally from read_geotif
-    geojson : str
-        Path to the shape file containing the regions
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the regions, or a PlotIndex
     ids : list
-        List of plot IDs from _gather_ids
+        List of plot IDs, from PlotIndex.ids
 
     Returns:
     --------
-    plotting_img : matplotlib.pyplot
+    plotting_img : matplotlib.figure.Figure or None
+        None if params.debug is None
     """
-    bounds = geopandas.read_file(geojson)
+    # Skip reading the shapes and rendering the figure if it would not be shown
+    if params.debug is None:
+        return None
+    bounds = _transform_geojson_crs(img=img, geojson=geojson)
+    # Lazily read images are plotted from an overview
+    if isinstance(img, LazyImage):
+        img = img.overview(max_size=_DEBUG_MAX_SIZE)
 
     # Plot the GeoTIFF
     # Make a flipped image for graphing
-    flipped = img
-    if len(np.shape(img.thumb)) > 2:
-        flipped = cv2.merge((img.thumb[:, :, [2]],
-                            img.thumb[:, :, [1]],
-                            img.thumb[:, :, [0]]))
+    if isinstance(img, GEO):
+        flipped = img.thumbnail(max_size=_DEBUG_MAX_SIZE)[:, :, ::-1]
+    else:
+        flipped = _decimate(np.asarray(img))
 
-    _, ax = plt.subplots(figsize=(10, 10))
+    fig, ax = plt.subplots(figsize=(10, 10))
     fig_extent = plotting_extent(img[:, :, :3],
                                  img.transform)
     # Add labels to vector features
@@ -223,73 +232,39 @@ def _show_geojson(img, geojson, ids, **kwargs):
         for idx, row in bounds.iterrows():
             x_coord = (row.geometry.bounds[0] + row.geometry.centroid.x) / 2
             y_coord = row.geometry.centroid.y
-            plt.text(x_coord, y_coord, ids[idx], fontsize=params.text_size, c="m")
+            ax.text(x_coord, y_coord, ids[idx], fontsize=params.text_size, c="m")
 
     ax.imshow(flipped, extent=fig_extent, **kwargs)
     # Plot the shapefile
     bounds.boundary.plot(ax=ax, color="blue")
     # Set plot title and labels
-    plt.title("GeoJSON shapes on GeoTIFF")
-    # Store the plot
-    plotting_img = plt.gcf()
+    ax.set_title("GeoJSON shapes on GeoTIFF")
 
     # Print or plot if debug is turned on
-    if params.debug is not None:
-        if params.debug == 'print':
-            plt.savefig(os.path.join(params.debug_outdir, str(
-                params.device) + '_shapes_plot.png'), dpi=params.dpi)
-            plt.close()
-        elif params.debug == 'plot':
-            # Use non-blocking mode in case the function is run more than once
-            plt.show(block=False)
+    if params.debug == 'print':
+        fig.savefig(os.path.join(params.debug_outdir, str(
+            params.device) + '_shapes_plot.png'), dpi=params.dpi)
+        plt.close(fig)
+    elif params.debug == 'plot':
+        # Use non-blocking mode in case the function is run more than once
+        plt.show(block=False)
     else:
-        plt.close()
-
-    return plotting_img
-
-
-def _gather_ids(geojson):
-    """
-    Helper function to gather plot IDs from a geojson if available, or auto-populate with default labels
-
-    Parameters:
-    -----------
-    geojson : str
-        Path to the shape file containing the regions
+        plt.close(fig)
 
-    Returns:
-    --------
-    ids : list
-        List of polygon IDs
-    """
-    with fiona.open(geojson, 'r') as shapefile:
-        # If IDs within the geojson
-        ids = []
-        for i, row in enumerate(shapefile):
-            if 'PlotName' in row['properties']:
-                ids.append((row['properties']["PlotName"]))
-            elif 'ID' in row['properties']:
-                ids.append((row['properties']["ID"]))
-            elif 'FID' in row['properties']:
-                ids.append((row['properties']["FID"]))
-            elif 'plot_ids' in row['properties']:
-                ids.append((row['properties']["plot_ids"]))
-            else:
-                # If there are no IDs in the geojson then use default labels
-                ids.append(str(i + 1))
-    return ids
+    return fig
 
 
 def _plot_bounds_pseudocolored(img, geojson, vmin, vmax, data_label):
     """
-    Helper function to plot shapefile bounds on a pseudocolored data layer
+    Helper function to plot shapefile bounds on a pseudocolored data layer. The figure is
+    only rendered, from a decimated image, when params.debug is set.
 
     Parameters:
     -----------
     img : plantcv.plantcv.classes.Spectral_data
         Spectral_data object of geotif data, used for plotting
-    geojson : str
-        Path to the shape file containing the regions
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the regions, or a PlotIndex
     vmin : float
         Minimum value to get plotted
     vmax : float
@@ -299,37 +274,39 @@ def _plot_bounds_pseudocolored(img, geojson, vmin, vmax, data_label):
 
     Returns:
     --------
-    analysis_image : matplotlib.pyplot
-        Debug image showing shapes from geojson on input image.
+    analysis_image : matplotlib.axes.Axes or None
+        Debug image showing shapes from geojson on input image, None if params.debug is None.
     """
+    # Skip reading the shapes and rendering the figure if it would not be shown
+    if params.debug is None:
+        return None
     # Plot the GeoTIFF
-    bounds = geopandas.read_file(geojson)
+    bounds = _transform_geojson_crs(img=img, geojson=geojson)
 
     # Gather representative coordinates for each polygone in the shapefile
     bounds['coords'] = bounds['geometry'].apply(lambda x: x.representative_point().coords[:])
     bounds['coords'] = [coords[0] for coords in bounds['coords']]
 
     # Pseudocolor the DSM for plotting
-    _, ax = plt.subplots(figsize=(10, 10))
+    fig, ax = plt.subplots(figsize=(10, 10))
     fig_extent = plotting_extent(img.array_data,
                                  img.metadata['transform'])
-    ax.imshow(img.array_data, extent=fig_extent, cmap='viridis', vmin=vmin, vmax=vmax)
+    ax.imshow(_decimate(img.array_data), extent=fig_extent, cmap='viridis', vmin=vmin, vmax=vmax)
 
     # Plot the shapefile bounds
     bounds.boundary.plot(ax=ax, color="red")
-    plt.title("Shapefile on " + str(data_label))
+    ax.set_title("Shapefile on " + str(data_label))
 
     # Print or plot if debug is turned on
-    if params.debug is not None:
-        if params.debug == 'print':
-            plt.savefig(os.path.join(params.debug_outdir, str(
-                params.device) + '_analyze_' + str(data_label) + '.png'), dpi=params.dpi)
-            plt.close()
-        elif params.debug == 'plot':
-            # Use non-blocking mode in case the function is run more than once
-            plt.show(block=False)
+    if params.debug == 'print':
+        fig.savefig(os.path.join(params.debug_outdir, str(
+            params.device) + '_analyze_' + str(data_label) + '.png'), dpi=params.dpi)
+        plt.close(fig)
+    elif params.debug == 'plot':
+        # Use non-blocking mode in case the function is run more than once
+        plt.show(block=False)
     else:
-        plt.close()
+        plt.close(fig)
     return ax
 
 
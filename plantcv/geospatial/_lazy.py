@@ -0,0 +1,53 @@
+# Lazy (PEP 562) loading of the public attributes of PlantCV-Geospatial packages
+import sys
+import types
+import importlib
+
+
+class _LazyModule(types.ModuleType):
+    """Package whose public attributes are imported on first access."""
+
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it on the package, keep exporting the function of the same name instead
+        if isinstance(value, types.ModuleType) and self._lazy_attrs.get(name, (None, None))[1] is not None:
+            return
+        super().__setattr__(name, value)
+
+
+def _attach(package, lazy_attrs):
+    """Load the public attributes of a package on first access.
+
+    Parameters
+    ----------
+    package : str
+        Name of the package, __name__ of its __init__ module
+    lazy_attrs : dict
+        Attribute name -> (module name, attribute name in the module), or (module name, None)
+        for (sub)modules
+
+    Returns
+    -------
+    __getattr__ : callable
+        Module __getattr__ of the package
+    __dir__ : callable
+        Module __dir__ of the package
+    """
+    module = sys.modules[package]
+
+    def __getattr__(name):
+        if name not in lazy_attrs:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module_name, attr = lazy_attrs[name]
+        value = importlib.import_module(module_name)
+        if attr is not None:
+            value = getattr(value, attr)
+            # Cache the attribute, later accesses skip __getattr__
+            setattr(module, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(module.__dict__) | set(lazy_attrs))
+
+    module._lazy_attrs = lazy_attrs
+    module.__class__ = _LazyModule
+    return __getattr__, __dir__
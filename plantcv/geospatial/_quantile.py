@@ -0,0 +1,180 @@
+# Streaming quantiles of large images, read block by block
+import numpy as np
+
+# Number of high bits of the sortable keys used as histogram bins
+_KEY_BITS = 20
+_SHIFT = 32 - _KEY_BITS
+_SIGN = np.uint32(0x80000000)
+
+
+def _finite(block):
+    """Values of a block without NaN, flattened.
+
+    Parameters
+    ----------
+    block : numpy.ndarray
+        Image data
+
+    Returns
+    -------
+    numpy.ndarray
+        1D array of values
+    """
+    block = np.asarray(block).ravel()
+    if block.dtype.kind == "f":
+        nan = np.isnan(block)
+        if nan.any():
+            block = block[~nan]
+    return block
+
+
+def _keys(values):
+    """Unsigned integer keys sorting in the same order as the float32 values.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        1D array of values without NaN
+
+    Returns
+    -------
+    numpy.ndarray
+        uint32 keys
+    """
+    bits = np.ascontiguousarray(values, dtype=np.float32).view(np.uint32)
+    # Flip every bit of negative values and only the sign bit of positive values
+    return bits ^ ((bits >> 31) * np.uint32(0x7FFFFFFF) | _SIGN)
+
+
+def _key_value(key):
+    """Float32 value of a sortable key.
+
+    Parameters
+    ----------
+    key : int
+        uint32 key
+
+    Returns
+    -------
+    float
+        Value, infinity for keys of NaN or past the largest key
+    """
+    if key >= 1 << 32:
+        return np.inf
+    key = np.uint32(key)
+    bits = key ^ _SIGN if key & _SIGN else ~key
+    value = float(np.array(bits, dtype=np.uint32).view(np.float32))
+    if np.isnan(value):
+        return np.inf if key & _SIGN else -np.inf
+    return value
+
+
+def _lerp(a, b, t):
+    """Linear interpolation between two values, as in np.quantile.
+
+    Parameters
+    ----------
+    a : scalar
+        Value at the lower rank
+    b : scalar
+        Value at the upper rank
+    t : float
+        Fraction of the distance from a to b
+
+    Returns
+    -------
+    scalar
+        Interpolated value
+    """
+    diff = b - a
+    if t >= 0.5:
+        return b - diff * (1 - t)
+    return a + diff * t
+
+
+def _streaming_quantile(blocks, q, exact=True):
+    """Quantile of the values of an image read block by block, ignoring NaN.
+
+    Values are ranked with a histogram of the high 20 bits of keys sorting like their
+    float32 values (a radix select), in one streaming pass over the blocks. With
+    exact=True a second pass collects the values of the histogram bins holding the
+    quantile ranks, and the result equals np.nanquantile (linear method). Otherwise
+    the ranked values are estimated by the lower edge of their bin, so the result has
+    a relative error below 2**-11 (about 0.05%).
+
+    Parameters
+    ----------
+    blocks : callable
+        Function returning an iterable over the image blocks (numpy arrays), called
+        once per pass
+    q : float
+        Quantile between 0 and 1
+    exact : bool, optional
+        Compute the exact quantile with a second pass, default is True
+
+    Returns
+    -------
+    float or numpy scalar
+        Quantile, NaN if there are no values
+    """
+    hist = np.zeros(1 << _KEY_BITS, dtype=np.int64)
+    dtype = None
+    for block in blocks():
+        values = _finite(block)
+        dtype = values.dtype
+        hist += np.bincount(_keys(values) >> _SHIFT, minlength=1 << _KEY_BITS)
+    n = int(hist.sum())
+    if n == 0:
+        return np.nan
+    # Ranks of the values around the quantile and the interpolation weight (as np.quantile)
+    virtual_index = (n - 1) * float(q)
+    lower = min(max(int(np.floor(virtual_index)), 0), n - 1)
+    upper = min(lower + 1, n - 1)
+    gamma = virtual_index - lower if 0 <= virtual_index < n - 1 else 0.0
+    cumulative = np.cumsum(hist)
+    lower_bin, upper_bin = (int(i) for i in np.searchsorted(cumulative, [lower, upper], side="right"))
+    low = _key_value(lower_bin << _SHIFT)
+    if not exact:
+        return _lerp(low, _key_value(upper_bin << _SHIFT), gamma)
+    # Collect the values of the bins holding the ranks. Comparing values to the bin edges is
+    # cheaper than computing keys, but only matches the bins for finite edges of one sign
+    # (-0.0 and 0.0 have different keys) and values exactly representable as float32.
+    high = _key_value((upper_bin + 1) << _SHIFT)
+    by_value = (np.isfinite(low) and np.isfinite(high) and (low > 0 or high < 0)
+                and (dtype == np.float32 or (dtype.kind in "iu" and dtype.itemsize <= 2)))
+    selected = []
+    for block in blocks():
+        if by_value:
+            values = np.asarray(block).ravel()
+            selected.append(values[(values >= low) & (values < high)])
+        else:
+            values = _finite(block)
+            bins = _keys(values) >> _SHIFT
+            selected.append(values[(bins >= lower_bin) & (bins <= upper_bin)])
+    selected = np.sort(np.concatenate(selected).astype(dtype, copy=False))
+    below = int(cumulative[lower_bin - 1]) if lower_bin > 0 else 0
+    return _lerp(selected[lower - below], selected[upper - below], gamma)
+
+
+def _array_quantile(img_data, q, exact=True, chunk_size=1 << 22):
+    """Quantile of an in-memory image, ignoring NaN, without sorting a copy of it.
+
+    Parameters
+    ----------
+    img_data : numpy.ndarray
+        Image data
+    q : float
+        Quantile between 0 and 1
+    exact : bool, optional
+        Compute the exact quantile (as np.nanquantile), default is True
+    chunk_size : int, optional
+        Number of values per block, default is 4194304
+
+    Returns
+    -------
+    float or numpy scalar
+        Quantile, NaN if there are no values
+    """
+    values = np.ravel(img_data)
+    return _streaming_quantile(lambda: (values[i:i + chunk_size] for i in range(0, values.size, chunk_size)),
+                               q, exact=exact)
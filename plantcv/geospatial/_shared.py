@@ -0,0 +1,187 @@
+# Image data in shared memory or memory-mapped .npy files, pickled as small handles
+import os
+import weakref
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class _Backing:
+    """Shared memory block or memory-mapped file holding the data of an image."""
+
+    def __init__(self, kind, name, address, size, mode="r+", shm=None):
+        """Buffer that images in worker processes attach to.
+
+        Parameters
+        ----------
+        kind : str
+            "shm" (multiprocessing.shared_memory) or "npy" (memory-mapped file)
+        name : str
+            Name of the shared memory block or path of the file
+        address : int
+            Memory address of the first byte of the block or file in this process
+        size : int
+            Size of the block or file in bytes
+        mode : str, optional
+            numpy.memmap mode of the file, default is "r+"
+        shm : multiprocessing.shared_memory.SharedMemory, optional
+            Open shared memory block, kept open as long as the images using it
+        """
+        self.kind = kind
+        self.name = name
+        self.address = address
+        self.size = size
+        self.mode = mode
+        self.shm = shm
+
+    def handle(self, img_data):
+        """Location of an array in the buffer.
+
+        Parameters
+        ----------
+        img_data : numpy.ndarray
+            Array, e.g. a view of an image
+
+        Returns
+        -------
+        tuple or None
+            (kind, name, mode, shape, dtype, offset, strides), None if the array is not in the buffer
+        """
+        low, high = _byte_bounds(img_data)
+        if not self.address <= low <= high <= self.address + self.size:
+            return None
+        offset = img_data.__array_interface__["data"][0] - self.address
+        return self.kind, self.name, self.mode, img_data.shape, img_data.dtype.str, offset, img_data.strides
+
+
+def _byte_bounds(img_data):
+    """First and past the last memory address used by an array.
+
+    Parameters
+    ----------
+    img_data : numpy.ndarray
+        Array
+
+    Returns
+    -------
+    tuple
+        (low, high) memory addresses
+    """
+    low = high = img_data.__array_interface__["data"][0]
+    if img_data.size == 0:
+        return low, high
+    for length, stride in zip(img_data.shape, img_data.strides):
+        low += min(0, (length - 1) * stride)
+        high += max(0, (length - 1) * stride)
+    return low, high + img_data.itemsize
+
+
+def _unlink(shm):
+    """Unlink a shared memory block created by this process.
+
+    Parameters
+    ----------
+    shm : multiprocessing.shared_memory.SharedMemory
+        Shared memory block
+    """
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _create_shared(img_data):
+    """Copy an array into a new shared memory block.
+
+    The block is unlinked when the returned array and every view of it are deleted.
+
+    Parameters
+    ----------
+    img_data : numpy.ndarray
+        Image data
+
+    Returns
+    -------
+    array : numpy.ndarray
+        Copy of the image data in shared memory
+    backing : _Backing
+        Shared memory block of the array
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(img_data.nbytes, 1))
+    array = np.ndarray(img_data.shape, dtype=img_data.dtype, buffer=shm.buf)
+    array[...] = img_data
+    backing = _Backing("shm", shm.name, array.__array_interface__["data"][0], shm.size, shm=shm)
+    weakref.finalize(backing, _unlink, shm)
+    return array, backing
+
+
+def _memmap_backing(img_data):
+    """Backing of a memory-mapped array, e.g. from numpy.load(filename, mmap_mode="r").
+
+    Parameters
+    ----------
+    img_data : numpy.memmap
+        Memory-mapped array
+
+    Returns
+    -------
+    _Backing or None
+        Backing file of the array, None if the map has no file name
+    """
+    if img_data.filename is None:
+        return None
+    # Workers map the file again, "w+" would truncate it
+    mode = "r+" if img_data.mode == "w+" else img_data.mode
+    address = img_data.__array_interface__["data"][0] - img_data.offset
+    return _Backing("npy", img_data.filename, address, os.path.getsize(img_data.filename), mode=mode)
+
+
+def _open_shared(name):
+    """Attach to a shared memory block created by another process.
+
+    Before Python 3.13 the block is also registered with the resource tracker of this
+    process, which is shared with the creating process in multiprocessing and joblib
+    workers, so the block is still unlinked by its creator only.
+
+    Parameters
+    ----------
+    name : str
+        Name of the shared memory block
+
+    Returns
+    -------
+    multiprocessing.shared_memory.SharedMemory
+        Open shared memory block
+    """
+    try:
+        # Python >= 3.13, the block stays owned by the process that created it
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _attach(handle):
+    """Array of a handle from _Backing.handle, in the buffer of this process.
+
+    Parameters
+    ----------
+    handle : tuple
+        (kind, name, mode, shape, dtype, offset, strides)
+
+    Returns
+    -------
+    array : numpy.ndarray
+        Array in the shared memory block or memory-mapped file
+    backing : _Backing
+        Buffer of the array
+    """
+    kind, name, mode, shape, dtype, offset, strides = handle
+    if kind == "shm":
+        shm = _open_shared(name)
+        buffer, size = shm.buf, shm.size
+    else:
+        shm = None
+        buffer = np.memmap(name, dtype=np.uint8, mode=mode)
+        size = buffer.size
+    array = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset, strides=strides)
+    address = np.frombuffer(buffer, dtype=np.uint8).__array_interface__["data"][0]
+    return array, _Backing(kind, name, address, size, mode=mode, shm=shm)
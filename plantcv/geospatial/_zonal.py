@@ -0,0 +1,1006 @@
+# PlantCV-geospatial zonal statistics engine
+import math
+import numpy as np
+import shapely
+from joblib import Parallel, delayed, effective_n_jobs
+from rasterio import features, windows
+from rasterio.enums import MergeAlg
+from plantcv.geospatial.images import LazyImage
+
+# Largest number of histogram bins assigned by comparing values with every bin edge
+_COMPARE_BINS = 32
+
+
+def _zone_window(geometry, transform, shape):
+    """Pixel window covering the bounds of a geometry, clipped to the raster.
+
+    Parameters
+    ----------
+    geometry : shapely.geometry.base.BaseGeometry
+        Polygon or MultiPolygon in the CRS of the raster
+    transform : affine.Affine
+        Affine transform of the raster
+    shape : tuple
+        Raster shape (rows, columns)
+
+    Returns
+    -------
+    tuple or None
+        (row_start, row_stop, col_start, col_stop), or None if the geometry is
+        empty or falls outside of the raster
+    """
+    if geometry is None or geometry.is_empty:
+        return None
+    minx, miny, maxx, maxy = geometry.bounds
+    inverse = ~transform
+    cols, rows = zip(*[inverse * corner for corner in
+                       ((minx, miny), (minx, maxy), (maxx, miny), (maxx, maxy))])
+    row_start = max(int(math.floor(min(rows))), 0)
+    row_stop = min(int(math.ceil(max(rows))), shape[0])
+    col_start = max(int(math.floor(min(cols))), 0)
+    col_stop = min(int(math.ceil(max(cols))), shape[1])
+    if row_start >= row_stop or col_start >= col_stop:
+        return None
+    return row_start, row_stop, col_start, col_stop
+
+
+def _overlapping_windows(zone_windows):
+    """Flag the zones whose pixel window intersects the window of another zone.
+
+    Parameters
+    ----------
+    zone_windows : numpy.ndarray
+        (row_start, row_stop, col_start, col_stop) of every zone, all zero for empty zones
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean flag of every zone
+    """
+    overlapping = np.zeros(len(zone_windows), dtype=bool)
+    nonempty = np.flatnonzero(zone_windows[:, 0] < zone_windows[:, 1])
+    if len(nonempty) < 2:
+        return overlapping
+    # Windows are half-open, shrink the boxes so windows that only share an edge do not intersect
+    rows0, rows1, cols0, cols1 = zone_windows[nonempty].T
+    boxes = shapely.box(cols0, rows0, cols1 - 0.5, rows1 - 0.5)
+    first, second = shapely.STRtree(boxes).query(boxes, predicate="intersects")
+    overlapping[nonempty[first[first != second]]] = True
+    return overlapping
+
+
+class _Zones:
+    """Zone polygons rasterized tile by tile onto the pixel grid of a raster."""
+
+    def __init__(self, geometries, transform, shape, all_touched=False, tile_size=1024):
+        """Prepare zone polygons for rasterization, one tile of a fixed grid at a time.
+
+        Every tile is burned with a single rasterize call into a label raster (zone i is
+        labelled i + 1). Zones sharing pixels with another zone within a tile are left out of
+        the labels and keep their full footprint in the tile as local pixel indices instead.
+        The tile grid is anchored at the top left pixel, so in-memory and lazily read images
+        of the same grid are reduced tile by tile in the same order.
+
+        Parameters
+        ----------
+        geometries : iterable of shapely.geometry.base.BaseGeometry
+            Polygons in the CRS of the raster, one per zone
+        transform : affine.Affine
+            Affine transform of the raster
+        shape : tuple
+            Raster shape (rows, columns)
+        all_touched : bool, optional
+            Include every pixel touched by a polygon, by default False
+        tile_size : int, optional
+            Edge length in pixels of the tiles, by default 1024
+        """
+        self.geometries = list(geometries)
+        self.transform = transform
+        self.shape = tuple(shape[:2])
+        self.all_touched = all_touched
+        self.tile_size = tile_size
+        self.n_zones = len(self.geometries)
+        self.windows = np.array([_zone_window(geometry, transform, self.shape) or (0, 0, 0, 0)
+                                 for geometry in self.geometries], dtype=np.int64).reshape(-1, 4)
+        self.overlapping = _overlapping_windows(self.windows)
+        # Zone i is labelled i + 1, 0 is background
+        self.label_dtype = np.min_scalar_type(self.n_zones)
+        # Flat indices of the full raster fit in 32 bits for rasters of up to 4 gigapixels
+        self.index_dtype = np.uint32 if self.shape[0] * self.shape[1] <= 1 << 32 else np.int64
+        self.labels = None
+        self.pixels = None
+        self.offsets = None
+
+    def tile_windows(self):
+        """Tiles of the grid covering the window of at least one zone, in row-major order.
+
+        Returns
+        -------
+        list
+            (row_start, row_stop, col_start, col_stop) of every tile
+        """
+        height, width = self.shape
+        size = self.tile_size
+        covered = np.zeros((-(-height // size), -(-width // size)), dtype=bool)
+        for row_start, row_stop, col_start, col_stop in self.windows[self.windows[:, 0] < self.windows[:, 1]]:
+            covered[row_start // size:(row_stop - 1) // size + 1, col_start // size:(col_stop - 1) // size + 1] = True
+        return [(row * size, min((row + 1) * size, height), col * size, min((col + 1) * size, width))
+                for row, col in zip(*np.nonzero(covered))]
+
+    def _candidates(self, window):
+        """Zones whose pixel window intersects a tile.
+
+        Parameters
+        ----------
+        window : tuple
+            (row_start, row_stop, col_start, col_stop) of the tile
+
+        Returns
+        -------
+        numpy.ndarray
+            Zone indices, in ascending order
+        """
+        row_start, row_stop, col_start, col_stop = window
+        zone_windows = self.windows
+        return np.flatnonzero((zone_windows[:, 0] < row_stop) & (zone_windows[:, 1] > row_start) &
+                              (zone_windows[:, 2] < col_stop) & (zone_windows[:, 3] > col_start))
+
+    def tile(self, window):
+        """Zone labels and footprints of overlapping zones in one tile.
+
+        Parameters
+        ----------
+        window : tuple
+            (row_start, row_stop, col_start, col_stop) of a tile from tile_windows
+
+        Returns
+        -------
+        labels : numpy.ndarray
+            Label raster of the tile, zone i is labelled i + 1
+        overlaps : list
+            (zone, local row-major pixel indices) of the zones left out of labels
+        """
+        if self.labels is None:
+            return self._rasterize_tile(window)
+        row_start, row_stop, col_start, col_stop = window
+        width = col_stop - col_start
+        overlaps = []
+        for zone in self._candidates(window):
+            footprint = self.pixels[self.offsets[zone]:self.offsets[zone + 1]]
+            if not len(footprint):
+                continue
+            rows, cols = np.divmod(footprint, self.shape[1])
+            inside = (rows >= row_start) & (rows < row_stop) & (cols >= col_start) & (cols < col_stop)
+            if inside.any():
+                local = (rows[inside].astype(np.int64) - row_start) * width + cols[inside].astype(np.int64) - col_start
+                overlaps.append((zone, local.astype(np.int32)))
+        return self.labels[row_start:row_stop, col_start:col_stop], overlaps
+
+    def _rasterize_tile(self, window):
+        """Burn the zones intersecting a tile into a label raster.
+
+        Parameters
+        ----------
+        window : tuple
+            (row_start, row_stop, col_start, col_stop) of the tile
+
+        Returns
+        -------
+        tuple
+            Label raster and overlapping zone footprints of the tile, as tile
+        """
+        row_start, row_stop, col_start, col_stop = window
+        shape = (row_stop - row_start, col_stop - col_start)
+        labels = np.zeros(shape, dtype=self.label_dtype)
+        candidates = self._candidates(window)
+        if not len(candidates):
+            return labels, []
+        transform = self.transform * self.transform.translation(col_start, row_start)
+        features.rasterize([(self.geometries[zone], zone + 1) for zone in candidates], out=labels,
+                           transform=transform, all_touched=self.all_touched)
+        suspects = candidates[self.overlapping[candidates]]
+        if not len(suspects):
+            return labels, []
+        # Pixels burned by more than one zone
+        shared = features.rasterize([(self.geometries[zone], 1) for zone in suspects], out_shape=shape,
+                                    transform=transform, fill=0, dtype="uint16", all_touched=self.all_touched,
+                                    merge_alg=MergeAlg.add) > 1
+        if not shared.any():
+            return labels, []
+        overlaps = []
+        left_out = np.zeros(self.n_zones + 1, dtype=bool)
+        for zone in suspects:
+            zone_rows = slice(max(self.windows[zone, 0] - row_start, 0), min(self.windows[zone, 1] - row_start, shape[0]))
+            zone_cols = slice(max(self.windows[zone, 2] - col_start, 0), min(self.windows[zone, 3] - col_start, shape[1]))
+            if not shared[zone_rows, zone_cols].any():
+                continue
+            # Burned with the transform of the tile, so the footprint matches the combined burn
+            burned = features.rasterize([(self.geometries[zone], 1)], out_shape=(zone_rows.stop, zone_cols.stop),
+                                        transform=transform, fill=0, dtype="uint8", all_touched=self.all_touched)
+            rows, cols = np.nonzero(burned[zone_rows, zone_cols])
+            overlaps.append((zone, ((rows + zone_rows.start) * shape[1] + cols + zone_cols.start).astype(np.int32)))
+            left_out[zone + 1] = True
+        labels[left_out[labels]] = 0
+        return labels, overlaps
+
+    def rasterize(self):
+        """Rasterize every tile once and keep the result for the full raster.
+
+        Sets labels (label raster of the full raster), and pixels and offsets (flat indices of
+        the zones left out of labels, zone i owns pixels[offsets[i]:offsets[i + 1]]).
+
+        Returns
+        -------
+        _Zones
+            The zones, with their label raster
+        """
+        if self.labels is not None:
+            return self
+        width = self.shape[1]
+        labels = np.zeros(self.shape, dtype=self.label_dtype)
+        footprints = [[] for _ in range(self.n_zones)]
+        for window in self.tile_windows():
+            row_start, row_stop, col_start, col_stop = window
+            labels[row_start:row_stop, col_start:col_stop], overlaps = self._rasterize_tile(window)
+            for zone, local in overlaps:
+                rows, cols = np.divmod(local, col_stop - col_start)
+                footprints[zone].append((rows + row_start).astype(self.index_dtype) * width + (cols + col_start))
+        offsets = np.zeros(self.n_zones + 1, dtype=np.int64)
+        np.cumsum([sum(len(piece) for piece in pieces) for pieces in footprints], out=offsets[1:])
+        pixels = np.empty(offsets[-1], dtype=self.index_dtype)
+        for zone, pieces in enumerate(footprints):
+            if pieces:
+                pixels[offsets[zone]:offsets[zone + 1]] = np.sort(np.concatenate(pieces))
+        self.labels, self.pixels, self.offsets = labels, pixels, offsets
+        return self
+
+
+def _map_tiles(tile_func, zones, n_jobs=1, backend="threading", **kwargs):
+    """Apply a function to every tile of the zones, in parallel over runs of consecutive tiles.
+
+    Parameters
+    ----------
+    tile_func : callable
+        Called as tile_func(zones, window, **kwargs) for each tile from zones.tile_windows
+    zones : _Zones
+        Rasterized zones
+    n_jobs : int, optional
+        Number of joblib workers, default is 1
+    backend : str, optional
+        joblib backend, default is "threading"
+    **kwargs
+        Passed to tile_func
+
+    Yields
+    ------
+    object
+        Result of tile_func for each tile, in tile order
+    """
+    tile_windows = zones.tile_windows()
+    n_parts = min(len(tile_windows), effective_n_jobs(n_jobs))
+    if n_parts < 2:
+        for window in tile_windows:
+            yield tile_func(zones, window, **kwargs)
+        return
+    parts = np.array_split(np.arange(len(tile_windows)), n_parts)
+    results = Parallel(n_jobs=n_jobs, backend=backend, return_as="generator")(
+        delayed(_apply_tiles)(tile_func, zones, [tile_windows[i] for i in part], **kwargs) for part in parts)
+    for part in results:
+        yield from part
+
+
+def _apply_tiles(tile_func, zones, tile_windows, **kwargs):
+    """Apply a function to a run of tiles.
+
+    Parameters
+    ----------
+    tile_func : callable
+        Called as tile_func(zones, window, **kwargs) for each tile
+    zones : _Zones
+        Rasterized zones
+    tile_windows : list
+        (row_start, row_stop, col_start, col_stop) of the tiles
+    **kwargs
+        Passed to tile_func
+
+    Returns
+    -------
+    list
+        Result of tile_func for each tile
+    """
+    return [tile_func(zones, window, **kwargs) for window in tile_windows]
+
+
+def _gather(values, pixels):
+    """Gather the pixels of a 2D (or 3D, channels last) array by flat index.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Raster data with shape (rows, columns) or (rows, columns, channels)
+    pixels : numpy.ndarray
+        Flat pixel indices
+
+    Returns
+    -------
+    numpy.ndarray
+        Gathered values, shape (n,) or (n, channels)
+    """
+    values = np.asarray(values)
+    if values.flags.c_contiguous:
+        return values.reshape(values.shape[0] * values.shape[1], -1)[pixels].reshape(
+            (len(pixels),) + values.shape[2:])
+    return values[np.unravel_index(pixels, values.shape[:2])]
+
+
+def _valid(vals, nodata=None):
+    """Mask of values that are neither nodata nor NaN.
+
+    Parameters
+    ----------
+    vals : numpy.ndarray
+        Pixel values
+    nodata : float, optional
+        Value representing missing data
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean mask of valid values
+    """
+    if np.issubdtype(vals.dtype, np.floating):
+        valid = ~np.isnan(vals)
+    else:
+        valid = np.ones(vals.shape, dtype=bool)
+    if nodata is not None and not np.isnan(nodata):
+        valid &= vals != nodata
+    return valid
+
+
+def _tile_pixels(values, labels, overlaps, keep):
+    """Kept zone pixels of one tile and the zone of each pixel.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Tile data with shape (rows, columns) or (rows, columns, channels)
+    labels : numpy.ndarray
+        Label raster of the tile, from _Zones.tile
+    overlaps : list
+        Footprints of the zones left out of labels, from _Zones.tile
+    keep : numpy.ndarray
+        Boolean mask of the pixels to keep, with shape (rows, columns)
+
+    Returns
+    -------
+    vals : numpy.ndarray
+        Kept values, shape (n,) or (n, channels)
+    labels : numpy.ndarray
+        Zone index of each value
+    """
+    inside = keep & (labels != 0)
+    vals = [values[inside]]
+    zone_labels = [np.subtract(labels[inside], 1, dtype=np.intp)]
+    for zone, local in overlaps:
+        local = local[_gather(keep, local)]
+        vals.append(_gather(values, local))
+        zone_labels.append(np.full(len(local), zone, dtype=np.intp))
+    if len(vals) == 1:
+        return vals[0], zone_labels[0]
+    return np.concatenate(vals), np.concatenate(zone_labels)
+
+
+def _tile_values(values, labels, overlaps, nodata=None, mask=None):
+    """Valid zone values of one tile and the zone of each value.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Single band tile data with shape (rows, columns)
+    labels : numpy.ndarray
+        Label raster of the tile, from _Zones.tile
+    overlaps : list
+        Footprints of the zones left out of labels, from _Zones.tile
+    nodata : float, optional
+        Value representing missing data, NaN is always treated as missing
+    mask : numpy.ndarray, optional
+        Binary mask of the tile, only pixels with a non-zero mask value are kept
+
+    Returns
+    -------
+    vals : numpy.ndarray
+        Valid pixel values
+    labels : numpy.ndarray
+        Zone index of each value
+    """
+    keep = _valid(values, nodata)
+    if mask is not None:
+        keep &= mask != 0
+    return _tile_pixels(values, labels, overlaps, keep)
+
+
+def _read_tile(img, window, func=None):
+    """Single band values of one tile of an in-memory array or of a lazily read image.
+
+    Parameters
+    ----------
+    img : numpy.ndarray, plantcv.geospatial.LazyGEO or plantcv.geospatial.LazyDSM
+        Values (2D, or 3D using the first band), or a lazily read image
+    window : tuple
+        (row_start, row_stop, col_start, col_stop) of the tile
+    func : callable, optional
+        Converts a tile read from a lazily read image into a 2D array of values, default is the first band
+
+    Returns
+    -------
+    numpy.ndarray
+        Values of the tile with shape (rows, columns)
+    """
+    row_start, row_stop, col_start, col_stop = window
+    if isinstance(img, LazyImage):
+        tile = img.read(windows.Window(col_start, row_start, col_stop - col_start, row_stop - row_start))
+        return func(tile) if func is not None else np.asarray(tile)[:, :, 0]
+    values = img[row_start:row_stop, col_start:col_stop]
+    return values[:, :, 0] if values.ndim == 3 else values
+
+
+def _zone_values(values, zones, nodata=None, mask=None):
+    """Collect the valid pixel values of every zone.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Single band raster with shape (rows, columns)
+    zones : _Zones
+        Rasterized zones on the grid of values
+    nodata : float, optional
+        Value representing missing data, NaN is always treated as missing
+    mask : numpy.ndarray, optional
+        Binary mask, only pixels with a non-zero mask value are kept
+
+    Returns
+    -------
+    vals : numpy.ndarray
+        Valid pixel values, in tile order
+    labels : numpy.ndarray
+        Zone index of each value
+    """
+    vals, labels = [np.empty(0, dtype=values.dtype)], [np.empty(0, dtype=np.intp)]
+    for window in zones.tile_windows():
+        row_start, row_stop, col_start, col_stop = window
+        tile_vals, tile_labels = _tile_values(values[row_start:row_stop, col_start:col_stop], *zones.tile(window),
+                                              nodata=nodata,
+                                              mask=None if mask is None else mask[row_start:row_stop, col_start:col_stop])
+        vals.append(tile_vals)
+        labels.append(tile_labels)
+    return np.concatenate(vals), np.concatenate(labels)
+
+
+def _bin_index(vals, bins, histrange):
+    """Histogram bin of each value, matching numpy.histogram with equal bins.
+
+    Parameters
+    ----------
+    vals : numpy.ndarray
+        Values to bin
+    bins : int
+        Number of bins
+    histrange : tuple
+        Range of the histogram, format (min, max)
+
+    Returns
+    -------
+    indices : numpy.ndarray
+        Bin index of each value, -1 for values outside of the range
+    bin_edges : numpy.ndarray
+        Histogram bin edges
+    """
+    first_edge, last_edge = histrange
+    if first_edge == last_edge:
+        first_edge, last_edge = first_edge - 0.5, last_edge + 0.5
+    bin_type = np.result_type(first_edge, last_edge, vals)
+    if np.issubdtype(bin_type, np.integer):
+        bin_type = np.result_type(bin_type, float)
+    bin_edges = np.linspace(first_edge, last_edge, bins + 1, endpoint=True, dtype=bin_type)
+
+    keep = (vals >= first_edge) & (vals <= last_edge)
+    if bins <= _COMPARE_BINS:
+        # Count the inner edges at or below each value, the bin numpy.histogram assigns after
+        # correcting its estimate, with a few cheap comparisons instead of the arithmetic
+        cast = vals.astype(bin_type, copy=False)
+        indices = np.zeros(vals.shape, dtype=np.int16)
+        for edge in bin_edges[1:-1]:
+            indices += cast >= edge
+        if not keep.all():
+            indices[~keep] = -1
+        return indices, bin_edges
+    kept = vals[keep].astype(bin_type, copy=False)
+    idx = ((kept - first_edge) / (last_edge - first_edge) * bins).astype(np.intp)
+    idx[idx == bins] -= 1
+    # Correct the ~1 ULP inconsistencies at bin edges as numpy.histogram does
+    idx[kept < bin_edges[idx]] -= 1
+    idx[(kept >= bin_edges[idx + 1]) & (idx != bins - 1)] += 1
+    indices = np.full(vals.shape, -1, dtype=np.intp)
+    indices[keep] = idx
+    return indices, bin_edges
+
+
+def _sort_by_zone(vals, labels):
+    """Order values by zone, then by value.
+
+    Values of up to 32 bits are packed with their zone into a single uint64 key,
+    which sorts much faster than a lexsort. Wider values use a lexsort.
+
+    Parameters
+    ----------
+    vals : numpy.ndarray
+        Valid (not NaN) pixel values
+    labels : numpy.ndarray
+        Zone index of each value
+
+    Returns
+    -------
+    numpy.ndarray
+        Values sorted by zone then value
+    """
+    if vals.dtype.itemsize > 4 or vals.dtype.kind not in "fiu":
+        return vals[np.lexsort((vals, labels))]
+    if vals.dtype.kind == "f":
+        # Order preserving unsigned key of each float: flip all bits of negative
+        # values and the sign bit of positive values
+        bits = vals.astype(np.float32).view(np.uint32)
+        keys = np.where(bits & 0x80000000, ~bits, bits | 0x80000000)
+    else:
+        keys = vals.astype(np.int64) - np.iinfo(vals.dtype).min
+    packed = (labels.astype(np.uint64) << np.uint64(32)) | keys.astype(np.uint64)
+    packed.sort()
+    keys = (packed & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    if vals.dtype.kind == "f":
+        bits = np.where(keys & 0x80000000, keys ^ 0x80000000, ~keys).astype(np.uint32)
+        return bits.view(np.float32).astype(vals.dtype)
+    return (keys.astype(np.int64) + np.iinfo(vals.dtype).min).astype(vals.dtype)
+
+
+def _zonal_percentiles(vals, labels, count, percentiles):
+    """Any number of percentiles for every zone from a single sort.
+
+    Values are ordered by zone then value once, and every requested
+    percentile of every zone is interpolated in one vectorized step. Results are
+    identical to numpy.percentile (linear method) on the values of each zone.
+
+    Parameters
+    ----------
+    vals : numpy.ndarray
+        Valid pixel values
+    labels : numpy.ndarray
+        Zone index of each value
+    count : numpy.ndarray
+        Number of values in each zone
+    percentiles : iterable of float
+        Percentiles [0-100] to calculate
+
+    Returns
+    -------
+    dict
+        Arrays of length n_zones keyed by "percentile_<q>", NaN for empty zones
+    """
+    return _sorted_percentiles(_sort_by_zone(vals, labels), count, percentiles)
+
+
+def _sorted_percentiles(ordered, count, percentiles):
+    """Any number of percentiles for every zone from values sorted by zone, then by value.
+
+    Parameters
+    ----------
+    ordered : numpy.ndarray
+        Valid pixel values sorted by zone, then by value
+    count : numpy.ndarray
+        Number of values in each zone
+    percentiles : iterable of float
+        Percentiles [0-100] to calculate
+
+    Returns
+    -------
+    dict
+        Arrays of length n_zones keyed by "percentile_<q>", NaN for empty zones
+    """
+    out = {}
+    nonempty = np.flatnonzero(count)
+    starts = np.concatenate(([0], np.cumsum(count)[:-1]))[nonempty]
+    last = count[nonempty] - 1
+    for q in percentiles:
+        # Python scalars promote weakly in numpy.percentile, so the interpolation
+        # weight takes the precision of the values (e.g. float32)
+        weak = type(q) in (int, float)
+        weight_type = ordered.dtype if weak and np.issubdtype(ordered.dtype, np.floating) else np.float64
+        virtual = last * np.true_divide(q, 100)
+        previous = np.floor(virtual)
+        gamma = virtual - previous
+        previous = np.minimum(previous.astype(np.intp), last)
+        following = np.minimum(previous + 1, last)
+        low, high = ordered[starts + previous], ordered[starts + following]
+        # Linear interpolation as numpy's _lerp, from whichever bound is closer
+        diff = high - low
+        result = low + diff * gamma.astype(weight_type)
+        result = np.where(gamma >= 0.5, high - diff * (1 - gamma).astype(weight_type), result)
+        out[f"percentile_{q}"] = np.full(len(count), np.nan)
+        out[f"percentile_{q}"][nonempty] = result
+    return out
+
+
+def _zonal_stats(vals, labels, n_zones, stats=("mean", "std"), bins=10, histrange=None, percentiles=()):
+    """Summary statistics for every zone in one vectorized pass.
+
+    Parameters
+    ----------
+    vals : numpy.ndarray
+        Valid pixel values
+    labels : numpy.ndarray
+        Zone index of each value
+    n_zones : int
+        Number of zones
+    stats : iterable of str, optional
+        Any of "count", "sum", "mean", "std", "min", "max", "median", "histogram"
+    bins : int, optional
+        Number of histogram bins, by default 10
+    histrange : tuple, optional
+        Histogram range, format (min, max). Defaults to the range of all values
+    percentiles : iterable of float, optional
+        Percentiles [0-100] to calculate, stored as "percentile_<q>"
+
+    Returns
+    -------
+    dict
+        Arrays of length n_zones keyed by statistic. Empty zones are NaN, except
+        for "count" (0) and "histogram" (all zero counts).
+    """
+    if "histogram" in stats and histrange is None:
+        histrange = (vals.min(), vals.max()) if len(vals) else (0, 1)
+    accumulator = _ZonalAccumulator(n_zones, stats=stats, bins=bins, histrange=histrange, percentiles=percentiles)
+    accumulator.update(vals, labels)
+    return accumulator.result()
+
+
+def _zonal_partial(vals, labels, n_zones, stats=("mean", "std"), bins=10, histrange=None, percentiles=()):
+    """Statistics of every zone over the values of one tile, to be merged by _ZonalAccumulator.
+
+    Parameters
+    ----------
+    vals : numpy.ndarray
+        Valid pixel values
+    labels : numpy.ndarray
+        Zone index of each value
+    n_zones : int
+        Number of zones
+    stats : iterable of str, optional
+        Any of "count", "sum", "mean", "std", "min", "max", "median", "histogram"
+    bins : int, optional
+        Number of histogram bins, by default 10
+    histrange : tuple, optional
+        Histogram range, format (min, max). Required for "histogram"
+    percentiles : iterable of float, optional
+        Percentiles [0-100] to calculate, the values are kept for them
+
+    Returns
+    -------
+    dict
+        Per-zone "count" and the partial results needed for the requested statistics
+    """
+    stats = set(stats)
+    count = np.bincount(labels, minlength=n_zones)
+    partial = {"count": count}
+    if stats & {"sum", "mean", "std"}:
+        weights = vals.astype(np.float64, copy=False)
+        partial["sum"] = np.bincount(labels, weights=weights, minlength=n_zones)
+    if "std" in stats:
+        # Squared deviations from the mean of the tile
+        nonempty = count > 0
+        mean = np.zeros(n_zones)
+        mean[nonempty] = partial["sum"][nonempty] / count[nonempty]
+        deviation = mean.take(labels)
+        np.subtract(weights, deviation, out=deviation)
+        deviation *= deviation
+        partial["mean"] = mean
+        partial["sum_squares"] = np.bincount(labels, weights=deviation, minlength=n_zones)
+    for name, ufunc in (("min", np.fmin), ("max", np.fmax)):
+        if name in stats:
+            partial[name] = np.full(n_zones, np.nan)
+            ufunc.at(partial[name], labels, vals)
+    if "histogram" in stats:
+        indices, partial["bin_edges"] = _bin_index(vals, bins, histrange)
+        keep = indices >= 0
+        binned = labels * bins + indices if keep.all() else labels[keep] * bins + indices[keep]
+        partial["histogram"] = np.bincount(binned, minlength=n_zones * bins).reshape(n_zones, bins)
+    if percentiles or "median" in stats:
+        partial["values"] = (vals, labels.astype(np.min_scalar_type(max(n_zones - 1, 0))))
+    return partial
+
+
+class _ZonalAccumulator:
+    """Per-zone statistics merged from partial (tile) results."""
+
+    def __init__(self, n_zones, stats=("mean", "std"), bins=10, histrange=None, percentiles=()):
+        """Accumulate the statistics of _zonal_stats over many tiles.
+
+        Count, sum, histograms, min and max are merged exactly. Standard deviations are
+        merged from per-tile sums of squared deviations (Chan et al.), so results only
+        depend on the values of each tile and the order of the tiles. Percentiles and
+        medians need every value, so the valid zone values are kept for them.
+
+        Parameters
+        ----------
+        n_zones : int
+            Number of zones
+        stats : iterable of str, optional
+            Any of "count", "sum", "mean", "std", "min", "max", "median", "histogram"
+        bins : int, optional
+            Number of histogram bins, by default 10
+        histrange : tuple, optional
+            Histogram range, format (min, max). Required for "histogram"
+        percentiles : iterable of float, optional
+            Percentiles [0-100] to calculate, stored as "percentile_<q>"
+        """
+        self.n_zones = n_zones
+        self.stats = set(stats)
+        self.bins = bins
+        self.histrange = histrange
+        self.percentiles = list(percentiles)
+        self.count = np.zeros(n_zones, dtype=np.int64)
+        self.total = np.zeros(n_zones)
+        self.mean = np.zeros(n_zones)
+        self.sum_squares = np.zeros(n_zones)
+        self.min = np.full(n_zones, np.nan)
+        self.max = np.full(n_zones, np.nan)
+        self.histogram = np.zeros((n_zones, bins), dtype=np.int64)
+        self.bin_edges = None
+        self._values = []
+
+    def partial(self, vals, labels):
+        """Partial results of the values of one tile, see _zonal_partial.
+
+        Parameters
+        ----------
+        vals : numpy.ndarray
+            Valid pixel values
+        labels : numpy.ndarray
+            Zone index of each value
+
+        Returns
+        -------
+        dict
+            Partial results to merge
+        """
+        return _zonal_partial(vals, labels, self.n_zones, stats=self.stats, bins=self.bins,
+                              histrange=self.histrange, percentiles=self.percentiles)
+
+    def update(self, vals, labels):
+        """Add the values of one tile.
+
+        Parameters
+        ----------
+        vals : numpy.ndarray
+            Valid pixel values
+        labels : numpy.ndarray
+            Zone index of each value
+        """
+        self.merge(self.partial(vals, labels))
+
+    def merge(self, partial):
+        """Merge the partial results of one tile into the running totals.
+
+        Parameters
+        ----------
+        partial : dict
+            Partial results, from _zonal_partial
+        """
+        count = partial["count"]
+        if "sum" in partial:
+            self.total += partial["sum"]
+        if "sum_squares" in partial:
+            nonempty = count > 0
+            merged = self.count[nonempty] + count[nonempty]
+            delta = partial["mean"][nonempty] - self.mean[nonempty]
+            self.sum_squares[nonempty] += (partial["sum_squares"][nonempty] +
+                                           delta ** 2 * self.count[nonempty] * count[nonempty] / merged)
+            self.mean[nonempty] += delta * count[nonempty] / merged
+        self.count += count
+        for name, ufunc in (("min", np.fmin), ("max", np.fmax)):
+            if name in partial:
+                setattr(self, name, ufunc(getattr(self, name), partial[name]))
+        if "histogram" in partial:
+            self.histogram += partial["histogram"]
+            self.bin_edges = partial["bin_edges"]
+        if "values" in partial:
+            self._values.append(partial["values"])
+
+    def result(self):
+        """Merged per-zone statistics.
+
+        Returns
+        -------
+        dict
+            Arrays of length n_zones keyed by statistic, as returned by _zonal_stats
+        """
+        out = {}
+        nonempty = self.count > 0
+        if "count" in self.stats:
+            out["count"] = self.count
+        if "sum" in self.stats:
+            out["sum"] = np.where(nonempty, self.total, np.nan)
+        if "mean" in self.stats:
+            mean = np.full(self.n_zones, np.nan)
+            mean[nonempty] = self.total[nonempty] / self.count[nonempty]
+            out["mean"] = mean
+        if "std" in self.stats:
+            std = np.full(self.n_zones, np.nan)
+            std[nonempty] = np.sqrt(self.sum_squares[nonempty] / self.count[nonempty])
+            out["std"] = std
+        for name in ("min", "max"):
+            if name in self.stats:
+                out[name] = getattr(self, name)
+        if "histogram" in self.stats:
+            if self.bin_edges is None:
+                _, self.bin_edges = _bin_index(np.empty(0), self.bins, self.histrange)
+            out["histogram"], out["bin_edges"] = self.histogram, self.bin_edges
+        if self.percentiles or "median" in self.stats:
+            out.update(self._percentiles())
+        return out
+
+    def _grouped_values(self):
+        """Kept values of all tiles grouped by zone, releasing the values of each tile.
+
+        Returns
+        -------
+        numpy.ndarray
+            Values of zone i at [sum(count[:i]), sum(count[:i + 1]))
+        """
+        dtype = np.result_type(*[vals for vals, _ in self._values]) if self._values else np.float64
+        grouped = np.empty(int(self.count.sum()), dtype=dtype)
+        position = np.concatenate(([0], np.cumsum(self.count)[:-1]))
+        while self._values:
+            vals, labels = self._values.pop(0)
+            # Copy the run of values of each zone in the tile into the slots of the zone
+            vals = vals[np.argsort(labels, kind="stable")]
+            count = np.bincount(labels, minlength=self.n_zones)
+            start = 0
+            for zone in np.flatnonzero(count):
+                grouped[position[zone]:position[zone] + count[zone]] = vals[start:start + count[zone]]
+                start += count[zone]
+            position += count
+        return grouped
+
+    def _percentiles(self):
+        """Percentiles and median of every zone, sorting the values of each zone in place.
+
+        Returns
+        -------
+        dict
+            Arrays of length n_zones keyed by "percentile_<q>" (and "median")
+        """
+        percentiles = [*self.percentiles, 50] if "median" in self.stats else self.percentiles
+        grouped = self._grouped_values()
+        starts = np.concatenate(([0], np.cumsum(self.count)))
+        for zone in np.flatnonzero(self.count):
+            grouped[starts[zone]:starts[zone + 1]].sort()
+        out = _sorted_percentiles(grouped, self.count, percentiles)
+        if "median" in self.stats:
+            out["median"] = out["percentile_50"]
+        return out
+
+
+def _tile_stats(zones, window, img, nodata=None, mask=None, func=None, **kwargs):
+    """Partial statistics of the zones within one tile.
+
+    Parameters
+    ----------
+    zones : _Zones
+        Rasterized zones
+    window : tuple
+        (row_start, row_stop, col_start, col_stop) of the tile
+    img : numpy.ndarray, plantcv.geospatial.LazyGEO or plantcv.geospatial.LazyDSM
+        Values (2D, or 3D using the first band), or a lazily read image
+    nodata : float, optional
+        Value representing missing data, NaN is always treated as missing
+    mask : numpy.ndarray, optional
+        Binary mask covering the full image, only pixels with a non-zero mask value are kept
+    func : callable, optional
+        Converts a tile read from a lazily read image into a 2D array of values
+    **kwargs
+        Statistics to calculate, passed to _zonal_partial
+
+    Returns
+    -------
+    dict
+        Partial results of the tile
+    """
+    row_start, row_stop, col_start, col_stop = window
+    values = _read_tile(img, window, func=func)
+    if mask is not None:
+        mask = mask[row_start:row_stop, col_start:col_stop]
+    vals, labels = _tile_values(values, *zones.tile(window), nodata=nodata, mask=mask)
+    return _zonal_partial(vals, labels, zones.n_zones, **kwargs)
+
+
+def _image_zonal_stats(img, zones, nodata=None, mask=None, func=None, n_jobs=1, backend="threading", **kwargs):
+    """Zonal statistics of an in-memory array or of a lazily read image, one tile at a time.
+
+    In-memory arrays and lazily read images are reduced over the same tiles in the same
+    order, so both give identical results.
+
+    Parameters
+    ----------
+    img : numpy.ndarray, plantcv.geospatial.LazyGEO or plantcv.geospatial.LazyDSM
+        Values (2D, or 3D using the first band), or a lazily read image
+    zones : _Zones
+        Rasterized zones on the grid of the image, from PlotIndex.zones
+    nodata : float, optional
+        Value representing missing data, NaN is always treated as missing
+    mask : numpy.ndarray, optional
+        Binary mask, only pixels with a non-zero mask value are kept
+    func : callable, optional
+        Converts a tile read from a lazily read image into a 2D array of values
+    n_jobs : int, optional
+        Number of workers computing runs of tiles in parallel (joblib), default is 1
+    backend : str, optional
+        joblib backend, "threading" (numpy and GDAL release the GIL) or "loky" (processes,
+        large arrays are shared through memory mapping), default is "threading"
+    **kwargs
+        Statistics to calculate, passed to _ZonalAccumulator (histrange is required for histograms)
+
+    Returns
+    -------
+    dict
+        Arrays of length n_zones keyed by statistic
+    """
+    if not isinstance(img, LazyImage):
+        img = np.asarray(img)
+    accumulator = _ZonalAccumulator(zones.n_zones, **kwargs)
+    for partial in _map_tiles(_tile_stats, zones, n_jobs=n_jobs, backend=backend, img=img, nodata=nodata,
+                              mask=mask, func=func, **kwargs):
+        accumulator.merge(partial)
+    return accumulator.result()
+
+
+def _image_range(img, nodata=None, tile_size=1024):
+    """Range of the valid values of the first band of an in-memory or lazily read image.
+
+    Parameters
+    ----------
+    img : numpy.ndarray, plantcv.geospatial.LazyGEO or plantcv.geospatial.LazyDSM
+        Values (2D, or 3D using the first band), or a lazily read image
+    nodata : float, optional
+        Value representing missing data, NaN is always treated as missing
+    tile_size : int, optional
+        Target tile edge length in pixels of lazily read images, default is 1024
+
+    Returns
+    -------
+    tuple
+        (min, max) of the valid values
+    """
+    if isinstance(img, LazyImage):
+        ranges = [_image_range(tile, nodata=nodata) for _, tile in img.tiles(tile_size=tile_size)]
+        return min(low for low, _ in ranges), max(high for _, high in ranges)
+    values = np.asarray(img)
+    if values.ndim == 3:
+        values = values[:, :, 0]
+    # Reduce over the valid values without copying them
+    valid = _valid(values, nodata)
+    info = np.finfo(values.dtype) if np.issubdtype(values.dtype, np.floating) else np.iinfo(values.dtype)
+    return values.min(where=valid, initial=info.max), values.max(where=valid, initial=info.min)
+
+
+def _to_values(arr):
+    """Convert a per-zone statistic to a list of floats, with None for empty zones.
+
+    Parameters
+    ----------
+    arr : numpy.ndarray
+        Per-zone statistic
+
+    Returns
+    -------
+    list
+        Python floats, or None where the statistic is NaN
+    """
+    return [None if np.isnan(value) else float(value) for value in arr]
@@ -1,9 +1,13 @@
-from plantcv.geospatial.analyze.coverage import coverage
-from plantcv.geospatial.analyze.height import height_percentile
-from plantcv.geospatial.analyze.spectral import spectral_index
-from plantcv.geospatial.analyze.color import color
-from plantcv.geospatial.analyze.chm import chm
+from plantcv.geospatial._lazy import _attach
 
 
 __all__ = ["coverage", "height_percentile", "spectral_index", "color",
            "chm"]
+
+__getattr__, __dir__ = _attach(__name__, {
+    "coverage": ("plantcv.geospatial.analyze.coverage", "coverage"),
+    "height_percentile": ("plantcv.geospatial.analyze.height", "height_percentile"),
+    "spectral_index": ("plantcv.geospatial.analyze.spectral", "spectral_index"),
+    "color": ("plantcv.geospatial.analyze.color", "color"),
+    "chm": ("plantcv.geospatial.analyze.chm", "chm"),
+})
@@ -2,88 +2,87 @@
 import os
 import pandas as pd
 import altair as alt
-import numpy as np
-from plantcv.plantcv import outputs, params
+from plantcv.plantcv import params
 from plantcv.plantcv._debug import _debug
-from plantcv.geospatial._helpers import _histogram_stats, _gather_ids
-from rasterstats import zonal_stats
+from plantcv.geospatial._globals import plot_results, profiler
+from plantcv.geospatial._zonal import _image_zonal_stats, _image_range, _to_values
+from plantcv.geospatial.plot_index import _plot_index
 
 
-def chm(dsm, geojson, bins=10, label=None):
+def chm(dsm, geojson, bins=10, label=None, n_jobs=1, backend="threading"):
     """
     A function that analyzes height distribution in plots.
 
     Parameters
     ----------
-    chm : plantcv.geospatial.images.DSM object
-        Canopy height model, from geospatial.subtract_dsm
-    geojson : str
-        Path to the shape file containing the regions for analysis
+    chm : plantcv.geospatial.images.DSM or plantcv.geospatial.LazyDSM object
+        Canopy height model, from geospatial.subtract_dsm. A LazyDSM is analyzed tile by tile
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the regions for analysis, or a PlotIndex
     bins : int
         Number of bins for height distribution (default = 10).
     label : str, list, optional
         Optional label parameter, modifies the variable name of observations
         recorded (default = pcv.params.sample_label).
+    n_jobs : int, optional
+        Number of parallel workers, each computing a run of neighboring image tiles
+        (default = 1).
+    backend : str, optional
+        Parallel backend, "threading" or "loky" (processes) (default = "threading").
 
     """
     # Set label to params.sample_label if None
     if label is None:
         label = params.sample_label
-    # DSM tifs contain just one band of data, so make the array 2D
-    dsm_data = dsm[:, :, 0]
 
     # Set nodata value
     nodata_value = -999
     if dsm.nodata is not None:
         nodata_value = dsm.nodata
 
-    # Gather plot IDs from the geojson
-    ids = _gather_ids(geojson=geojson)
+    # Read the plots and gather plot IDs from the geojson
+    plots = _plot_index(img=dsm, geojson=geojson)
+    ids = plots.ids
 
-    # Calculate range of histogram
-    # First replace any nans so they do not affect range calculation
-    dsm[np.isnan(dsm)] = nodata_value
-    filtered = dsm[dsm != nodata_value]
-    histrange = (filtered.min(), filtered.max())
+    # Calculate range of histogram, ignoring nodata and NaN values
+    histrange = _image_range(dsm, nodata=nodata_value)
 
-    # Use raster stats to calculate distribution
-    height_values = zonal_stats(geojson, dsm_data,
-                                affine=dsm.transform,
-                                nodata=nodata_value, stats=['mean', 'std'],
-                                add_stats={'histogram': lambda x: _histogram_stats(x, bins=bins, histrange=histrange)})
+    # Rasterize the plots once and calculate the distribution of every plot in one pass
+    zones = plots.zones(dsm)
+    with profiler.stage("zonal_stats", "analyze.chm"):
+        height_values = _image_zonal_stats(dsm, zones, nodata=nodata_value,
+                                           stats=("count", "mean", "std", "histogram"), bins=bins, histrange=histrange,
+                                           n_jobs=n_jobs, backend=backend)
+    bin_edges = height_values["bin_edges"].tolist()
 
     # For debug graph
-    height_means = []
+    height_means = _to_values(height_values["mean"])
 
     # Output values
-    for i, id in enumerate(ids):
-        j = height_values[i]
-        # Add height to debug
-        height_means.append(j["mean"])
+    samples = [label + "_" + str(id) for id in ids]
+    plot_results.add(samples=samples,
+                     variable='height_frequencies',
+                     trait='height frequencies',
+                     method='plantcv-geospatial.analyze.chm',
+                     scale='frequency', datatype=list,
+                     value=height_values["histogram"], label=bin_edges)
+    plot_results.add(samples=samples,
+                     variable='height_mean',
+                     trait='height mean',
+                     method='plantcv-geospatial.analyze.chm',
+                     scale='units', datatype=float,
+                     value=height_values["mean"], label='none', empty=height_values["count"] == 0)
+    plot_results.add(samples=samples,
+                     variable='height_std',
+                     trait='height standard deviation',
+                     method='plantcv-geospatial.analyze.chm',
+                     scale='units', datatype=float,
+                     value=height_values["std"], label='none', empty=height_values["count"] == 0)
 
-        observation_sample = label + "_" + str(id)
-        outputs.add_observation(sample=observation_sample,
-                                variable='height_frequencies',
-                                trait='height frequencies',
-                                method='plantcv-geospatial.analyze.chm',
-                                scale='frequency', datatype=list,
-                                value=j["histogram"]["counts"], label=j["histogram"]["bin_edges"])
-        outputs.add_observation(sample=observation_sample,
-                                variable='height_mean',
-                                trait='height mean',
-                                method='plantcv-geospatial.analyze.chm',
-                                scale='units', datatype=float,
-                                value=j["mean"], label='none')
-        outputs.add_observation(sample=observation_sample,
-                                variable='height_std',
-                                trait='height standard deviation',
-                                method='plantcv-geospatial.analyze.chm',
-                                scale='units', datatype=float,
-                                value=j["std"], label='none')
+    with profiler.stage("debug", "analyze.chm"):
+        df = pd.DataFrame({'value': height_means})
+        height_chart = alt.Chart(df).mark_bar().encode(x=alt.X('value', bin=True, title='Mean Plot Height'),
+                                                       y=alt.Y('count()', title='Frequency'))
 
-    df = pd.DataFrame({'value': height_means})
-    height_chart = alt.Chart(df).mark_bar().encode(x=alt.X('value', bin=True, title='Mean Plot Height'),
-                                                   y=alt.Y('count()', title='Frequency'))
-
-    _debug(visual=height_chart, filename=os.path.join(params.debug_outdir, label + '_plot_height_mean.png'))
+        _debug(visual=height_chart, filename=os.path.join(params.debug_outdir, label + '_plot_height_mean.png'))
     return height_chart
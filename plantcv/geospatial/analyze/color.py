@@ -4,47 +4,108 @@ import os
 import numpy as np
 import pandas as pd
 import altair as alt
-from plantcv.plantcv import outputs, params
+from plantcv.plantcv import params
 from plantcv.plantcv._debug import _debug
-from plantcv.geospatial._helpers import _histogram_stats, _gather_ids
-from rasterstats import zonal_stats
-from scipy import stats
-from functools import partial
+from plantcv.geospatial._globals import plot_results, profiler
+from plantcv.geospatial._zonal import _zone_values, _image_zonal_stats, _bin_index, _map_tiles, _tile_pixels
+from plantcv.geospatial.plot_index import _plot_index
 
 
-def _hue_circ_stats(h):
-    """Function to calculate hue circular stats from the h channel of a masked image
+def _hue_circ_stats(hues, labels, n_zones, weights=None):
+    """Hue circular mean and standard deviation of every plot from per-plot sums of sin and cos
+
+    Matches scipy.stats.circmean and circstd (high=179, low=0) of the non-zero hues of each plot.
 
     Parameters
     ----------
-    h : np.ndarray
-        h channel from a masked image
+    hues : np.ndarray
+        Hue values (0 is treated as missing)
+    labels : np.ndarray
+        Plot index of each hue value
+    n_zones : int
+        Number of plots
+    weights : np.ndarray, optional
+        Number of occurrences of each hue value, e.g. flattened hue histograms
 
     Returns
     -------
     dict
-        dictionary with hue circular mean and standard deviation
+        dictionary with per-plot hue circular mean and standard deviation, NaN for plots without hues
     """
-    hue_circular_mean = stats.circmean(h[np.where(h > 0)], high=179, low=0) * 2
-    hue_circular_std = stats.circstd(h[np.where(h > 0)], high=179, low=0) * 2
+    keep = hues > 0
+    hues = hues[keep]
+    # Integer hues are scaled as float64, float hues keep their precision (as scipy does)
+    if np.issubdtype(hues.dtype, np.integer):
+        hues = hues.astype(np.float64)
+    angles = hues * ((2.0 * np.pi) / 179)
+    weights = None if weights is None else weights[keep]
+    count = np.bincount(labels[keep], weights=weights, minlength=n_zones)
+    sin_sum = np.bincount(labels[keep], weights=np.sin(angles) if weights is None else np.sin(angles) * weights,
+                          minlength=n_zones)
+    cos_sum = np.bincount(labels[keep], weights=np.cos(angles) if weights is None else np.cos(angles) * weights,
+                          minlength=n_zones)
+    hue_circular_mean = np.full(n_zones, np.nan)
+    hue_circular_std = np.full(n_zones, np.nan)
+    nonempty = count > 0
+    hue_circular_mean[nonempty] = (np.arctan2(sin_sum[nonempty], cos_sum[nonempty]) * (179 / (2.0 * np.pi))) % 179 * 2
+    sin_mean = sin_sum[nonempty] / count[nonempty]
+    cos_mean = cos_sum[nonempty] / count[nonempty]
+    # The mean resultant length can go slightly above 1 due to rounding errors
+    resultant = np.minimum((sin_mean ** 2. + cos_mean ** 2.) ** 0.5, 1.)
+    hue_circular_std[nonempty] = ((-2 * np.log(resultant)) ** 0.5 + 0.0) * (179 / (2.0 * np.pi)) * 2
 
     return {
-        'hue_circular_mean' : hue_circular_mean,
-        'hue_circular_std' : hue_circular_std
+        'hue_circular_mean': hue_circular_mean,
+        'hue_circular_std': hue_circular_std
     }
 
 
-def _channel_stats(img, mask, geojson, bins, channels, channel_ids, histrange, ids, label):
-    """Uses raster stats to calculate color summary stats and histograms from individual channels
+def _add_channel_observations(color_values, channel_id, ids, label):
+    """Save color summary stats and histograms of one channel to plot_results
+
+    Parameters
+    ----------
+    color_values : dict
+        Per-plot "count", "mean", "std", "histogram" and the shared "bin_edges"
+    channel_id : str
+        Name of the channel
+    ids : list
+        List of string names for ids in geojson, from PlotIndex.ids
+    label : str
+        Label to include as prefix
+    """
+    samples = [label + "_" + str(id) for id in ids]
+    plot_results.add(samples=samples,
+                     variable=channel_id + '_frequencies',
+                     trait=channel_id+' frequencies',
+                     method='plantcv-geospatial.analyze.color',
+                     scale='frequency', datatype=list,
+                     value=color_values["histogram"], label=color_values["bin_edges"].tolist())
+    plot_results.add(samples=samples,
+                     variable=channel_id + '_mean',
+                     trait=channel_id+' mean',
+                     method='plantcv-geospatial.analyze.color',
+                     scale='none', datatype=float,
+                     value=color_values["mean"], label='none', empty=color_values["count"] == 0)
+    plot_results.add(samples=samples,
+                     variable=channel_id + '_std',
+                     trait=channel_id+' standard deviation',
+                     method='plantcv-geospatial.analyze.color',
+                     scale='none', datatype=float,
+                     value=color_values["std"], label='none', empty=color_values["count"] == 0)
+
+
+def _channel_stats(img, mask, zones, bins, channels, channel_ids, histrange, ids, label, n_jobs=1, backend="threading"):
+    """Calculate color summary stats and histograms from individual channels
 
     Parameters
     ----------
     img : plantcv.geospatial.images.GEO object
-        geotif data, generally from read_geotif, used for affine metadata
+        geotif data, generally from read_geotif, used for nodata metadata
     mask : np.ndarray
         Binary mask with objects of interest segmented
-    geojson : str
-        Path to a shapefile containing plot boundaries
+    zones : plantcv.geospatial._zonal._Zones
+        Plots on the pixel grid of the image, returned from PlotIndex.zones
     bins : int
         Number of bins for the histogram
     channels : list
@@ -54,46 +115,204 @@ def _channel_stats(img, mask, geojson, bins, channels, channel_ids, histrange, i
     histrange : tuple
         Min and max of the range for the histogram
     ids : list
-        List of string names for ids in geojson, returned from _gather_ids
+        List of string names for ids in geojson, from PlotIndex.ids
     label : str
         Label to include as prefix
+    n_jobs : int, optional
+        Number of parallel workers, by default 1
+    backend : str, optional
+        Parallel backend, "threading" or "loky", by default "threading"
     """
     for idx, channel in enumerate(channels):
-        # Convert to float and fill in no data values required for zonal stats
-        nodata_val = getattr(img, 'nodata', None)
-        if nodata_val is None:
-            nodata_val = -999
-
-        channel = channel.astype(np.float32)
-        channel[mask == 0] = nodata_val
-        color_values = zonal_stats(geojson, channel,
-                                   affine=img.transform,
-                                   nodata=nodata_val, stats=['mean', 'std'],
-                                   add_stats={'histogram': lambda x: _histogram_stats(x, bins=bins, histrange=histrange)})
-        for i, id in enumerate(ids):
-            j = color_values[i]
-            observation_sample = label + "_" + str(id)
-            outputs.add_observation(sample=observation_sample,
-                                    variable=channel_ids[idx] + '_frequencies',
-                                    trait=channel_ids[idx]+' frequencies',
-                                    method='plantcv-geospatial.analyze.color',
-                                    scale='frequency', datatype=list,
-                                    value=j["histogram"]["counts"], label=j["histogram"]["bin_edges"])
-            outputs.add_observation(sample=observation_sample,
-                                    variable=channel_ids[idx] + '_mean',
-                                    trait=channel_ids[idx]+' mean',
-                                    method='plantcv-geospatial.analyze.color',
-                                    scale='none', datatype=float,
-                                    value=j["mean"], label='none')
-            outputs.add_observation(sample=observation_sample,
-                                    variable=channel_ids[idx] + '_std',
-                                    trait=channel_ids[idx]+' standard deviation',
-                                    method='plantcv-geospatial.analyze.color',
-                                    scale='none', datatype=float,
-                                    value=j["std"], label='none')
-
-
-def color(img, bin_mask, geojson, bins=10, colorspaces="hsv", label=None):
+        color_values = _image_zonal_stats(channel, zones, nodata=getattr(img, 'nodata', None), mask=mask,
+                                          stats=("count", "mean", "std", "histogram"), bins=bins, histrange=histrange,
+                                          n_jobs=n_jobs, backend=backend)
+        _add_channel_observations(color_values, channel_ids[idx], ids, label)
+
+
+def _color_channels(thumb, mask, zones, nodata=None, colorspaces="hsv"):
+    """Full size channels of a non 8-bit BGR image, and the hue values of each plot
+
+    Parameters
+    ----------
+    thumb : np.ndarray
+        BGR image, with shape (rows, columns, 3)
+    mask : np.ndarray
+        Binary mask with objects of interest segmented
+    zones : plantcv.geospatial._zonal._Zones
+        Plots on the pixel grid of the image, from PlotIndex.zones
+    nodata : float, optional
+        Value representing missing data
+    colorspaces : str, optional
+        Colorspaces to analyze: "all", "rgb", "lab", or "hsv"
+
+    Returns
+    -------
+    dict
+        Lists of channels keyed by colorspace, and the hue values and their plot labels under "hues"
+    """
+    # Make masked image to convert to other colorspaces
+    masked = cv2.bitwise_and(thumb, thumb, mask=mask)
+    h, s, v = cv2.split(cv2.cvtColor(masked, cv2.COLOR_BGR2HSV))
+    hues, labels = _zone_values(h, zones, nodata=nodata, mask=mask)
+    channel_sets = {"hues": (hues, labels),
+                    "HSV": [h, s, v]}
+    if colorspaces.upper() in ('RGB', 'ALL'):
+        channel_sets["RGB"] = list(cv2.split(masked))
+    if colorspaces.upper() in ('LAB', 'ALL'):
+        channel_sets["LAB"] = list(cv2.split(cv2.cvtColor(masked, cv2.COLOR_BGR2LAB)))
+    return channel_sets
+
+
+def _pixel_histograms(bgr, labels, n_zones, nodata=None, colorspaces="hsv"):
+    """Per-plot 256-bin histograms of every requested channel of 8-bit BGR plot pixels
+
+    Only the plot pixels are converted to other colorspaces, and every channel stays
+    uint8. The histograms of a channel are counted with a single combined plot x value
+    bincount.
+
+    Parameters
+    ----------
+    bgr : np.ndarray
+        8-bit BGR pixels, with shape (pixels, 3)
+    labels : np.ndarray
+        Plot index of each pixel
+    n_zones : int
+        Number of plots
+    nodata : float, optional
+        Value representing missing data, channel values equal to it are not counted
+    colorspaces : str, optional
+        Colorspaces to analyze: "all", "rgb", "lab", or "hsv". Hue is always included
+
+    Returns
+    -------
+    dict
+        Histograms with shape (n_plots, 256), keyed by channel name
+    """
+    # Convert the plot pixels only, as a (pixels x 1) image
+    hsv = np.zeros(bgr.shape, dtype=np.uint8)
+    if len(bgr):
+        hsv = cv2.cvtColor(bgr.reshape(-1, 1, 3), cv2.COLOR_BGR2HSV).reshape(-1, 3)
+    channels = {"hue": hsv[:, 0]}
+    if colorspaces.upper() in ('RGB', 'ALL'):
+        channels.update({"blue": bgr[:, 0], "green": bgr[:, 1], "red": bgr[:, 2]})
+    if colorspaces.upper() in ('LAB', 'ALL'):
+        lmy = np.zeros(bgr.shape, dtype=np.uint8)
+        if len(bgr):
+            lmy = cv2.cvtColor(bgr.reshape(-1, 1, 3), cv2.COLOR_BGR2LAB).reshape(-1, 3)
+        channels.update({"lightness": lmy[:, 0], "green-magenta": lmy[:, 1], "blue-yellow": lmy[:, 2]})
+    if colorspaces.upper() in ('HSV', 'ALL'):
+        channels.update({"saturation": hsv[:, 1], "value": hsv[:, 2]})
+    histograms = {}
+    for channel_id, values in channels.items():
+        histograms[channel_id] = np.bincount(labels * 256 + values, minlength=n_zones * 256).reshape(n_zones, 256)
+        # Values equal to nodata are missing data
+        if nodata is not None and nodata == int(nodata) and 0 <= nodata <= 255:
+            histograms[channel_id][:, int(nodata)] = 0
+    return histograms
+
+
+def _tile_color_histograms(zones, window, thumb, mask, nodata=None, colorspaces="hsv"):
+    """Per-plot 256-bin histograms of the plot pixels inside the mask within one tile
+
+    Parameters
+    ----------
+    zones : plantcv.geospatial._zonal._Zones
+        Plots on the pixel grid of the image, from PlotIndex.zones
+    window : tuple
+        (row_start, row_stop, col_start, col_stop) of the tile
+    thumb : np.ndarray
+        8-bit BGR image, with shape (rows, columns, 3)
+    mask : np.ndarray
+        Binary mask with objects of interest segmented
+    nodata : float, optional
+        Value representing missing data, channel values equal to it are not counted
+    colorspaces : str, optional
+        Colorspaces to analyze: "all", "rgb", "lab", or "hsv". Hue is always included
+
+    Returns
+    -------
+    dict
+        Histograms of the tile with shape (n_plots, 256), keyed by channel name
+    """
+    row_start, row_stop, col_start, col_stop = window
+    labels, overlaps = zones.tile(window)
+    bgr, labels = _tile_pixels(thumb[row_start:row_stop, col_start:col_stop], labels, overlaps,
+                               mask[row_start:row_stop, col_start:col_stop] != 0)
+    return _pixel_histograms(bgr, labels, zones.n_zones, nodata=nodata, colorspaces=colorspaces)
+
+
+def _color_histograms(thumb, zones, mask, nodata=None, colorspaces="hsv", n_jobs=1, backend="threading"):
+    """Per-plot 256-bin histograms of every requested channel of an 8-bit BGR image
+
+    Histograms are counted one tile at a time and summed.
+
+    Parameters
+    ----------
+    thumb : np.ndarray
+        8-bit BGR image, with shape (rows, columns, 3)
+    zones : plantcv.geospatial._zonal._Zones
+        Plots on the pixel grid of the image, from PlotIndex.zones
+    mask : np.ndarray
+        Binary mask with objects of interest segmented
+    nodata : float, optional
+        Value representing missing data, channel values equal to it are not counted
+    colorspaces : str, optional
+        Colorspaces to analyze: "all", "rgb", "lab", or "hsv". Hue is always included
+    n_jobs : int, optional
+        Number of parallel workers, by default 1
+    backend : str, optional
+        Parallel backend, "threading" or "loky", by default "threading"
+
+    Returns
+    -------
+    dict
+        Histograms with shape (n_plots, 256), keyed by channel name
+    """
+    histograms = _pixel_histograms(np.empty((0, 3), dtype=np.uint8), np.empty(0, dtype=np.intp), zones.n_zones,
+                                   colorspaces=colorspaces)
+    for tile_histograms in _map_tiles(_tile_color_histograms, zones, n_jobs=n_jobs, backend=backend,
+                                      thumb=np.asarray(thumb), mask=np.asarray(mask), nodata=nodata,
+                                      colorspaces=colorspaces):
+        for channel_id, histogram in tile_histograms.items():
+            histograms[channel_id] += histogram
+    return histograms
+
+
+def _histogram_color_stats(histogram, bins, histrange=(0, 255)):
+    """Means, standard deviations and binned frequencies of plots from their 256-bin histograms
+
+    Parameters
+    ----------
+    histogram : np.ndarray
+        Counts of each 8-bit value, with shape (n_plots, 256)
+    bins : int
+        Number of bins for the binned frequencies
+    histrange : tuple, optional
+        Range of the binned frequencies, by default (0, 255)
+
+    Returns
+    -------
+    dict
+        Per-plot "count", "mean", "std", "histogram" and the shared "bin_edges"
+    """
+    values = np.arange(256)
+    count = histogram.sum(axis=1)
+    nonempty = count > 0
+    mean = np.full(len(count), np.nan)
+    mean[nonempty] = (histogram[nonempty] @ values) / count[nonempty]
+    std = np.full(len(count), np.nan)
+    deviation = values[np.newaxis, :] - mean[nonempty, np.newaxis]
+    std[nonempty] = np.sqrt((histogram[nonempty] * deviation * deviation).sum(axis=1) / count[nonempty])
+    # Bin of each 8-bit value, exactly as values would be binned individually
+    indices, bin_edges = _bin_index(values.astype(np.uint8), bins, histrange)
+    binned = np.zeros((len(count), bins), dtype=histogram.dtype)
+    inside = indices >= 0
+    np.add.at(binned.T, indices[inside], histogram[:, inside].T)
+    return {"count": count, "mean": mean, "std": std, "histogram": binned, "bin_edges": bin_edges}
+
+
+def color(img, bin_mask, geojson, bins=10, colorspaces="hsv", label=None, n_jobs=1, backend="threading"):
     """Analyze color in individual plots from a spectral object using plot boundaries.
 
     Parameters
@@ -102,84 +321,77 @@ def color(img, bin_mask, geojson, bins=10, colorspaces="hsv", label=None):
         geotif data, generally from read_geotif, used for affine metadata
     bin_mask : np.ndarray
         Binary mask with objects of interest segmented
-    geojson : str
-        Path to a shapefile containing plot boundaries
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to a shapefile containing plot boundaries, or a PlotIndex
     bins : int
         Number of bins for the histogram, default=10
     colorspaces : str, optional
         Colorspaces to analyze (case-insensitive): "all", "rgb", "lab", or "hsv", by default "hsv"
     label : str, optional
         Optional label for plots, by default None
+    n_jobs : int, optional
+        Number of parallel workers, each computing a run of neighboring image tiles,
+        by default 1
+    backend : str, optional
+        Parallel backend, "threading" or "loky" (processes), by default "threading"
 
     """
     # Set label to params.sample_label if None
     if label is None:
         label = params.sample_label
 
-    # Make masked image to convert to other colorspaces
-    masked = cv2.bitwise_and(img.thumb, img.thumb, mask=bin_mask)
-
-    # Always output hue circular stats:
-
-    # Convert the BGR image to HSV
-    hsv = cv2.cvtColor(masked, cv2.COLOR_BGR2HSV)
-    # Extract the hue, saturation, and value channels
-    h, s, v = cv2.split(hsv)
-
-    h = h.astype(np.float32)
-
-    nodata_val = getattr(img, 'nodata', None)
-    if nodata_val is None:
-        nodata_val = -999
-
-    h[bin_mask == 0] = nodata_val
-
-    ids = _gather_ids(geojson=geojson)
-
-    hcm = []
-    hue_stats = zonal_stats(geojson, h,
-                            affine=img.transform,
-                            nodata=nodata_val, stats=['mean'],
-                            add_stats={'hue_stats': partial(_hue_circ_stats)})
-
-    for idx, i in enumerate(hue_stats):
-        observation_sample = label + "_" + str(ids[idx])
-        hcm.append(i["hue_stats"]["hue_circular_mean"])
-        outputs.add_observation(sample=observation_sample,
-                                variable='hue_circular_mean',
-                                trait='hue circular mean', method='plantcv-geospatial.analyze.color',
-                                scale='degrees', datatype=float,
-                                value=float(i["hue_stats"]["hue_circular_mean"]), label='degrees')
-        outputs.add_observation(sample=observation_sample,
-                                variable='hue_circular_std',
-                                trait='hue circular standard deviation',
-                                method='plantcv-geospatial.analyze.color',
-                                scale='degrees', datatype=float,
-                                value=float(i["hue_stats"]["hue_circular_std"]), label='degrees')
+    # Rasterize the plots once, every channel reuses the same plot footprints
+    plots = _plot_index(img=img, geojson=geojson)
+    ids = plots.ids
+    zones = plots.zones(img)
+    nodata = getattr(img, 'nodata', None)
 
-    if colorspaces.upper() in ('RGB', 'ALL'):
-        # Extract the blue, green, and red channels
-        b, g, r = cv2.split(masked)
-        _channel_stats(img, bin_mask, geojson, bins, channels=[b, g, r],
-                       channel_ids=["blue", "green", "red"], histrange=(0, 255),
-                       ids=ids, label=label)
+    with profiler.stage("zonal_stats", "analyze.color"):
+        if img.thumb.dtype != np.uint8:
+            channel_sets = _color_channels(img.thumb, bin_mask, zones, nodata, colorspaces)
+            histograms = {}
+        else:
+            # Per-plot 256-bin histograms of every channel, all statistics are derived from them
+            histograms = _color_histograms(img.thumb, zones, bin_mask, nodata=nodata, colorspaces=colorspaces,
+                                           n_jobs=n_jobs, backend=backend)
+            channel_sets = {}
 
-    if colorspaces.upper() in ('LAB', 'ALL'):
-        # Convert the BGR image to LAB
-        lmy = cv2.cvtColor(masked, cv2.COLOR_BGR2LAB)
-        # Extract the lightness, green-magenta, and blue-yellow channels
-        l, m, y = cv2.split(lmy)
-        _channel_stats(img, bin_mask, geojson, bins, channels=[l, m, y],
-                       channel_ids=["lightness", "green-magenta", "blue-yellow"],
-                       histrange=(0, 255), ids=ids, label=label)
+        # Always output hue circular stats
+        n_zones = zones.n_zones
+        if histograms:
+            hue_stats = _hue_circ_stats(np.tile(np.arange(256), n_zones), np.repeat(np.arange(n_zones), 256),
+                                        n_zones, weights=histograms["hue"].reshape(-1))
+        else:
+            hue_stats = _hue_circ_stats(*channel_sets["hues"], n_zones)
+    hcm = hue_stats["hue_circular_mean"]
+    samples = [label + "_" + str(id) for id in ids]
+    plot_results.add(samples=samples,
+                     variable='hue_circular_mean',
+                     trait='hue circular mean', method='plantcv-geospatial.analyze.color',
+                     scale='degrees', datatype=float,
+                     value=hue_stats["hue_circular_mean"], label='degrees')
+    plot_results.add(samples=samples,
+                     variable='hue_circular_std',
+                     trait='hue circular standard deviation',
+                     method='plantcv-geospatial.analyze.color',
+                     scale='degrees', datatype=float,
+                     value=hue_stats["hue_circular_std"], label='degrees')
 
-    if colorspaces.upper() in ('HSV', 'ALL'):
-        _channel_stats(img, bin_mask, geojson, bins, channels=[h, s, v],
-                       channel_ids=["hue", "saturation", "value"], histrange=(0, 255),
-                       ids=ids, label=label)
+    for colorspace, channel_ids in (('RGB', ["blue", "green", "red"]),
+                                    ('LAB', ["lightness", "green-magenta", "blue-yellow"]),
+                                    ('HSV', ["hue", "saturation", "value"])):
+        if colorspaces.upper() not in (colorspace, 'ALL'):
+            continue
+        if histograms:
+            for channel_id in channel_ids:
+                _add_channel_observations(_histogram_color_stats(histograms[channel_id], bins), channel_id, ids, label)
+        else:
+            _channel_stats(img, bin_mask, zones, bins, channels=channel_sets[colorspace], channel_ids=channel_ids,
+                           histrange=(0, 255), ids=ids, label=label, n_jobs=n_jobs, backend=backend)
 
-    df = pd.DataFrame({'value': hcm})
-    hue_chart = alt.Chart(df).mark_bar().encode(x=alt.X('value', bin=True, title='Hue Circular Mean'),
-                                                y=alt.Y('count()', title='Frequency'))
+    with profiler.stage("debug", "analyze.color"):
+        df = pd.DataFrame({'value': hcm})
+        hue_chart = alt.Chart(df).mark_bar().encode(x=alt.X('value', bin=True, title='Hue Circular Mean'),
+                                                    y=alt.Y('count()', title='Frequency'))
 
-    _debug(visual=hue_chart, filename=os.path.join(params.debug_outdir, label + '_hue_circular_mean.png'))
+        _debug(visual=hue_chart, filename=os.path.join(params.debug_outdir, label + '_hue_circular_mean.png'))
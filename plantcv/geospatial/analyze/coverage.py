@@ -1,11 +1,13 @@
 # Analyze pixel count over many regions
-from plantcv.geospatial._helpers import _gather_ids, _show_geojson
-from plantcv.plantcv import outputs, params
-from rasterstats import zonal_stats
 import numpy as np
+from plantcv.geospatial._globals import plot_results, profiler
+from plantcv.geospatial._helpers import _show_geojson
+from plantcv.geospatial._zonal import _image_zonal_stats
+from plantcv.geospatial.plot_index import _plot_index
+from plantcv.plantcv import outputs, params
 
 
-def coverage(img, bin_mask, geojson, label=None):
+def coverage(img, bin_mask, geojson, label=None, n_jobs=1, backend="threading"):
     """A function that analyzes pixel coverage in a binary mask and outputs data.
     Parameters:
     -----------
@@ -13,63 +15,63 @@ def coverage(img, bin_mask, geojson, label=None):
         geotif data, generally from read_geotif, used for affine metadata
     bin_mask : numpy.ndarray
         Binary mask of objects (32-bit).
-    geojson : str
-        Path to the shape file containing the regions for analysis
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the regions for analysis, or a PlotIndex
+    n_jobs : int, optional
+        Number of parallel workers, each computing a run of neighboring image tiles
+        (default = 1).
+    backend : str, optional
+        Parallel backend, "threading" or "loky" (processes) (default = "threading").
 
     Returns:
     --------
-    analysis_image : numpy.ndarray
-        Debug image showing shapes from geojson on input image.
+    analysis_image : matplotlib.figure.Figure or None
+        Debug image showing shapes from geojson on input image, None if params.debug is None.
     """
     # Set label to params.sample_label if None
     if label is None:
         label = params.sample_label
 
-    # zonal_stats "sum" gives the sum of pixel values, so change from [0,255] to [0,1]
-    bin_mask = np.where(bin_mask > 0, 1, 0)
-    all_ones = np.ones(bin_mask.shape[:2])
     affine = img.transform
 
     # Calculate GSD in the x and y directions
     gsd_x = abs(affine[0])
     gsd_y = abs(affine[4])
 
-    # Vectorized (efficient) data extraction of pixel count per sub-region
-    region_counts = zonal_stats(geojson, bin_mask, affine=affine, stats="sum")
-
-    total_region = zonal_stats(geojson, all_ones, affine=affine, stats="sum")
+    # Rasterize the regions once, then count pixels per sub-region in one vectorized pass
+    plots = _plot_index(img=img, geojson=geojson)
+    zones = plots.zones(img)
+    with profiler.stage("zonal_stats", "analyze.coverage"):
+        region = _image_zonal_stats(bin_mask > 0, zones, stats=("count", "sum"), n_jobs=n_jobs,
+                                    backend=backend)
 
     # Gather list of IDs
-    ids = _gather_ids(geojson=geojson)
+    ids = plots.ids
 
-    # Save data to outputs
-    for i, id_lbl in enumerate(ids):
-        observation_sample = label + "_" + str(id_lbl)
-        # Save out pixel_count
-        pixel_count = 0.0
-        total = 1.0
-        if region_counts[i]["sum"] is not None:
-            pixel_count = region_counts[i]["sum"]
-        if total_region[i]["sum"] is not None:
-            total = total_region[i]["sum"]
-        outputs.add_observation(sample=observation_sample, variable="pixel_count", trait="count",
-                                method="rasterstats.zonal_stats", scale="pixels", datatype=int,
-                                value=pixel_count, label="pixels")
-        # Scale and save out coverage in CRS units
-        outputs.add_observation(sample=observation_sample, variable="coverage", trait="coverage",
-                                method="plantcv-geospatial.analyze.coverage",
-                                scale=img.crs.linear_units, datatype=float,
-                                value=pixel_count * (gsd_x * gsd_y), label="square " + img.crs.linear_units)
-        # Save out percent coverage
-        outputs.add_observation(sample=observation_sample, variable="percent_coverage", trait="percentage",
-                                method="rasterstats.zonal_stats", scale="none", datatype=float,
-                                value=pixel_count / total, label="none")
+    # Save data to outputs, regions outside of the image have no pixels
+    samples = [label + "_" + str(id_lbl) for id_lbl in ids]
+    pixel_count = np.where(region["count"] > 0, region["sum"], 0.0)
+    total = np.where(region["count"] > 0, region["count"], 1).astype(float)
+    # Save out pixel_count
+    plot_results.add(samples=samples, variable="pixel_count", trait="count",
+                     method="plantcv-geospatial.analyze.coverage", scale="pixels", datatype=int,
+                     value=pixel_count, label="pixels")
+    # Scale and save out coverage in CRS units
+    plot_results.add(samples=samples, variable="coverage", trait="coverage",
+                     method="plantcv-geospatial.analyze.coverage",
+                     scale=img.crs.linear_units, datatype=float,
+                     value=pixel_count * (gsd_x * gsd_y), label="square " + img.crs.linear_units)
+    # Save out percent coverage
+    plot_results.add(samples=samples, variable="percent_coverage", trait="percentage",
+                     method="plantcv-geospatial.analyze.coverage", scale="none", datatype=float,
+                     value=pixel_count / total, label="none")
 
     # Save out Ground Sampling Distance
     outputs.add_metadata(term="ground_sampling_distance_x", datatype=float, value=gsd_x)
     outputs.add_metadata(term="ground_sampling_distance_y", datatype=float, value=gsd_y)
 
     # Plot the GeoTIFF
-    plotting_img = _show_geojson(img, geojson, ids=ids)
+    with profiler.stage("debug", "analyze.coverage"):
+        plotting_img = _show_geojson(img, plots, ids=ids)
 
     return plotting_img
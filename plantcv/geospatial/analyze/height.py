@@ -1,21 +1,22 @@
 # Analyze Digital Surface Model (DSM) over many regions
-from plantcv.geospatial._helpers import _gather_ids, _show_geojson
-from plantcv.plantcv import outputs, params
-from rasterstats import zonal_stats
 import numpy as np
-import geopandas
+from plantcv.geospatial._globals import plot_results, profiler
+from plantcv.geospatial._helpers import _show_geojson
+from plantcv.geospatial._zonal import _image_zonal_stats
+from plantcv.geospatial.plot_index import _plot_index
+from plantcv.plantcv import params
 
 
-def height_percentile(dsm, geojson, lower=25, upper=90, label=None):
+def height_percentile(dsm, geojson, lower=25, upper=90, label=None, n_jobs=1, backend="threading"):
     """
     A function that analyzes elevation averages over regions and outputs data.
 
     Parameters
     ----------
-    dsm : plantcv.geospatial.images.DSM object
-        Digital surface model data, generally from read_geotif
-    geojson : str
-        Path to the shape file containing the regions for analysis
+    dsm : plantcv.geospatial.images.DSM or plantcv.geospatial.LazyDSM object
+        Digital surface model data, generally from read_geotif. A LazyDSM is analyzed tile by tile
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the regions for analysis, or a PlotIndex
     lower : int, optional
         Lower percentile cut off, input as a list formatted  default lower=25
     upper : int, optional
@@ -23,19 +24,20 @@ def height_percentile(dsm, geojson, lower=25, upper=90, label=None):
     label : str, list, optional
         Optional label parameter, modifies the variable name of observations
         recorded (default = pcv.params.sample_label).
+    n_jobs : int, optional
+        Number of parallel workers, each computing a run of neighboring image tiles
+        (default = 1).
+    backend : str, optional
+        Parallel backend, "threading" or "loky" (processes) (default = "threading").
 
     Returns
     -------
-    bounds : list
-        List of geojson bounds analyzed
+    plotting_img : matplotlib.figure.Figure or None
+        Debug image showing shapes from geojson on the DSM, None if params.debug is None.
     """
     # Set label to params.sample_label if None
     if label is None:
         label = params.sample_label
-    # DSM tifs contain just one band of data, so make the array 2D
-    dsm_data = dsm[:, :, 0]
-    # Cast to float since zonal_stats gives overflow error on uint8 data
-    dsm_data = dsm_data.astype(np.float32)
 
     if dsm.nodata is not None:
         nodata_value = dsm.nodata
@@ -44,65 +46,49 @@ def height_percentile(dsm, geojson, lower=25, upper=90, label=None):
     # Scale of the data
     scale = dsm.crs.linear_units
 
-    # Vectorize the calculation of mean elevation per region
+    # Rasterize the regions once and calculate both percentiles per region
+    plots = _plot_index(img=dsm, geojson=geojson)
+    zones = plots.zones(dsm)
+    with profiler.stage("zonal_stats", "analyze.height_percentile"):
+        region_stats = _image_zonal_stats(dsm, zones, nodata=nodata_value, stats=(),
+                                          percentiles=(lower, upper), n_jobs=n_jobs, backend=backend)
+    # Plots without data have soil and plant elevations of 0 and a plant height of nodata
+    soil_vals = np.nan_to_num(region_stats["percentile_" + str(lower)], nan=0.0)
+    plant_vals = np.nan_to_num(region_stats["percentile_" + str(upper)], nan=0.0)
+    heights = np.where((soil_vals != 0) & (plant_vals != 0), plant_vals - soil_vals, nodata_value)
     lower = "percentile_" + str(lower)
-    region_lower_avgs = zonal_stats(geojson, dsm_data,
-                                    affine=dsm.transform,
-                                    nodata=nodata_value, stats=lower)
-    # Vectorize the calculation of mean elevation per region
     upper = "percentile_" + str(upper)
-    region_upper_avgs = zonal_stats(geojson, dsm_data,
-                                    affine=dsm.transform,
-                                    nodata=nodata_value, stats=upper)
     # Gather plot IDs from the geojson
-    ids = _gather_ids(geojson=geojson)
+    ids = plots.ids
 
-    soil_vals = []
-    plant_vals = []
     # Save data to outputs
-    for i, id_lbl in enumerate(ids):
-        # Initialize no data cases
-        avg1, avg2, avg = [0.0, 0.0, nodata_value]
-        observation_sample = label + "_" + str(id_lbl)
-        # Save soil heights
-        if region_lower_avgs[i][lower] is not None:
-            avg1 = region_lower_avgs[i][lower]
-        outputs.add_observation(sample=observation_sample, variable="soil_elevation",
-                                trait="dsm_mean_below_" + str(lower),
-                                method="plantcv-geospatial.analyze.height",
-                                scale=scale, datatype=float,
-                                value=avg1, label=scale)
-        soil_vals.append(avg1)
-        # Save plant heights
-        if region_upper_avgs[i][upper] is not None:
-            avg2 = region_upper_avgs[i][upper]
-        outputs.add_observation(sample=observation_sample, variable="plant_elevation",
-                                trait="dsm_mean_above_" + str(upper),
-                                method="plantcv-geospatial.analyze.height",
-                                scale=scale, datatype=float,
-                                value=avg2, label=scale)
-        plant_vals.append(avg2)
-        if avg1 != 0 and avg2 != 0:
-            avg = avg2 - avg1
-        outputs.add_observation(sample=observation_sample, variable="plant_height",
-                                trait="height",
-                                method="plantcv-geospatial.analyze.height",
-                                scale=scale, datatype=float,
-                                value=avg, label=scale)
+    samples = [label + "_" + str(id_lbl) for id_lbl in ids]
+    # Save soil heights
+    plot_results.add(samples=samples, variable="soil_elevation",
+                     trait="dsm_mean_below_" + str(lower),
+                     method="plantcv-geospatial.analyze.height",
+                     scale=scale, datatype=float,
+                     value=soil_vals, label=scale)
+    # Save plant heights
+    plot_results.add(samples=samples, variable="plant_elevation",
+                     trait="dsm_mean_above_" + str(upper),
+                     method="plantcv-geospatial.analyze.height",
+                     scale=scale, datatype=float,
+                     value=plant_vals, label=scale)
+    plot_results.add(samples=samples, variable="plant_height",
+                     trait="height",
+                     method="plantcv-geospatial.analyze.height",
+                     scale=scale, datatype=float,
+                     value=heights, label=scale)
 
     # Min and max height of plots
-    min_elevation = min(soil_vals)
-    max_elevation = max(plant_vals)
+    min_elevation = float(soil_vals.min())
+    max_elevation = float(plant_vals.max())
 
     # Plot the GeoTIFF
-    bounds = geopandas.read_file(geojson)
-
-    # Gather representative coordinates for each polygone in the shapefile
-    bounds['coords'] = bounds['geometry'].apply(lambda x: x.representative_point().coords[:])
-    bounds['coords'] = [coords[0] for coords in bounds['coords']]
-
-    # Plot the GeoTIFF
-    plotting_img = _show_geojson(img=dsm, geojson=geojson, ids=ids,
-                                 cmap='viridis', vmin=min_elevation, vmax=max_elevation)
+    # The figure is only rendered, from a decimated copy, if debug is on
+    with profiler.stage("debug", "analyze.height_percentile"):
+        plotting_img = _show_geojson(img=dsm, geojson=plots, ids=ids,
+                                     cmap='viridis', vmin=min_elevation, vmax=max_elevation)
 
     return plotting_img
@@ -1,10 +1,12 @@
 # Analyze spectral signature over many regions
-from rasterstats import zonal_stats
-from plantcv.plantcv import outputs, params
+from plantcv.plantcv import params
 from plantcv.plantcv import spectral_index as pcv_spectral
 from plantcv.plantcv.classes import Spectral_data
-from plantcv.geospatial._helpers import _plot_bounds_pseudocolored, _gather_ids
-import fiona
+from plantcv.geospatial._globals import plot_results, profiler
+from plantcv.geospatial._helpers import _plot_bounds_pseudocolored
+from plantcv.geospatial._zonal import _image_zonal_stats, _to_values
+from plantcv.geospatial.images import LazyImage
+from plantcv.geospatial.plot_index import _plot_index
 import numpy as np
 
 
@@ -44,14 +46,14 @@ def _convert_spectral(img, index, distance):
 
 
 def spectral_index(img, geojson, index, mask=None,
-                   percentiles=None, label=None, distance=20):
+                   percentiles=None, label=None, distance=20, n_jobs=1, backend="threading"):
     """A function that summarizes pixel intensity values per region for a spectral index
     Parameters:
     -----------
-    img : plantcv.geospatial.images.GEO object
-        geotif data, generally from read_geotif
-    geojson : str
-        Path to the shape file containing the regions for analysis
+    img : plantcv.geospatial.images.GEO or plantcv.geospatial.LazyGEO object
+        geotif data, generally from read_geotif. A LazyGEO is analyzed tile by tile
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the regions for analysis, or a PlotIndex
     index : str
         Spectral index to calculate
     mask : numpy.ndarray
@@ -64,22 +66,30 @@ def spectral_index(img, geojson, index, mask=None,
     distance : int
         How lenient to be if required wavelengths are not available.
         Optional (default = 20)
+    n_jobs : int, optional
+        Number of parallel workers, each computing a run of neighboring image tiles
+        (default = 1).
+    backend : str, optional
+        Parallel backend, "threading" or "loky" (processes) (default = "threading").
 
     Returns:
     --------
-    analysis_image : numpy.ndarray
-        Debug image showing shapes from geojson on input image.
+    analysis_image : matplotlib.axes.Axes or None
+        Debug image showing shapes from geojson on input image, None if params.debug is None.
     """
     # Convert input img to spectral reflectance using provided index
-
-    input_img = _convert_spectral(img, index, distance)
-    input_img.metadata = {"transform" : img.transform}
+    # Lazily read images are converted tile by tile, and plotted from a decimated copy
+    lazy = isinstance(img, LazyImage)
+    plot_img = img.overview() if lazy else img
+    input_img = _convert_spectral(plot_img, index, distance)
+    input_img.metadata = {"transform" : plot_img.transform}
 
     # Set label to params.sample_label if no other labels provided
     if label is None:
         label = params.sample_label
-    # Gather plot IDs from the geojson
-    shp_labels = _gather_ids(geojson=geojson)
+    # Read the plots and gather plot IDs from the geojson
+    plots = _plot_index(img=img, geojson=geojson)
+    shp_labels = plots.ids
     # set percentiles if missing
     if percentiles is None:
         percentiles = range(0, 101, 25)
@@ -94,57 +104,50 @@ def spectral_index(img, geojson, index, mask=None,
     plot_upper = [0.1]
 
     # Mask calculated spectral image if provided
-    if mask is not None:
+    if mask is not None and not lazy:
         input_img.array_data[mask == 0] = img.nodata
 
-    # Gather list of IDs
-    with fiona.open(geojson, 'r') as shapefile:
-        # Add properties to the geojson object, and then should be able to access inside the function called in add_stats
-        # Vectorized (efficient) data extraction of spectral signature per sub-region
-        stats = zonal_stats(shapefile, input_img.array_data, affine=img.transform,
-                            stats=formatted_pcts,
-                            nodata=img.nodata)
-
-        for i, id in enumerate(shp_labels):
-            observation_sample = label + "_" + str(id)
-            # Store upper and lower values for each plot
-            plot_lower.append(stats[i]['percentile_0'])
-            plot_upper.append(stats[i]['percentile_100'])
-            # store non-percentile results
-            mn = stats[i]['mean']
-            med = stats[i]['median']
-            if mn is not None:
-                mn = float(mn)
-            if med is not None:
-                med = float(med)
-            outputs.add_observation(sample=observation_sample, variable=f"mean_{input_img.array_type}",
-                                    trait=f"Median {input_img.array_type} reflectance",
-                                    method="plantcv.geospatial.analyze.spectral_index", scale="reflectance", datatype=float,
-                                    value=mn, label="none")
-
-            outputs.add_observation(sample=observation_sample, variable=f"med_{input_img.array_type}",
-                                    trait=f"Median {input_img.array_type} reflectance",
-                                    method="plantcv.geospatial.analyze.spectral_index", scale="reflectance", datatype=float,
-                                    value=med, label="none")
-
-            outputs.add_observation(sample=observation_sample, variable=f"std_{input_img.array_type}",
-                                    trait=f"Standard deviation {input_img.array_type} reflectance",
-                                    method="plantcv.geospatial.analyze.spectral_index", scale="reflectance", datatype=float,
-                                    value=stats[i]['std'], label="none")
-
-            # store percentile results
-            for pct in formatted_pcts[3:]:
-                pctval = stats[i][pct]
-                if pctval is not None:
-                    pctval = float(pctval)
-                outputs.add_observation(sample=observation_sample, variable=f"{pct}_{input_img.array_type}",
-                                        trait=f"{pct}_{input_img.array_type} value",
-                                        method="plantcv.geospatial.analyze.spectral_index", scale="frequency", datatype=float,
-                                        value=pctval, label="none")
-
-    ax = _plot_bounds_pseudocolored(img=input_img, geojson=geojson,
-                                    vmin=min((x for x in plot_lower if x is not None)),
-                                    vmax=max((x for x in plot_upper if x is not None)),
-                                    data_label=input_img.array_type)
+    # Rasterize the regions once and extract the spectral signature per sub-region
+    zones = plots.zones(img)
+    with profiler.stage("zonal_stats", "analyze.spectral_index"):
+        region_stats = _image_zonal_stats(img if lazy else input_img.array_data, zones, nodata=img.nodata,
+                                          mask=mask if lazy else None,
+                                          func=lambda tile: _convert_spectral(tile, index, distance).array_data,
+                                          stats=("count", "mean", "median", "std"), percentiles=[0, 100, *percentiles],
+                                          n_jobs=n_jobs, backend=backend)
+    # Store upper and lower values for each plot
+    plot_lower.extend(_to_values(region_stats['percentile_0']))
+    plot_upper.extend(_to_values(region_stats['percentile_100']))
+
+    samples = [label + "_" + str(id) for id in shp_labels]
+    empty = region_stats['count'] == 0
+    # store non-percentile results
+    plot_results.add(samples=samples, variable=f"mean_{input_img.array_type}",
+                     trait=f"Median {input_img.array_type} reflectance",
+                     method="plantcv.geospatial.analyze.spectral_index", scale="reflectance", datatype=float,
+                     value=region_stats['mean'], label="none", empty=empty)
+
+    plot_results.add(samples=samples, variable=f"med_{input_img.array_type}",
+                     trait=f"Median {input_img.array_type} reflectance",
+                     method="plantcv.geospatial.analyze.spectral_index", scale="reflectance", datatype=float,
+                     value=region_stats['median'], label="none", empty=empty)
+
+    plot_results.add(samples=samples, variable=f"std_{input_img.array_type}",
+                     trait=f"Standard deviation {input_img.array_type} reflectance",
+                     method="plantcv.geospatial.analyze.spectral_index", scale="reflectance", datatype=float,
+                     value=region_stats['std'], label="none", empty=empty)
+
+    # store percentile results
+    for pct in formatted_pcts[3:]:
+        plot_results.add(samples=samples, variable=f"{pct}_{input_img.array_type}",
+                         trait=f"{pct}_{input_img.array_type} value",
+                         method="plantcv.geospatial.analyze.spectral_index", scale="frequency", datatype=float,
+                         value=region_stats[pct], label="none", empty=empty)
+
+    with profiler.stage("debug", "analyze.spectral_index"):
+        ax = _plot_bounds_pseudocolored(img=input_img, geojson=plots,
+                                        vmin=min((x for x in plot_lower if x is not None)),
+                                        vmax=max((x for x in plot_upper if x is not None)),
+                                        data_label=input_img.array_type)
 
     return ax
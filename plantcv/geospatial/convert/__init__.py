@@ -1,6 +1,10 @@
-from plantcv.geospatial.convert.points import points
-from plantcv.geospatial.convert.shapes import shapes
-from plantcv.geospatial.convert.to_roi import to_roi
+from plantcv.geospatial._lazy import _attach
 
 
 __all__ = ["points", "shapes", "to_roi"]
+
+__getattr__, __dir__ = _attach(__name__, {
+    "points": ("plantcv.geospatial.convert.points", "points"),
+    "shapes": ("plantcv.geospatial.convert.shapes", "shapes"),
+    "to_roi": ("plantcv.geospatial.convert.to_roi", "to_roi"),
+})
@@ -3,6 +3,7 @@ import geojson
 import rasterio
 from shapely.geometry import Polygon, mapping
 from plantcv.geospatial.transform_polygons import transform_polygons
+from plantcv.geospatial.plot_index import PlotIndex
 
 
 def shapes(img, source, dest=None, shapetype="polygon", layername="Shapes"):
@@ -13,8 +14,8 @@ def shapes(img, source, dest=None, shapetype="polygon", layername="Shapes"):
     img : plantcv.geospatial.images.GEO object
         The image used for clicking on points, should be from read_geotif.
         Defaults to None, only required if 'source' is a Napari view or Points object.
-    source : str, Napari.viewer
-        Either a geojson file or the viewer used to make the clicks.
+    source : str, plantcv.geospatial.PlotIndex, Napari.viewer
+        Either a geojson file (or PlotIndex) or the viewer used to make the clicks.
         A geojson file will return a list of coordinates from that geojson.
         A Napari viewer will save and return a geojson object.
     dest : str,
@@ -30,7 +31,7 @@ def shapes(img, source, dest=None, shapetype="polygon", layername="Shapes"):
     list or dict, if source is a str then returns a list of X,Y coordinates.
         If source is a Napari.viewer then a dictionary of geojson data is returned.
     """
-    if isinstance(source, str):
+    if isinstance(source, (str, PlotIndex)):
         # If path to a file, use transform_polygons
         return transform_polygons(img, geojson=source)
     # otherwise source should be a napari viewer
@@ -1,28 +1,35 @@
 # Transform georeferenced GeoJSON/shapefile points into python coordinates
-import os
 import numpy as np
-from plantcv.geospatial.transform_polygons import transform_polygons
+import shapely
+from plantcv.geospatial.transform_polygons import transform_polygons, _exteriors, _pack_polygons, _to_pixels
 from plantcv.geospatial._helpers import _transform_geojson_crs
 from plantcv.plantcv.fatal_error import fatal_error
 from plantcv.plantcv.classes import Objects
 from plantcv.plantcv.roi.roi_methods import _draw_roi
 
 
-def to_roi(img, geojson, radius=None):
+# Number of vertices of circular ROIs, as shapely buffers of points
+_CIRCLE_VERTICES = 64
+
+
+def to_roi(img, geojson, radius=None, out_path=None):
     """Takes a points- or polygon-type shapefile/GeoJSON and transforms to ROIs,
-    and creates ROI Objects instances. If points, saves circular ROIs out to a new geoJSON file.
+    and creates ROI Objects instances. If points, circular ROIs can be saved to a geoJSON file.
 
     Parameters:
     -----------
     img : plantcv.geospatial.images.GEO object
         A GEO image object returned by ``read_geotif``.
-    geojson : str
-        Path to the shape file containing the points or polygons.
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the points or polygons, or a PlotIndex.
     radius : optional float
         If provided, then points from the geojson will be treated as centers
         of circular ROIs with this radius
         in units matching the coordinate system (CRS) of the image
         e.g. meters
+    out_path : optional str
+        Path of a geoJSON file to save the circular ROIs to, e.g. for
+        gcv.analyze functions (default = None, no file is written)
 
     Returns:
     --------
@@ -30,7 +37,7 @@ def to_roi(img, geojson, radius=None):
         List of circular ROIs (plantcv Objects class instances)
     """
     if radius is not None:
-        rois = _points_to_circular_rois(img, geojson, radius)
+        rois = _points_to_circular_rois(img, geojson, radius, out_path)
     else :
         rois = _polygon_to_roi(img, geojson)
 
@@ -40,20 +47,22 @@ def to_roi(img, geojson, radius=None):
     return rois
 
 
-def _points_to_circular_rois(img, geojson, radius):
-    """Make circular ROIs from points in a geojson file
+def _points_to_circular_rois(img, geojson, radius, out_path=None):
+    """Make circular ROIs from points in a geojson file, without writing or reading files
 
     Parameters:
     -----------
     img : plantcv.geospatial.images.GEO object
         A GEO image object returned by ``read_geotif``.
-    geojson : str
-        Path to the shape file containing the points.
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the points, or a PlotIndex.
     radius : float
         Points from the geojson will be treated as centers
         of circular ROIs with this radius
         in units matching the coordinate system (CRS) of the image
         e.g. meters
+    out_path : optional str
+        Path of a geoJSON file to save the circular ROIs to (default = None)
 
     Returns:
     --------
@@ -66,19 +75,49 @@ def _points_to_circular_rois(img, geojson, radius):
         fatal_error("Circular ROIs can only be specified with points layers, geojson file is geom_type '" +
                     ", ".join(gdf.geom_type.unique()) + "'")
 
-    gdf['geometry'] = gdf.geometry.buffer(radius)
-
-    buffered_geojson = os.path.splitext(geojson)[0] + '_circles.geojson'
-    gdf.to_file(buffered_geojson, driver='GeoJSON')
-
-    geo_polygons = transform_polygons(img=img, geojson=buffered_geojson)
+    if out_path is not None:
+        circles = gdf.copy()
+        circles["geometry"] = gdf.geometry.buffer(radius)
+        circles.to_file(out_path, driver="GeoJSON")
+
+    geometries = gdf.geometry.values
+    if (shapely.get_type_id(geometries) == shapely.GeometryType.POINT).all():
+        polygons = _circle_contours(shapely.get_coordinates(geometries), radius, img.transform)
+    else:
+        # Multipoints are buffered into (multi)polygons
+        circles = shapely.buffer(geometries, radius, quad_segs=_CIRCLE_VERTICES // 4)
+        polygons = _exteriors(*_pack_polygons(circles, img.transform))
     rois = Objects()
-    for polygon in geo_polygons:
-        rois.append(contour=[np.array(polygon)], h=[])
+    for polygon in polygons:
+        rois.append(contour=[polygon], h=[])
 
     return rois
 
 
+def _circle_contours(centers, radius, transform):
+    """Pixel coordinates of the vertices of circles around points, as shapely buffers.
+
+    Parameters:
+    -----------
+    centers : numpy.ndarray
+        World coordinates of the circle centers with shape (n, 2)
+    radius : float
+        Circle radius in units of the CRS of the transform
+    transform : affine.Affine
+        Affine transform of the image
+
+    Returns:
+    --------
+    contours : numpy.ndarray
+        int32 (col, row) vertices with shape (n, 64, 2), clockwise from the east of each
+        center, without the closing vertex
+    """
+    angles = -np.arange(_CIRCLE_VERTICES) * (np.pi / (_CIRCLE_VERTICES // 2))
+    x = centers[:, :1] + radius * np.cos(angles)
+    y = centers[:, 1:2] + radius * np.sin(angles)
+    return _to_pixels(x, y, transform)
+
+
 def _polygon_to_roi(img, geojson):
     """Make ROIs from polygons in a geojson file
 
@@ -86,8 +125,8 @@ def _polygon_to_roi(img, geojson):
     -----------
     img : plantcv.geospatial.images.GEO object
         A GEO image object returned by ``read_geotif``.
-    geojson : str
-        Path to the shape file containing the polygons.
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the polygons, or a PlotIndex.
 
     Returns:
     --------
@@ -100,10 +139,10 @@ def _polygon_to_roi(img, geojson):
         fatal_error("Polygon ROIs can only be specified with polygon layers, geojson file is geom_type '" +
                     ", ".join(gdf.geom_type.unique()) + "'")
 
-    geo_polygons = transform_polygons(img=img, geojson=geojson)
+    geo_polygons = transform_polygons(img=img, geojson=geojson, packed=True)
 
     rois = Objects()
-    for polygon in geo_polygons:
-        rois.append(contour=[np.array(polygon)], h=[])
+    for polygon in _exteriors(*geo_polygons):
+        rois.append(contour=[polygon], h=[])
 
     return rois
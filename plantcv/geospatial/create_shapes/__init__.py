@@ -1,6 +1,11 @@
-from plantcv.geospatial.create_shapes.grid_from_coords import grid_from_coords
-from plantcv.geospatial.create_shapes.auto_grid import auto_grid
-from plantcv.geospatial.create_shapes.interactive_shapes import InteractiveShapes
+from plantcv.geospatial._lazy import _attach
 
 
 __all__ = ["grid_from_coords", "auto_grid", "InteractiveShapes"]
+
+# InteractiveShapes imports napari (and Qt), only when it is used
+__getattr__, __dir__ = _attach(__name__, {
+    "grid_from_coords": ("plantcv.geospatial.create_shapes.grid_from_coords", "grid_from_coords"),
+    "auto_grid": ("plantcv.geospatial.create_shapes.auto_grid", "auto_grid"),
+    "InteractiveShapes": ("plantcv.geospatial.create_shapes.interactive_shapes", "InteractiveShapes"),
+})
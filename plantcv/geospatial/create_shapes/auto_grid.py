@@ -50,7 +50,7 @@ def auto_grid(img, field_corners_path, out_path, ids=None, **kwargs):
     Returns:
     --------
     fig
-        matplotlib figure displaying the created grid cell polygons
+        matplotlib figure displaying the created grid cell polygons, None if params.debug is None
     """
     num_ranges = kwargs.get("num_ranges", field_layout.num_ranges)
     num_columns = kwargs.get("num_columns", field_layout.num_columns)
@@ -37,7 +37,7 @@ def grid_from_coords(img, field_corners_path, plot_geojson_path, out_path, ids=N
     Returns:
     --------
     fig
-        matplotlib figure displaying the created grid cell polygons
+        matplotlib figure displaying the created grid cell polygons, None if params.debug is None
     """
     range_length = kwargs.get("range_length", field_layout.range_length)
     row_length = kwargs.get("row_length", field_layout.row_length)
@@ -1,31 +1,283 @@
 # Sets up image classes as subclasses of numpy.ndarray
 
+import abc
+import threading
 import numpy as np
 import affine
+import rasterio
+from rasterio import windows, features
+from plantcv.geospatial._globals import profiler
+from plantcv.geospatial._quantile import _array_quantile, _streaming_quantile
+from plantcv.geospatial._shared import _attach, _create_shared, _memmap_backing
 
 
 class Image(np.ndarray):
     """The generic Image class extends the np.ndarray class by adding attributes."""
 
+    # Attributes that are not pickled, they are made again after unpickling
+    _unpickled = ("_thumbs", "_shared")
+
     # From NumPy documentation
     # Add filename attribute
     def __new__(cls, input_array: np.ndarray, filename: str):
         obj = np.asarray(input_array).view(cls)
         # New attribute filename stores the path and filename of the source file
         obj.filename = filename
+        # Images of memory-mapped files are pickled as a handle to the file
+        if isinstance(input_array, np.memmap):
+            obj._shared = _memmap_backing(input_array)
         return obj
 
     def __array_finalize__(self, obj):
+        self._shared = None
         if obj is not None:
             self.filename = getattr(obj, "filename", None)
+            # Views (and results) of shared images are pickled as a handle if they are in the shared buffer
+            self._shared = getattr(obj, "_shared", None)
+        # Thumbnails are cached per array, views and copies make their own
+        self._thumbs = {}
+
+    def __reduce__(self):
+        attributes = {key: value for key, value in self.__dict__.items() if key not in self._unpickled}
+        handle = self._shared.handle(self) if self._shared is not None else None
+        if handle is not None:
+            # Shared images are pickled as the location of their data instead of the data
+            return _from_handle, (type(self), handle), (None, attributes)
+        reconstruct, args, state = super().__reduce__()
+        return reconstruct, args, (state, attributes)
+
+    def __setstate__(self, state):
+        # Pickles of earlier versions hold the array state only
+        if len(state) != 2:
+            return super().__setstate__(state)
+        array_state, attributes = state
+        if array_state is not None:
+            super().__setstate__(array_state)
+        self.__dict__.update(attributes)
+        return None
 
     def __getitem__(self, key):
         # Enhance the np.ndarray __getitem__ method
         # Slice the array as requested but return an array of the same class
         # Idea from NumPy examples of subclassing:
+        if isinstance(key, windows.Window):
+            key = key.toslices()
         value = super(Image, self).__getitem__(key)
+        # Views of a pixel window of georeferenced images are offset to the window
+        if isinstance(value, Image) and getattr(self, "transform", None) is not None:
+            value.transform = _slice_transform(self.transform, key, self.shape)
         return value
 
+    def __setitem__(self, key, value):
+        super(Image, self).__setitem__(key, value)
+        # The data changed, cached thumbnails are made again on next use
+        self._clear_thumbs()
+
+    def __array_wrap__(self, arr, *args, **kwargs):
+        # Ufuncs writing to an image (img *= 2, out=img) change its data
+        if isinstance(arr, Image):
+            arr._clear_thumbs()
+        return super().__array_wrap__(arr, *args, **kwargs)
+
+    def _clear_thumbs(self):
+        """Clear cached thumbnails of the image and of the images it is a view of."""
+        img = self
+        while isinstance(img, Image):
+            img._thumbs = {}
+            img = img.base
+
+    @property
+    def thumb(self):
+        """Thumbnail image, made on first use and cached until the data changes."""
+        return self.thumbnail()
+
+    @thumb.setter
+    def thumb(self, value):
+        self._thumbs = {None: value}
+
+    def thumbnail(self, max_size=None):
+        """Thumbnail image, made on first use and cached until the data changes.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Largest edge length in pixels, the image is decimated before the thumbnail is
+            made. Default is None (full size, same as the thumb attribute).
+
+        Returns
+        -------
+        numpy.ndarray
+            Thumbnail image
+        """
+        if max_size not in self._thumbs:
+            img = self
+            step = -(-max(self.shape[:2]) // max_size) if max_size is not None else 1
+            if step > 1:
+                img = self[::step, ::step]
+            with profiler.stage("thumbnail"):
+                self._thumbs[max_size] = img._create_thumb()
+        return self._thumbs[max_size]
+
+    def to_cog(self, filename, **kwargs):
+        """Write the image to a Cloud-Optimized GeoTIFF file.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the output TIF file
+        **kwargs
+            Options passed to plantcv.geospatial.write.geotif
+
+        Returns
+        -------
+        str
+            Path of the output TIF file
+        """
+        # Imported here since the writer depends on this module
+        from plantcv.geospatial.write.geotif import geotif
+        return geotif(self, filename, **kwargs)
+
+    def to_shared(self):
+        """Copy of the image in shared memory, pickled as a small handle to the shared block.
+
+        Worker processes that receive the copy (e.g. through a process pool) attach to the
+        same memory instead of receiving their own copy of the data. The block is freed when
+        the copy and its views are deleted in this process.
+
+        Returns
+        -------
+        plantcv.geospatial.GEO or plantcv.geospatial.DSM
+            Image in shared memory
+        """
+        array, backing = _create_shared(self)
+        return self._with_data(array, backing)
+
+    def to_memmap(self, filename):
+        """Save the image to a .npy file and map it back, pickled as a small handle to the file.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the output .npy file
+
+        Returns
+        -------
+        plantcv.geospatial.GEO or plantcv.geospatial.DSM
+            Image mapped from the file
+        """
+        np.save(filename, np.asarray(self))
+        array = np.load(filename, mmap_mode="r+")
+        return self._with_data(array, _memmap_backing(array))
+
+    def _with_data(self, array, backing):
+        """Image with the attributes of this image and other data.
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            Image data
+        backing : plantcv.geospatial._shared._Backing
+            Shared buffer of the data
+
+        Returns
+        -------
+        plantcv.geospatial.Image
+            Image of the same class
+        """
+        obj = np.asarray(array).view(type(self))
+        obj.__setstate__((None, {key: value for key, value in self.__dict__.items() if key not in self._unpickled}))
+        obj._shared = backing
+        return obj
+
+    def read_bounds(self, bounds):
+        """View of the pixels covering a bounding box, as LazyImage.read_bounds.
+
+        Parameters
+        ----------
+        bounds : tuple
+            Bounding box (left, bottom, right, top) in the CRS of the image
+
+        Returns
+        -------
+        plantcv.geospatial.GEO or plantcv.geospatial.DSM
+            View of the bounding box with a matching transform
+        """
+        window = windows.from_bounds(*bounds, transform=self.transform)
+        return self[window.round_offsets(op="floor").round_lengths(op="ceil")]
+
+    def tiles(self, tile_size=1024):
+        """Iterate over views of square tiles covering the image, as LazyImage.tiles.
+
+        Parameters
+        ----------
+        tile_size : int, optional
+            Tile edge length in pixels, default is 1024
+
+        Yields
+        ------
+        window : rasterio.windows.Window
+            Window of the tile relative to the top left pixel of the image
+        tile : plantcv.geospatial.GEO or plantcv.geospatial.DSM
+            View of the tile with a matching transform
+        """
+        height, width = self.shape[:2]
+        for row in range(0, height, tile_size):
+            for col in range(0, width, tile_size):
+                window = windows.Window(col, row, min(tile_size, width - col), min(tile_size, height - row))
+                yield window, self[window]
+
+
+def _slice_transform(transform, key, shape):
+    """Affine transform of a slice of a georeferenced image.
+
+    Parameters
+    ----------
+    transform : affine.Affine
+        Affine transform of the image
+    key : object
+        Index passed to __getitem__
+    shape : tuple
+        Shape of the image
+
+    Returns
+    -------
+    affine.Affine
+        Transform of the slice, the image transform if the rows and columns are not sliced
+        (e.g. integer, boolean or fancy indexing)
+    """
+    key = key if isinstance(key, tuple) else (key,)
+    key = key[:2] + (slice(None),) * (2 - len(key[:2]))
+    if len(shape) < 2 or not all(isinstance(k, slice) for k in key):
+        return transform
+    (row_start, _, row_step), (col_start, _, col_step) = (k.indices(n) for k, n in zip(key, shape[:2]))
+    if row_start == col_start == 0 and row_step == col_step == 1:
+        return transform
+    # Reversed slices start from the far edge of their first pixel
+    row_start += row_step < 0
+    col_start += col_step < 0
+    return transform * affine.Affine.translation(col_start, row_start) * affine.Affine.scale(col_step, row_step)
+
+
+def _from_handle(cls, handle):
+    """Unpickle a shared image from the handle of its data, see Image.__reduce__.
+
+    Parameters
+    ----------
+    cls : type
+        Image class
+    handle : tuple
+        Location of the data in a shared memory block or memory-mapped file
+
+    Returns
+    -------
+    plantcv.geospatial.Image
+        Image attached to the shared data, attributes are restored by __setstate__
+    """
+    array, backing = _attach(handle)
+    obj = array.view(cls)
+    obj._shared = backing
+    return obj
+
 
 class GEO(Image):
     """Subclass of Image for geospatial images."""
@@ -45,7 +297,7 @@ class GEO(Image):
     def __init__(self, input_array: np.ndarray, filename: str, wavelengths: list,
                  default_wavelengths: list, crs: str, transform: affine.Affine, nodata: float):
         super().__init__()
-        self.thumb = self._create_thumb()
+        self._thumbs = {}
 
     def __array_finalize__(self, obj):
         super().__array_finalize__(obj)
@@ -84,15 +336,22 @@ class GEO(Image):
         thumb = np.dstack([self.get_wavelength(self.default_wavelengths[0]),
                            self.get_wavelength(self.default_wavelengths[1]),
                            self.get_wavelength(self.default_wavelengths[2])])
-        thumb[thumb == self.nodata] = 0
+        if self.nodata is not None:
+            thumb[thumb == self.nodata] = 0
+        if thumb.dtype == np.uint16:
+            # Images read with native_dtype=True keep 16-bit data, the thumbnail is 8-bit
+            thumb = _to_uint8(thumb)
         return thumb
 
 
 class DSM(Image):
     """Subclass of Image for digital surface models."""
 
+    # The data_array view is made again after unpickling
+    _unpickled = Image._unpickled + ("data_array",)
+
     def __new__(cls, input_array: np.ndarray, filename: str, crs : str,
-                transform : affine.Affine, cutoff : float, nodata : float):
+                transform : affine.Affine, cutoff : float, nodata : float, cutoff_method : str = "exact"):
         # Create an instance of Image with default attributes
         obj = Image.__new__(cls, input_array, filename)
         # Add HSI-specific attributes
@@ -100,13 +359,15 @@ class DSM(Image):
         obj.transform = transform
         obj.cutoff = cutoff
         obj.nodata = nodata
+        obj.cutoff_method = cutoff_method
         return obj
 
     def __init__(self, input_array: np.ndarray, filename: str, crs: str,
-                 transform: affine.Affine, cutoff: float, nodata: float):
+                 transform: affine.Affine, cutoff: float, nodata: float, cutoff_method: str = "exact"):
+        self.cutoff_method = cutoff_method
         super().__init__()
         self.data_array = self._gray_cutoff()
-        self.thumb = self._create_thumb()
+        self._thumbs = {}
 
     def __array_finalize__(self, obj):
         super().__array_finalize__(obj)
@@ -115,10 +376,19 @@ class DSM(Image):
             self.transform = getattr(obj, "transform", None)
             self.cutoff = getattr(obj, "cutoff", None)
             self.nodata = getattr(obj, "nodata", None)
+            self.cutoff_method = getattr(obj, "cutoff_method", "exact")
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        # The cutoff was applied before pickling
+        self.data_array = np.squeeze(self)
 
     def _gray_cutoff(self):
         """Converts all pixels in a dsm above a value threshold to no data.
 
+        The cutoff quantile ignores NaN and is found with a streaming histogram rather than
+        a sort of a copy of the DSM, see cutoff_method.
+
         Returns
         -------
         numpy.ndarray
@@ -126,7 +396,7 @@ class DSM(Image):
         """
         img_copy = np.squeeze(self)
         if self.cutoff is not None :
-            quantile = np.quantile(img_copy, self.cutoff)
+            quantile = _array_quantile(img_copy, self.cutoff, exact=self.cutoff_method == "exact")
             img_copy[img_copy >= quantile] = np.nan
         return img_copy
 
@@ -138,19 +408,423 @@ class DSM(Image):
         numpy.ndarray
             Stretched thumbnail
         """
-        img_data = self.data_array
-        # make masked array for nodata values and cutoff-converted NaNs
-        mask = np.where((img_data == self.nodata) | np.isnan(img_data), 1, 0)
-        mx = np.ma.masked_array(img_data, mask)
-        # get range of masked array for visualization
-        mxmin = mx.min()
-        mxmax = mx.max()
-        # make copy of image squashed into uint8 range
-        img_copy = 255 * ((mx - mxmin) / (mxmax - mxmin))
-        # Convert to uint8
-        thumb = img_copy.astype(np.uint8)
-        # remove data from masked array
-        thumb = thumb.data
-        # slice 0s in for no-data
-        thumb = np.where(mask == 1, 0, thumb)
+        img_data = np.asarray(self)
+        if img_data.ndim == 3:
+            img_data = img_data[:, :, 0]
+        # nodata values and cutoff-converted NaNs are left out of the stretch
+        invalid = img_data != img_data
+        if self.nodata is not None:
+            invalid |= img_data == self.nodata
+        thumb = np.zeros(img_data.shape, dtype=np.uint8)
+        if invalid.all():
+            return thumb
+        # get range of the valid values for visualization
+        info = np.finfo if np.issubdtype(img_data.dtype, np.floating) else np.iinfo
+        mxmin = np.min(img_data, where=~invalid, initial=info(img_data.dtype).max)
+        mxmax = np.max(img_data, where=~invalid, initial=info(img_data.dtype).min)
+        if mxmax == mxmin:
+            # A flat surface is shown at full brightness
+            thumb[~invalid] = 255
+            return thumb
+        # squash the valid values into the uint8 range, no-data stays 0
+        img_copy = 255 * ((img_data - mxmin) / (mxmax - mxmin))
+        np.copyto(thumb, img_copy, casting="unsafe", where=~invalid)
         return thumb
+
+
+def _to_uint8(img_data, chunk_size=1 << 22):
+    """Convert 16-bit data to 8-bit in chunks of rows, without a floating point copy.
+
+    Integer division by 257 (65535 / 255) matches the truncation of img_data / 65535 * 255
+    for every 16-bit value.
+
+    Parameters
+    ----------
+    img_data : numpy.ndarray
+        16-bit image data with rows along the first axis
+    chunk_size : int, optional
+        Approximate number of values converted at once, default is 4194304
+
+    Returns
+    -------
+    numpy.ndarray
+        8-bit image data
+    """
+    out = np.empty(img_data.shape, dtype=np.uint8)
+    rows = max(1, chunk_size // max(1, img_data[:1].size))
+    for start in range(0, img_data.shape[0], rows):
+        np.floor_divide(img_data[start:start + rows], 257, out=out[start:start + rows], casting="unsafe")
+    return out
+
+
+def _postprocess(img_data, mask_layer=None, native_dtype=False):
+    """Apply a mask layer and convert 16-bit data to 8-bit, shared by eager and lazy reads.
+
+    Parameters
+    ----------
+    img_data : numpy.ndarray
+        Image data with shape (rows, columns, bands), masked in place
+    mask_layer : numpy.ndarray, optional
+        Mask band with shape (rows, columns, 1), pixels with a mask value of 0 are set to 0
+    native_dtype : bool, optional
+        Keep 16-bit data instead of converting it to 8-bit, default is False
+
+    Returns
+    -------
+    numpy.ndarray
+        Processed image data
+    """
+    # Apply mask layer if it exists
+    if mask_layer is not None:
+        img_data[mask_layer[:, :, 0] == 0] = 0
+    # Check if img is uint16
+    if img_data.dtype == "uint16" and not native_dtype:
+        img_data = _to_uint8(img_data)
+    return img_data
+
+
+class LazyImage(abc.ABC):
+    """Image backed by an open rasterio dataset, pixels are only read when a window is requested."""
+
+    def __init__(self, filename: str, crs: str, transform: affine.Affine, nodata: float, indexes: list,
+                 mask_index: int = None, window: windows.Window = None, shapes: list = None,
+                 native_dtype: bool = False, dataset_mask: bool = False):
+        """Lazily read a GeoTIFF, see plantcv.geospatial.read.geotif(lazy=True).
+
+        Parameters
+        ----------
+        filename : str
+            Path of the TIF image file
+        crs : rasterio.crs.CRS
+            Coordinate reference system of the dataset
+        transform : affine.Affine
+            Affine transform of the top left pixel of the image (window)
+        nodata : float
+            Value representing missing data
+        indexes : list
+            1-based indexes of the dataset bands holding image data
+        mask_index : int, optional
+            1-based index of the dataset band holding a binary mask
+        window : rasterio.windows.Window, optional
+            Window of the dataset covered by the image, default is the full dataset
+        shapes : list, optional
+            GeoJSON-like geometries, pixels outside of them are set to nodata (as read.geotif cropto)
+        native_dtype : bool, optional
+            Keep 16-bit data instead of converting it to 8-bit (as read.geotif native_dtype)
+        dataset_mask : bool, optional
+            Use the per-dataset mask of the file (e.g. an internal TIFF mask) as the mask, default is False
+        """
+        self.filename = filename
+        self.crs = crs
+        self.transform = transform
+        self.nodata = nodata
+        self.indexes = list(indexes)
+        self.mask_index = mask_index
+        self.dataset_mask = dataset_mask
+        self.shapes = shapes
+        self.native_dtype = native_dtype
+        # Each thread reads through its own dataset handle, rasterio datasets are not thread safe
+        self._local = threading.local()
+        self._handles = []
+        src = self._dataset
+        self.window = window if window is not None else windows.Window(0, 0, src.width, src.height)
+        self.block_shape = src.block_shapes[0]
+        self._thumb = None
+
+    @property
+    def shape(self):
+        """Shape of the image data (rows, columns, bands)."""
+        return int(self.window.height), int(self.window.width), len(self.indexes)
+
+    @property
+    def dtype(self):
+        """Data type of pixels returned by read."""
+        dtype = np.dtype(self._dataset.dtypes[self.indexes[0] - 1])
+        if dtype == np.uint16 and not self.native_dtype:
+            return np.dtype(np.uint8)
+        return dtype
+
+    @property
+    def _dataset(self):
+        """Open rasterio dataset of the current thread, (re)opened on first use."""
+        src = getattr(self._local, "src", None)
+        if src is None or src.closed:
+            src = rasterio.open(self.filename, "r")
+            self._local.src = src
+            self._handles.append(src)
+        return src
+
+    def close(self):
+        """Close the underlying rasterio datasets."""
+        for src in self._handles:
+            src.close()
+        self._handles = []
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self):
+        # Open datasets cannot be pickled, they are reopened on first use
+        state = self.__dict__.copy()
+        del state["_local"], state["_handles"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._handles = []
+
+    def read(self, window=None, out_shape=None):
+        """Read a window of the image into memory.
+
+        Parameters
+        ----------
+        window : rasterio.windows.Window, optional
+            Window relative to the top left pixel of the image, default is the full image
+        out_shape : tuple, optional
+            Output shape (rows, columns) to resample the window to, default is the window size
+
+        Returns
+        -------
+        plantcv.geospatial.GEO or plantcv.geospatial.DSM
+            In-memory image of the window with a matching transform
+        """
+        img_data, transform = self._read_array(window=window, out_shape=out_shape)
+        return self._wrap(img_data, transform)
+
+    def _read_array(self, window=None, out_shape=None):
+        """Read and post-process the pixels of a window.
+
+        Parameters
+        ----------
+        window : rasterio.windows.Window, optional
+            Window relative to the top left pixel of the image, default is the full image
+        out_shape : tuple, optional
+            Output shape (rows, columns) to resample the window to, default is the window size
+
+        Returns
+        -------
+        img_data : numpy.ndarray
+            Image data with shape (rows, columns, bands)
+        transform : affine.Affine
+            Affine transform of the window
+        """
+        full = windows.Window(0, 0, self.window.width, self.window.height)
+        window = full if window is None else window.intersection(full)
+        transform = windows.transform(window, self.transform)
+        src_window = windows.Window(window.col_off + self.window.col_off, window.row_off + self.window.row_off,
+                                    window.width, window.height)
+        if out_shape is None:
+            out_shape = (int(window.height), int(window.width))
+        else:
+            transform = transform * affine.Affine.scale(window.width / out_shape[1], window.height / out_shape[0])
+        img_data = self._dataset.read(self.indexes, window=src_window, out_shape=(len(self.indexes), *out_shape))
+        # reshape such that z-dimension is last
+        img_data = np.ascontiguousarray(img_data.transpose(1, 2, 0))
+        mask_layer = None
+        if self.mask_index is not None:
+            mask_layer = self._dataset.read(self.mask_index, window=src_window, out_shape=out_shape)[:, :, np.newaxis]
+        elif self.dataset_mask:
+            mask_layer = self._dataset.read_masks(self.indexes[0], window=src_window,
+                                                  out_shape=out_shape)[:, :, np.newaxis]
+        if self.shapes is not None:
+            # Fill pixels outside of the crop shapes as rasterio.mask.mask does
+            outside = features.geometry_mask(self.shapes, out_shape=out_shape, transform=transform)
+            img_data[outside] = self.nodata if self.nodata is not None else 0
+        return _postprocess(img_data, mask_layer, self.native_dtype), transform
+
+    def read_bounds(self, bounds):
+        """Read the pixels covering a bounding box into memory.
+
+        Parameters
+        ----------
+        bounds : tuple
+            Bounding box (left, bottom, right, top) in the CRS of the image
+
+        Returns
+        -------
+        plantcv.geospatial.GEO or plantcv.geospatial.DSM
+            In-memory image of the bounding box
+        """
+        window = windows.from_bounds(*bounds, transform=self.transform)
+        return self.read(window.round_offsets(op="floor").round_lengths(op="ceil"))
+
+    def block_windows(self, tile_size=1024):
+        """Windows covering the image, aligned to the internal block layout of the file.
+
+        Tiles are whole multiples of the file blocks (at least tile_size pixels on each edge
+        when the blocks are smaller), so every block is decoded exactly once.
+
+        Parameters
+        ----------
+        tile_size : int, optional
+            Target tile edge length in pixels, default is 1024
+
+        Yields
+        ------
+        rasterio.windows.Window
+            Window relative to the top left pixel of the image
+        """
+        block_rows, block_cols = self.block_shape
+        tile_rows = max(block_rows, tile_size // block_rows * block_rows)
+        tile_cols = max(block_cols, tile_size // block_cols * block_cols)
+        row_off, col_off = int(self.window.row_off), int(self.window.col_off)
+        height, width = self.shape[:2]
+        # Tiles are aligned to the blocks of the dataset, not to the (cropped) image
+        for row in range(row_off // tile_rows * tile_rows, row_off + height, tile_rows):
+            row_start, row_stop = max(row, row_off), min(row + tile_rows, row_off + height)
+            for col in range(col_off // tile_cols * tile_cols, col_off + width, tile_cols):
+                col_start, col_stop = max(col, col_off), min(col + tile_cols, col_off + width)
+                yield windows.Window(col_start - col_off, row_start - row_off,
+                                     col_stop - col_start, row_stop - row_start)
+
+    def tiles(self, tile_size=1024):
+        """Iterate over block-aligned tiles of the image.
+
+        Parameters
+        ----------
+        tile_size : int, optional
+            Target tile edge length in pixels, default is 1024
+
+        Yields
+        ------
+        window : rasterio.windows.Window
+            Window of the tile relative to the top left pixel of the image
+        tile : plantcv.geospatial.GEO or plantcv.geospatial.DSM
+            In-memory image of the tile
+        """
+        for window in self.block_windows(tile_size=tile_size):
+            yield window, self.read(window)
+
+    def to_cog(self, filename, **kwargs):
+        """Write the image to a Cloud-Optimized GeoTIFF file.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the output TIF file
+        **kwargs
+            Options passed to plantcv.geospatial.write.geotif
+
+        Returns
+        -------
+        str
+            Path of the output TIF file
+        """
+        # Imported here since the writer depends on this module
+        from plantcv.geospatial.write.geotif import geotif
+        return geotif(self, filename, **kwargs)
+
+    def load(self):
+        """Read the full image into memory.
+
+        Returns
+        -------
+        plantcv.geospatial.GEO or plantcv.geospatial.DSM
+            In-memory image
+        """
+        return self.read()
+
+    def overview(self, max_size=1024):
+        """Read a decimated copy of the full image (uses overviews when the file has them).
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Largest edge length in pixels, default is 1024
+
+        Returns
+        -------
+        plantcv.geospatial.GEO or plantcv.geospatial.DSM
+            Decimated in-memory image with a matching transform
+        """
+        height, width = self.shape[:2]
+        scale = min(1.0, max_size / max(height, width))
+        return self.read(out_shape=(max(1, round(height * scale)), max(1, round(width * scale))))
+
+    @property
+    def thumb(self):
+        """Thumbnail image from a decimated read of the full image."""
+        if self._thumb is None:
+            self._thumb = self.overview().thumb
+        return self._thumb
+
+    @abc.abstractmethod
+    def _wrap(self, img_data, transform):
+        """Image instance holding data read from the dataset.
+
+        Parameters
+        ----------
+        img_data : numpy.ndarray
+            Image data read from a window of the dataset
+        transform : affine.Affine
+            Affine transform of the top left pixel of the window
+
+        Returns
+        -------
+        GEO or DSM
+            Image instance of the subclass
+        """
+
+
+class LazyGEO(LazyImage):
+    """Lazily read multi-band geospatial image, windows are read into GEO instances."""
+
+    def __init__(self, filename: str, wavelengths: list, default_wavelengths: list, crs: str,
+                 transform: affine.Affine, nodata: float, indexes: list, mask_index: int = None,
+                 window: windows.Window = None, shapes: list = None, native_dtype: bool = False,
+                 dataset_mask: bool = False):
+        super().__init__(filename=filename, crs=crs, transform=transform, nodata=nodata, indexes=indexes,
+                         mask_index=mask_index, window=window, shapes=shapes, native_dtype=native_dtype,
+                         dataset_mask=dataset_mask)
+        self.wavelengths = wavelengths
+        self.default_wavelengths = default_wavelengths
+
+    def _wrap(self, img_data, transform):
+        return GEO(input_array=img_data, filename=self.filename, wavelengths=self.wavelengths,
+                   default_wavelengths=self.default_wavelengths, crs=self.crs, transform=transform,
+                   nodata=self.nodata)
+
+
+class LazyDSM(LazyImage):
+    """Lazily read digital surface model, windows are read into DSM instances."""
+
+    def __init__(self, filename: str, crs: str, transform: affine.Affine, cutoff: float, nodata: float,
+                 indexes: list, mask_index: int = None, window: windows.Window = None, shapes: list = None,
+                 native_dtype: bool = False, cutoff_method: str = "exact", dataset_mask: bool = False):
+        super().__init__(filename=filename, crs=crs, transform=transform, nodata=nodata, indexes=indexes,
+                         mask_index=mask_index, window=window, shapes=shapes, native_dtype=native_dtype,
+                         dataset_mask=dataset_mask)
+        self.cutoff = cutoff
+        self.cutoff_method = cutoff_method
+        self._cutoff_value = None
+
+    def cutoff_value(self):
+        """Height at the cutoff quantile of the full DSM, pixels at or above it are converted to NaN.
+
+        The DSM is streamed block by block, read twice for the exact quantile and once with
+        cutoff_method="histogram", so it is never loaded in memory.
+
+        Returns
+        -------
+        float or None
+            Cutoff height, None if no cutoff is set
+        """
+        if self.cutoff is not None and self._cutoff_value is None:
+            with profiler.stage("cutoff", "LazyDSM"):
+                self._cutoff_value = _streaming_quantile(
+                    lambda: (self._read_array(window)[0] for window in self.block_windows()),
+                    self.cutoff, exact=self.cutoff_method == "exact")
+        return self._cutoff_value
+
+    def _wrap(self, img_data, transform):
+        if self.cutoff is not None:
+            img_data[img_data >= self.cutoff_value()] = np.nan
+        obj = DSM(input_array=img_data, filename=self.filename, crs=self.crs, transform=transform,
+                  cutoff=None, nodata=self.nodata, cutoff_method=self.cutoff_method)
+        obj.cutoff = self.cutoff
+        return obj
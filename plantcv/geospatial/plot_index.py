@@ -0,0 +1,247 @@
+# Reusable plot polygons rasterized onto the pixel grid of an image
+import os
+import hashlib
+import numpy as np
+import geopandas
+from plantcv.geospatial._globals import profiler
+from plantcv.geospatial._zonal import _Zones
+from plantcv.geospatial.images import LazyImage
+
+# Properties searched (in order) for plot IDs
+_ID_PROPERTIES = ("PlotName", "ID", "FID", "plot_ids")
+
+
+def _resolve_ids(gdf):
+    """Resolve plot IDs from the properties of a GeoDataFrame.
+
+    Parameters
+    ----------
+    gdf : geopandas.GeoDataFrame
+        Plot polygons and properties
+
+    Returns
+    -------
+    list
+        List of plot IDs, default labels "1", "2", ... if no ID property is present
+    """
+    for prop in _ID_PROPERTIES:
+        if prop in gdf.columns:
+            return gdf[prop].tolist()
+    # If there are no IDs in the geojson then use default labels
+    return [str(i + 1) for i in range(len(gdf))]
+
+
+def _grid_key(img):
+    """Hashable description of the pixel grid of an image.
+
+    Parameters
+    ----------
+    img : plantcv.geospatial.images.GEO or DSM object
+        Image providing the transform and shape
+
+    Returns
+    -------
+    tuple
+        (transform coefficients, rows, columns)
+    """
+    return tuple(img.transform)[:6], tuple(img.shape[:2])
+
+
+class PlotIndex:
+    """Plot polygons from a geojson, reprojected and rasterized onto the pixel grid of an image."""
+
+    def __init__(self, geojson, img, cache_dir=None, all_touched=False):
+        """Read, reproject and rasterize plot polygons once for reuse across functions.
+
+        Parameters
+        ----------
+        geojson : str
+            Path to the shape file containing the plot polygons.
+        img : plantcv.geospatial.images.GEO or DSM object
+            Image defining the CRS and the pixel grid (transform and shape).
+        cache_dir : str, optional
+            Directory used to cache the plot label rasters of in-memory images between runs. The
+            cache is keyed by the geojson file contents, CRS, transform and shape. Default is None
+            (no cache).
+        all_touched : bool, optional
+            Include every pixel touched by a polygon rather than only pixels whose center
+            is within it. Default is False.
+        """
+        self.geojson = geojson
+        self.cache_dir = cache_dir
+        self.all_touched = all_touched
+        self.crs = img.crs
+        self.gdf = geopandas.read_file(geojson)
+        # Reproject the plots to the CRS of the image if needed
+        if self.gdf.crs is not None and self.crs is not None and not self.gdf.crs == self.crs:
+            self.gdf = self.gdf.to_crs(crs=self.crs)
+        self.ids = _resolve_ids(self.gdf)
+        self.transform = img.transform
+        self.shape = tuple(img.shape[:2])
+        self._file_hash = None
+        self._zones = {}
+        self._key = _grid_key(img)
+        self.zones(img)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def geometries(self):
+        """Plot polygons in the CRS of the image.
+
+        Returns
+        -------
+        geopandas.GeoSeries
+            Plot geometries
+        """
+        return self.gdf.geometry
+
+    @property
+    def labels(self):
+        """Label raster of the plots on the pixel grid of the image, plot i is labelled i + 1.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            Label raster, None until the plots are used with an in-memory image of the grid
+        """
+        return self._zones[self._key].labels
+
+    @property
+    def pixels(self):
+        """Flat pixel indices of plots that overlap another plot, which are left out of labels.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            Plot i also owns pixels[offsets[i]:offsets[i + 1]]
+        """
+        return self._zones[self._key].pixels
+
+    @property
+    def offsets(self):
+        """Start of the pixels of each plot in pixels, with a final entry for the end.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            Offsets of length len(plots) + 1
+        """
+        return self._zones[self._key].offsets
+
+    def zones(self, img):
+        """Plots prepared for tile by tile rasterization on the pixel grid of an image.
+
+        Zones are prepared once per pixel grid and reused, so images that share the grid of
+        the index (e.g. a mask or a DSM of the same orthomosaic) are free. Plots are burned
+        into a label raster of the full grid for in-memory images, and one tile at a time
+        for lazily read images.
+
+        Parameters
+        ----------
+        img : plantcv.geospatial.images.GEO or DSM object, or a LazyGEO or LazyDSM
+            Image defining the pixel grid
+
+        Returns
+        -------
+        plantcv.geospatial._zonal._Zones
+            Plots on the pixel grid of the image
+        """
+        key = _grid_key(img)
+        if key not in self._zones:
+            self._zones[key] = self._prepare_zones(img)
+        zones = self._zones[key]
+        if not isinstance(img, LazyImage) and zones.labels is None:
+            self._load_labels(zones, key, getattr(img, "crs", None))
+        return zones
+
+    def _prepare_zones(self, img):
+        """Plot polygons in the CRS of an image, ready to rasterize on its pixel grid.
+
+        Parameters
+        ----------
+        img : plantcv.geospatial.images.GEO or DSM object, or a LazyGEO or LazyDSM
+            Image defining the pixel grid
+
+        Returns
+        -------
+        plantcv.geospatial._zonal._Zones
+            Plots on the pixel grid of the image
+        """
+        img_crs = getattr(img, "crs", None)
+        geometries = self.geometries
+        if img_crs is not None and self.crs is not None and not img_crs == self.crs:
+            geometries = geometries.to_crs(crs=img_crs)
+        return _Zones(geometries, img.transform, img.shape[:2], all_touched=self.all_touched)
+
+    def _load_labels(self, zones, key, crs):
+        """Read the plot label raster from the on-disk cache, or rasterize (and cache) it.
+
+        Parameters
+        ----------
+        zones : plantcv.geospatial._zonal._Zones
+            Plots on the pixel grid
+        key : tuple
+            Pixel grid key from _grid_key
+        crs : rasterio.crs.CRS or None
+            CRS of the pixel grid
+        """
+        cache_file = None
+        if self.cache_dir is not None:
+            cache_file = os.path.join(self.cache_dir, f"plot_index_{self._cache_key(key, crs, zones.tile_size)}.npz")
+            if os.path.exists(cache_file):
+                with np.load(cache_file) as cached:
+                    zones.labels, zones.pixels, zones.offsets = cached["labels"], cached["pixels"], cached["offsets"]
+                return
+        with profiler.stage("rasterize", "PlotIndex"):
+            zones.rasterize()
+        if cache_file is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.savez(cache_file, labels=zones.labels, pixels=zones.pixels, offsets=zones.offsets)
+
+    def _cache_key(self, key, crs, tile_size):
+        """Cache key from the geojson contents, CRS, pixel grid, tile grid and rasterization rule.
+
+        Parameters
+        ----------
+        key : tuple
+            Pixel grid key from _grid_key
+        crs : rasterio.crs.CRS or None
+            CRS of the pixel grid
+        tile_size : int
+            Edge length in pixels of the rasterized tiles
+
+        Returns
+        -------
+        str
+            Hex digest identifying the plot label raster
+        """
+        if self._file_hash is None:
+            file_hash = hashlib.sha256()
+            with open(self.geojson, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    file_hash.update(chunk)
+            self._file_hash = file_hash.hexdigest()
+        crs_wkt = crs.to_wkt() if crs is not None else ""
+        return hashlib.sha256(repr((self._file_hash, crs_wkt, key, tile_size, self.all_touched)).encode()).hexdigest()
+
+
+def _plot_index(img, geojson):
+    """Use a PlotIndex as is, or build one from a path to a geojson.
+
+    Parameters
+    ----------
+    img : plantcv.geospatial.images.GEO or DSM object
+        Image defining the CRS and pixel grid
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the plot polygons, or a PlotIndex
+
+    Returns
+    -------
+    plantcv.geospatial.PlotIndex
+        Plot index for the image
+    """
+    if isinstance(geojson, PlotIndex):
+        return geojson
+    return PlotIndex(geojson=geojson, img=img)
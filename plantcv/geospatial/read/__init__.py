@@ -1,5 +1,10 @@
-from plantcv.geospatial.read.geotif import geotif
-from plantcv.geospatial.read.netcdf import netcdf
+from plantcv.geospatial._lazy import _attach
 
 
-__all__ = ["geotif", "netcdf"]
+__all__ = ["geotif", "netcdf", "plot_chips"]
+
+__getattr__, __dir__ = _attach(__name__, {
+    "geotif": ("plantcv.geospatial.read.geotif", "geotif"),
+    "netcdf": ("plantcv.geospatial.read.netcdf", "netcdf"),
+    "plot_chips": ("plantcv.geospatial.read.plot_chips", "plot_chips"),
+})
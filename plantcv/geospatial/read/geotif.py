@@ -5,9 +5,14 @@ import rasterio
 import numpy as np
 import fiona
 from rasterio.mask import mask
+from rasterio.features import geometry_window, geometry_mask
+from rasterio.windows import Window
+from rasterio.enums import ColorInterp, MaskFlags
+from affine import Affine
 from plantcv.plantcv import warn, params, fatal_error
 from plantcv.plantcv._debug import _debug
-from plantcv.geospatial.images import GEO, DSM
+from plantcv.geospatial._globals import profiler
+from plantcv.geospatial.images import GEO, DSM, LazyGEO, LazyDSM, _postprocess
 from shapely.geometry import shape, MultiPoint, mapping
 
 
@@ -49,6 +54,33 @@ def _parse_bands(bands):
     return band_list
 
 
+def _crop_shapes(cropto):
+    """Read the shapes used to crop an image from a shapefile.
+
+    Parameters
+    ----------
+    cropto : str
+        Path to the shapefile. Supports polygon-type shapefiles (single feature)
+        and point-type shapefiles (convex hull is computed).
+
+    Returns
+    -------
+    list
+        GeoJSON-like geometries
+    """
+    with fiona.open(cropto, 'r') as shapefile:
+        # polygon-type shapefile
+        if len(shapefile) == 1:
+            shapes = [feature['geometry'] for feature in shapefile]
+        # points-type shapefile
+        else:
+            points = [shape(feature["geometry"]) for feature in shapefile]
+            multi_point = MultiPoint(points)
+            convex_hull = multi_point.convex_hull
+            shapes = [mapping(convex_hull)]
+    return shapes
+
+
 def _read_geotif_and_shapefile(filename, cropto):
     """Read Georeferenced TIF image from file and optionally crop to a
     shapefile boundary.
@@ -68,94 +100,605 @@ def _read_geotif_and_shapefile(filename, cropto):
         Image data array with shape ``(bands, height, width)``.
     metadata : dict
         Rasterio metadata dictionary including CRS, transform, and driver
-        information.
+        information, the indices of the mask bands declared by the dataset
+        (``mask_bands``) and its per-dataset mask (``dataset_mask``, None if it has none).
     """
     if cropto:
-        with fiona.open(cropto, 'r') as shapefile:
-            # polygon-type shapefile
-            if len(shapefile) == 1:
-                shapes = [feature['geometry'] for feature in shapefile]
-            # points-type shapefile
-            else:
-                points = [shape(feature["geometry"]) for feature in shapefile]
-                multi_point = MultiPoint(points)
-                convex_hull = multi_point.convex_hull
-                shapes = [mapping(convex_hull)]
+        shapes = _crop_shapes(cropto)
         # rasterio does the cropping within open
-        with rasterio.open(filename, 'r') as src:
+        with profiler.stage("crop", "read.geotif"), rasterio.open(filename, 'r') as src:
             img_data, trans_metadata = mask(src, shapes, crop=True)
             metadata = src.meta.copy()
-            metadata.update({"transform": trans_metadata})
+            metadata.update({"transform": trans_metadata, "mask_bands": _declared_mask_bands(src),
+                             "dataset_mask": _read_dataset_mask(src, geometry_window(src, shapes))})
     else:
-        with rasterio.open(filename, 'r') as img:
+        with profiler.stage("read", "read.geotif"), rasterio.open(filename, 'r') as img:
             img_data = img.read()
             metadata = img.meta.copy()
+            metadata.update({"mask_bands": _declared_mask_bands(img), "dataset_mask": _read_dataset_mask(img)})
 
     return img_data, metadata
 
 
-def geotif(filename, bands="R,G,B", cropto=None, cutoff=None):
-    """Read Georeferenced TIF image from file.
+def _not_equal(values, value):
+    """Elementwise comparison of values to a value, NaN is equal to NaN (as in np.unique).
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Array of values
+    value : scalar
+        Value to compare to
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean array, True where values differ from value
+    """
+    if value != value:
+        return ~np.isnan(values)
+    return values != value
+
+
+def _count_unique(img_data, limit, chunk_size=1 << 20):
+    """Count the unique values of an array, stopping as soon as limit values are found.
+
+    The array is scanned in chunks of rows, so images with many values are resolved
+    from their first rows without sorting the full array.
+
+    Parameters
+    ----------
+    img_data : numpy.ndarray
+        Image data with rows along the first axis
+    limit : int
+        Number of unique values at which counting stops
+    chunk_size : int, optional
+        Approximate number of values per chunk, default is 1048576
+
+    Returns
+    -------
+    int
+        Number of unique values, at most limit
+    """
+    rows = max(1, chunk_size // max(1, img_data[:1].size))
+    return _count_unique_chunks((img_data[start:start + rows] for start in range(0, img_data.shape[0], rows)), limit)
+
+
+def _count_unique_chunks(chunks, limit):
+    """Count the unique values of an array read chunk by chunk, stopping as soon as limit values are found.
+
+    Parameters
+    ----------
+    chunks : iterable of numpy.ndarray
+        Chunks of image data
+    limit : int
+        Number of unique values at which counting stops
+
+    Returns
+    -------
+    int
+        Number of unique values, at most limit
+    """
+    found = []
+    for chunk in chunks:
+        chunk = np.asarray(chunk).ravel()
+        differ = np.ones(chunk.shape, dtype=bool)
+        for value in found:
+            differ &= _not_equal(chunk, value)
+        while differ.any():
+            value = chunk[np.argmax(differ)]
+            found.append(value)
+            if len(found) >= limit:
+                return limit
+            differ &= _not_equal(chunk, value)
+    return len(found)
+
+
+def _has_dataset_mask(src):
+    """Check the GDAL mask flags of a dataset for a per-dataset mask that is not an alpha band.
+
+    Parameters
+    ----------
+    src : rasterio.io.DatasetReader
+        Open dataset
+
+    Returns
+    -------
+    bool
+        True if the dataset has a mask shared by all bands, e.g. an internal TIFF mask or a .msk file
+    """
+    return any(MaskFlags.per_dataset in flags and MaskFlags.alpha not in flags for flags in src.mask_flag_enums)
+
+
+def _declared_mask_bands(src):
+    """Find the mask bands declared by the GDAL mask flags and color interpretation of a dataset.
+
+    Parameters
+    ----------
+    src : rasterio.io.DatasetReader
+        Open dataset
+
+    Returns
+    -------
+    list or None
+        Indices of the alpha bands, an empty list if the dataset has a per-dataset mask
+        instead of mask bands, None if the bands have to be scanned for mask bands
+    """
+    alpha = [i for i, interp in enumerate(src.colorinterp) if interp == ColorInterp.alpha]
+    if alpha:
+        return alpha
+    if _has_dataset_mask(src):
+        return []
+    return None
+
+
+def _read_dataset_mask(src, window=None):
+    """Read the per-dataset mask of a dataset.
+
+    Parameters
+    ----------
+    src : rasterio.io.DatasetReader
+        Open dataset
+    window : rasterio.windows.Window, optional
+        Window of the dataset, default is the full dataset
+
+    Returns
+    -------
+    numpy.ndarray or None
+        Mask with shape (rows, columns), 0 where pixels are invalid, None if the dataset
+        has no per-dataset mask
+    """
+    if not _has_dataset_mask(src):
+        return None
+    return src.read_masks(1, window=window)
+
+
+def _mask_bands(img_data, declared=None):
+    """Find binary mask bands (exactly two unique values) in image data.
+
+    Mask bands declared by the dataset are used as they are, otherwise bands are
+    scanned and rejected as soon as a third value is found.
+
+    Parameters
+    ----------
+    img_data : numpy.ndarray
+        Image data with shape (rows, columns, bands)
+    declared : list, optional
+        Indices of the mask bands declared by the dataset, from _declared_mask_bands
+
+    Returns
+    -------
+    list
+        Indices of the mask bands
+    """
+    if declared is not None:
+        return declared
+    return [i for i in range(img_data.shape[2]) if _count_unique(img_data[:, :, i], limit=3) == 2]
+
+
+def _is_empty(img_data):
+    """Check if image data only contains a single value (e.g. only no-data).
+
+    Parameters
+    ----------
+    img_data : numpy.ndarray
+        Image data with shape (rows, columns, bands)
+
+    Returns
+    -------
+    bool
+        True if every pixel has the same value
+    """
+    return _count_unique(img_data, limit=2) == 1
+
+
+def _match_bands(bands, depth, filename):
+    """Match the band labels to the number of image bands.
+
+    Parameters
+    ----------
+    bands : list
+        List of wavelengths
+    depth : int
+        Number of image (non-mask) bands
+    filename : str
+        Path of the TIF image file, used in messages
+
+    Returns
+    -------
+    list
+        List of wavelengths, extended with labels for extra bands
+    """
+    # Check if user input matches image dimension in z direction
+    if depth > len(bands):
+        warn(f"{depth} bands found in the image data but {filename} was provided with {bands}. " +
+             "Assigning band labels to the extra bands starting from max provided band.")
+        for i in range(depth - len(bands)):
+            bands.append(i + 1 + max(bands))
+    if depth < len(bands):
+        fatal_error("your image depth is less than the specified number of bands")
+    return bands
+
+
+def _subset_bands(indexes, bands, subset, filename):
+    """Select the dataset bands matching a subset of wavelengths.
+
+    Parameters
+    ----------
+    indexes : list
+        1-based indexes of the dataset bands holding image data
+    bands : list
+        List of wavelengths of the image bands
+    subset : list
+        Wavelengths of the bands to read
+    filename : str
+        Path of the TIF image file, used in messages
+
+    Returns
+    -------
+    indexes : list
+        1-based indexes of the selected dataset bands
+    bands : list
+        Wavelengths of the selected bands
+    """
+    for wavelength in subset:
+        if wavelength not in bands:
+            fatal_error(f"Band {wavelength} was requested but {filename} has the bands {bands}.")
+    selected = [bands.index(wavelength) for wavelength in subset]
+    return [indexes[i] for i in selected], [bands[i] for i in selected]
+
+
+def _read_sample(src, window, shapes, indexes, out_shape=None):
+    """Read bands of a window, filling pixels outside of the crop shapes as in the cropped image.
+
+    Parameters
+    ----------
+    src : rasterio.io.DatasetReader
+        Open dataset
+    window : rasterio.windows.Window
+        Window of the dataset
+    shapes : list or None
+        GeoJSON-like geometries used to crop the image
+    indexes : list
+        1-based indexes of the bands to read
+    out_shape : tuple, optional
+        Output shape (rows, columns), default is the window size
+
+    Returns
+    -------
+    numpy.ndarray
+        Image data with shape (rows, columns, bands)
+    """
+    if out_shape is None:
+        out_shape = (int(window.height), int(window.width))
+    sample = src.read(indexes, window=window, out_shape=(len(indexes), *out_shape)).transpose(1, 2, 0)
+    if shapes:
+        sample_transform = src.window_transform(window) * Affine.scale(window.width / out_shape[1],
+                                                                       window.height / out_shape[0])
+        sample[geometry_mask(shapes, out_shape=out_shape, transform=sample_transform)] = src.nodata or 0
+    return sample
+
+
+def _scan_unique(src, window, shapes, indexes, limit, chunk_size=1 << 22):
+    """Count the unique values of bands of a window, read strip by strip at full resolution.
+
+    Parameters
+    ----------
+    src : rasterio.io.DatasetReader
+        Open dataset
+    window : rasterio.windows.Window
+        Window of the dataset
+    shapes : list or None
+        GeoJSON-like geometries used to crop the image
+    indexes : list
+        1-based indexes of the bands to scan
+    limit : int
+        Number of unique values at which scanning stops
+    chunk_size : int, optional
+        Approximate number of values per strip, default is 4194304
+
+    Returns
+    -------
+    int
+        Number of unique values of all the bands together, at most limit
+    """
+    height, width = int(window.height), int(window.width)
+    block_rows = src.block_shapes[0][0]
+    rows = max(1, chunk_size // max(1, width * len(indexes)) // block_rows) * block_rows
+    strips = (_read_sample(src, Window(window.col_off, window.row_off + row, width, min(rows, height - row)),
+                           shapes, indexes) for row in range(0, height, rows))
+    return _count_unique_chunks(strips, limit)
+
+
+def _detect_bands(src, window, shapes, sample_shape=None):
+    """Find mask bands and empty images without reading every band of the full image.
+
+    One internal block at the center of the image is read first. Bands holding more than
+    two values in it are neither mask bands nor empty, only the remaining bands are read
+    in a sample of the image. Unless the sample is at full resolution, mask bands and empty
+    images found in the sample are confirmed by scanning the bands block by block, so
+    sparse images (e.g. a small field in a large no-data mosaic) are never rejected.
+
+    Parameters
+    ----------
+    src : rasterio.io.DatasetReader
+        Open dataset
+    window : rasterio.windows.Window
+        Window of the dataset covered by the image
+    shapes : list or None
+        GeoJSON-like geometries used to crop the image
+    sample_shape : tuple, optional
+        Shape (rows, columns) of the sample, e.g. the shape of an eager read. Default is a
+        decimated sample of at most 1024 pixels on each edge (from the overviews when the
+        file has them)
+
+    Returns
+    -------
+    mask_bands : list
+        Indices of the mask bands
+    empty : bool
+        True if the image (without mask bands) only contains a single value
+    """
+    block_rows, block_cols = src.block_shapes[0]
+    probe_window = Window((int(window.col_off) + int(window.width) // 2) // block_cols * block_cols,
+                          (int(window.row_off) + int(window.height) // 2) // block_rows * block_rows,
+                          block_cols, block_rows).intersection(window)
+    probe = _read_sample(src, probe_window, shapes, list(range(1, src.count + 1)))
+    if sample_shape is None:
+        scale = min(1.0, 1024 / max(window.height, window.width))
+        sample_shape = (max(1, round(window.height * scale)), max(1, round(window.width * scale)))
+    # Verdicts from a decimated sample are confirmed at full resolution
+    scan = tuple(sample_shape) != (int(window.height), int(window.width))
+    samples = {}
+    mask_bands = _declared_mask_bands(src)
+    if mask_bands is None:
+        candidates = [i for i in range(src.count) if _count_unique(probe[:, :, i], limit=3) < 3]
+        mask_bands = _sample_mask_bands(src, window, shapes, candidates, sample_shape, samples)
+        if scan:
+            mask_bands = [i for i in mask_bands if _scan_unique(src, window, shapes, [i + 1], limit=3) == 2]
+    data_bands = [i for i in range(src.count) if i not in mask_bands]
+    if not _is_empty(probe[:, :, data_bands]):
+        return mask_bands, False
+    # Every data band holds a single value in the probe block
+    missing = [i for i in data_bands if i not in samples]
+    if missing:
+        sample = _read_sample(src, window, shapes, [i + 1 for i in missing], sample_shape)
+        samples.update({band: sample[:, :, [i]] for i, band in enumerate(missing)})
+    if not _is_empty(np.concatenate([samples[i] for i in data_bands], axis=2)):
+        return mask_bands, False
+    if scan:
+        return mask_bands, _scan_unique(src, window, shapes, [i + 1 for i in data_bands], limit=2) == 1
+    return mask_bands, True
+
+
+def _sample_mask_bands(src, window, shapes, candidates, sample_shape, samples):
+    """Find the mask bands among candidate bands from a sample of the image.
+
+    Parameters
+    ----------
+    src : rasterio.io.DatasetReader
+        Open dataset
+    window : rasterio.windows.Window
+        Window of the dataset covered by the image
+    shapes : list or None
+        GeoJSON-like geometries used to crop the image
+    candidates : list
+        Indices of the bands to check
+    sample_shape : tuple
+        Shape (rows, columns) of the sample
+    samples : dict
+        Sampled bands keyed by band index, the candidate bands are added to it
+
+    Returns
+    -------
+    list
+        Indices of the candidate bands with exactly two values in the sample
+    """
+    if not candidates:
+        return []
+    sample = _read_sample(src, window, shapes, [i + 1 for i in candidates], sample_shape)
+    samples.update({band: sample[:, :, [i]] for i, band in enumerate(candidates)})
+    return [candidates[i] for i in _mask_bands(sample)]
+
+
+def _lazy_geotif(filename, bands, cropto, cutoff, native_dtype=False, subset=None, cutoff_method="exact",
+                 eager=False, out_shape=None, gsd=None):
+    """Open a Georeferenced TIF image without reading its pixels.
+
+    Mask bands and empty images are detected from a probe block and a decimated sample
+    of the image, confirmed block by block when the sample finds a mask band or an empty
+    image (see _detect_bands). For eager reads the sample is read at the output resolution.
 
     Parameters
     ----------
     filename : str
         Path of the TIF image file.
-    bands : str or list, optional
-        Comma-separated string listing the order of bands (e.g., "R,G,B") or a
-        list of wavelengths.
-        Supported band symbols: R, G, B, RE, N, NIR, GRAY. Default is "R,G,B".
-    cropto : str, optional
-        Path of the shapefile to crop the image. Default is None.
-    cutoff : float, optional
-        Percentile above which to remove points (only used for grayscale
-        images). Default is None.
+    bands : list
+        List of wavelengths.
+    cropto : str or None
+        Path of the shapefile to crop the image.
+    cutoff : float or None
+        Percentile above which to remove points (only used for grayscale images).
+    native_dtype : bool, optional
+        Keep 16-bit data instead of converting it to 8-bit. Default is False.
+    subset : list, optional
+        Wavelengths of the bands to read, default is None (all bands).
+    cutoff_method : str, optional
+        "exact" or "histogram" quantile for the cutoff. Default is "exact".
+    eager : bool, optional
+        The image is opened to be read at once at out_shape or gsd, default is False.
+    out_shape : tuple, optional
+        Output shape (rows, columns) of an eager read. Default is None (full resolution).
+    gsd : float, optional
+        Output ground sample distance of an eager read. Default is None (full resolution).
+
+    Returns
+    -------
+    plantcv.geospatial.LazyGEO or plantcv.geospatial.LazyDSM
+        Lazily read orthomosaic.
+    """
+    shapes = _crop_shapes(cropto) if cropto else None
+    with rasterio.open(filename, 'r') as src:
+        window = geometry_window(src, shapes) if shapes else Window(0, 0, src.width, src.height)
+        transform = src.window_transform(window)
+        crs, nodata, count = src.crs, src.nodata, src.count
+        dataset_mask = _has_dataset_mask(src)
+        sample_shape = None
+        if eager:
+            sample_shape = (_reduced_shape((int(window.height), int(window.width)), transform, out_shape, gsd) or
+                            (int(window.height), int(window.width)))
+        # Check for mask
+        with profiler.stage("mask_detection", "read.geotif"):
+            mask_band_indices, empty = _detect_bands(src, window, shapes, sample_shape)
+    if (count == 1 and len(bands) > 1):
+        warn(f"Bands specified as {bands} but data has 1 channel, bands have been reset to GRAY for a DSM.")
+        bands = [0]
+    indexes = [i + 1 for i in range(count) if i not in mask_band_indices]
+    mask_index = mask_band_indices[-1] + 1 if mask_band_indices else None
+    bands = _match_bands(bands, len(indexes), filename)
+    if empty:
+        # If totally uniform then indicates image only contains no-data value
+        fatal_error(f"your image is empty, are the crop-to bounds outside of the {filename} image area?")
+    # Multi-band images stay GEO instances when a single band is selected
+    multiband = len(indexes) > 1
+    if subset is not None:
+        indexes, bands = _subset_bands(indexes, bands, subset, filename)
+    if multiband:
+        return LazyGEO(filename=filename, wavelengths=bands, default_wavelengths=[480, 560, 670], crs=crs,
+                       transform=transform, nodata=nodata, indexes=indexes, mask_index=mask_index,
+                       window=window, shapes=shapes, native_dtype=native_dtype, dataset_mask=dataset_mask)
+    return LazyDSM(filename=filename, crs=crs, transform=transform, cutoff=cutoff, nodata=nodata,
+                   indexes=indexes, mask_index=mask_index, window=window, shapes=shapes, native_dtype=native_dtype,
+                   cutoff_method=cutoff_method, dataset_mask=dataset_mask)
+
+
+def _partial_geotif(filename, bands, cropto, cutoff, out_shape=None, gsd=None, native_dtype=False, subset=None,
+                    cutoff_method="exact"):
+    """Read a subset of the bands of a Georeferenced TIF image, optionally at a reduced resolution.
+
+    Only the selected bands are read from the file. Reduced resolution images are read
+    with decimated reads (from the overviews when the file has them), so the full
+    resolution image is never read into memory.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the TIF image file.
+    bands : list
+        List of wavelengths.
+    cropto : str or None
+        Path of the shapefile to crop the image.
+    cutoff : float or None
+        Percentile above which to remove points (only used for grayscale images).
+    out_shape : tuple, optional
+        Output shape (rows, columns). Default is None (full resolution).
+    gsd : float, optional
+        Output ground sample distance in units of the CRS. Default is None (full resolution).
+    native_dtype : bool, optional
+        Keep 16-bit data instead of converting it to 8-bit. Default is False.
+    subset : list, optional
+        Wavelengths of the bands to read, default is None (all bands).
+    cutoff_method : str, optional
+        "exact" or "histogram" quantile for the cutoff. Default is "exact".
+
+    Returns
+    -------
+    plantcv.geospatial.GEO or plantcv.geospatial.DSM
+        Orthomosaic image data with a matching transform.
+    """
+    # The cutoff quantile is found from the reduced image, as for a full resolution read
+    with _lazy_geotif(filename, bands, cropto, cutoff=None, native_dtype=native_dtype, subset=subset, eager=True,
+                      out_shape=out_shape, gsd=gsd) as img:
+        with profiler.stage("read", "read.geotif"):
+            img_data, transform = img._read_array(out_shape=_reduced_shape(img.shape[:2], img.transform,
+                                                                           out_shape, gsd))
+    if isinstance(img, LazyGEO):
+        obj = GEO(input_array=img_data, filename=filename, wavelengths=img.wavelengths,
+                  default_wavelengths=img.default_wavelengths, crs=img.crs, transform=transform, nodata=img.nodata)
+    else:
+        obj = DSM(input_array=img_data, filename=filename, crs=img.crs, transform=transform, nodata=img.nodata,
+                  cutoff=cutoff, cutoff_method=cutoff_method)
+    return obj
+
+
+def _reduced_shape(shape, transform, out_shape=None, gsd=None):
+    """Output shape of a reduced-resolution read, None for a full resolution read.
+
+    Parameters
+    ----------
+    shape : tuple
+        Full resolution shape (rows, columns) of the image
+    transform : affine.Affine
+        Affine transform of the image
+    out_shape : tuple, optional
+        Output shape (rows, columns)
+    gsd : float, optional
+        Output ground sample distance (pixel size) in units of the CRS
+
+    Returns
+    -------
+    tuple or None
+        Output shape (rows, columns)
+    """
+    if out_shape is None and gsd is None:
+        return None
+    if out_shape is not None:
+        return int(out_shape[0]), int(out_shape[1])
+    height, width = shape[:2]
+    return (max(1, round(height * abs(transform.e) / gsd)),
+            max(1, round(width * abs(transform.a) / gsd)))
+
+
+def _eager_geotif(filename, bands, cropto, cutoff, native_dtype=False, cutoff_method="exact"):
+    """Read a full resolution Georeferenced TIF image into memory.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the TIF image file.
+    bands : list
+        List of wavelengths.
+    cropto : str or None
+        Path of the shapefile to crop the image.
+    cutoff : float or None
+        Percentile above which to remove points (only used for grayscale images).
+    native_dtype : bool, optional
+        Keep 16-bit data instead of converting it to 8-bit. Default is False.
+    cutoff_method : str, optional
+        "exact" or "histogram" quantile for the cutoff. Default is "exact".
 
     Returns
     -------
     plantcv.geospatial.GEO or plantcv.geospatial.DSM
-        Orthomosaic image data in either class instance.
+        Orthomosaic image data.
     """
     # Read the geotif image and shapefile for cropping
     img_data, metadata = _read_geotif_and_shapefile(filename, cropto)
     # reshape such that z-dimension is last
     img_data = img_data.transpose(1, 2, 0)
     _, _, depth = img_data.shape
-    # Parse bands
-    bands = _parse_bands(bands)
     if (depth == 1 and len(bands) > 1):
         warn(f"Bands specified as {bands} but data has 1 channel, bands have been reset to GRAY for a DSM.")
         bands = [0]
     # Check for mask
     mask_layer = None
-    mask_band_indices = []
-    for i in range(depth):
-        if len(np.unique(img_data[:, :, [i]])) == 2:
-            mask_band_indices.append(i)
-    if mask_band_indices:
-        mask_layer = img_data[:, :, [mask_band_indices[-1]]]
-        img_data = np.delete(img_data, mask_band_indices, 2)
+    with profiler.stage("mask_detection", "read.geotif"):
+        mask_band_indices = _mask_bands(img_data, metadata["mask_bands"])
+        if mask_band_indices:
+            mask_layer = img_data[:, :, [mask_band_indices[-1]]]
+            img_data = np.delete(img_data, mask_band_indices, 2)
+        elif metadata["dataset_mask"] is not None:
+            mask_layer = metadata["dataset_mask"][:, :, np.newaxis]
+        empty = _is_empty(img_data)
     # reset depth in case the image data was changed
     _, _, depth = img_data.shape
-    # Check if user input matches image dimension in z direction
-    if depth > len(bands):
-        warn(f"{depth} bands found in the image data but {filename} was provided with {bands}. " +
-             "Assigning band labels to the extra bands starting from max provided band.")
-        for i in range(depth - len(bands)):
-            bands.append(i + 1 + max(bands))
-    if depth < len(bands):
-        fatal_error("your image depth is less than the specified number of bands")
-    if len(np.unique(img_data)) == 1:
+    bands = _match_bands(bands, depth, filename)
+    if empty:
         # If totally uniform then indicates image only contains no-data value
         fatal_error(f"your image is empty, are the crop-to bounds outside of the {filename} image area?")
 
-    # Apply mask layer if it exists
-    if mask_layer is not None:
-        img_data = np.where(mask_layer == 0, 0, img_data)
-
-    # Check if img is uint16
-    if img_data.dtype == "uint16":
-        img_data = ((img_data/65535.0) * 255.0).astype(np.uint8)
+    # Apply mask layer if it exists and convert 16-bit data
+    img_data = _postprocess(img_data, mask_layer, native_dtype)
     if depth > 1:
         # Make a GEO instance before calculating a pseudo-rgb
         obj = GEO(input_array=img_data,
@@ -172,9 +715,73 @@ def geotif(filename, bands="R,G,B", cropto=None, cutoff=None):
                   crs=metadata["crs"],
                   transform=metadata["transform"],
                   nodata=metadata["nodata"],
-                  cutoff=cutoff
+                  cutoff=cutoff,
+                  cutoff_method=cutoff_method
                   )
 
-    _debug(visual=obj.thumb,
-           filename=os.path.join(params.debug_outdir, f"{params.device}_thumbnail.png"))
+    return obj
+
+
+def geotif(filename, bands="R,G,B", cropto=None, cutoff=None, lazy=False, out_shape=None, gsd=None,
+           native_dtype=False, subset=None, cutoff_method="exact"):
+    """Read Georeferenced TIF image from file.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the TIF image file.
+    bands : str or list, optional
+        Comma-separated string listing the order of bands (e.g., "R,G,B") or a
+        list of wavelengths.
+        Supported band symbols: R, G, B, RE, N, NIR, GRAY. Default is "R,G,B".
+    cropto : str, optional
+        Path of the shapefile to crop the image. Default is None.
+    cutoff : float, optional
+        Percentile above which to remove points (only used for grayscale
+        images). Default is None.
+    lazy : bool, optional
+        If True, return a LazyGEO or LazyDSM backed by the open file, pixels are
+        read only when a window or tile is requested. Default is False.
+    out_shape : tuple, optional
+        Read the image resampled to this shape (rows, columns). Default is None
+        (full resolution).
+    gsd : float, optional
+        Read the image resampled to this ground sample distance (pixel size) in
+        units of the CRS, ignored if out_shape is set. Default is None (full resolution).
+    native_dtype : bool, optional
+        If True, 16-bit data is kept as is instead of being converted to 8-bit, only
+        the thumbnail is converted. Default is False.
+    subset : str or list, optional
+        Bands to read, as a comma-separated string of band symbols (e.g., "R,N") or a
+        list of wavelengths listed in bands. Only these bands are read from the file.
+        Default is None (all bands).
+    cutoff_method : str, optional
+        How the cutoff quantile is found, "exact" (same value as numpy.nanquantile) or
+        "histogram" (one streaming pass, relative error below 2**-11 on the ranked heights).
+        Default is "exact".
+
+    Returns
+    -------
+    plantcv.geospatial.GEO or plantcv.geospatial.DSM
+        Orthomosaic image data in either class instance (LazyGEO or LazyDSM if lazy).
+    """
+    if cutoff_method not in ("exact", "histogram"):
+        fatal_error(f"cutoff_method {cutoff_method} is not 'exact' or 'histogram'.")
+    if subset is not None:
+        subset = _parse_bands(subset)
+    if lazy:
+        if out_shape is not None or gsd is not None:
+            fatal_error("out_shape and gsd cannot be used with lazy=True, read a reduced image with LazyImage.read.")
+        obj = _lazy_geotif(filename, _parse_bands(bands), cropto, cutoff, native_dtype, subset, cutoff_method)
+    elif out_shape is not None or gsd is not None or subset is not None:
+        obj = _partial_geotif(filename, _parse_bands(bands), cropto, cutoff, out_shape, gsd, native_dtype, subset,
+                              cutoff_method)
+    else:
+        obj = _eager_geotif(filename, _parse_bands(bands), cropto, cutoff, native_dtype, cutoff_method)
+
+    # Only make the thumbnail (decimated for lazy images) when it is needed for debugging
+    if params.debug is not None:
+        with profiler.stage("debug", "read.geotif"):
+            _debug(visual=obj.thumb,
+                   filename=os.path.join(params.debug_outdir, f"{params.device}_thumbnail.png"))
     return obj
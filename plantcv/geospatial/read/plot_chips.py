@@ -0,0 +1,99 @@
+# Read the pixels of each plot straight from a georeferenced TIF file
+
+import geopandas
+from rasterio.windows import Window
+from plantcv.plantcv import warn
+from plantcv.geospatial.read.geotif import geotif
+from plantcv.geospatial.plot_index import PlotIndex, _resolve_ids
+from plantcv.geospatial._zonal import _zone_window
+
+
+def _merge_windows(plot_windows, gap=8, max_size=4096):
+    """Group plot windows into merged windows to limit the number of reads.
+
+    Windows are visited in row-major order and added to the current group while
+    they are within gap pixels of it and the merged window stays under max_size.
+
+    Parameters
+    ----------
+    plot_windows : list
+        List of (plot index, (row_start, row_stop, col_start, col_stop)) tuples
+    gap : int, optional
+        Largest gap in pixels between windows that are merged, default is 8
+    max_size : int, optional
+        Largest edge length in pixels of a merged window, default is 4096
+
+    Returns
+    -------
+    list
+        List of (merged window, list of (plot index, window)) tuples
+    """
+    groups = []
+    for i, window in sorted(plot_windows, key=lambda item: (item[1][0], item[1][2])):
+        if groups:
+            bounds, members = groups[-1]
+            merged = (min(bounds[0], window[0]), max(bounds[1], window[1]),
+                      min(bounds[2], window[2]), max(bounds[3], window[3]))
+            close = (window[0] <= bounds[1] + gap and window[2] <= bounds[3] + gap and
+                     window[3] >= bounds[2] - gap)
+            if close and merged[1] - merged[0] <= max_size and merged[3] - merged[2] <= max_size:
+                groups[-1] = (merged, members + [(i, window)])
+                continue
+        groups.append((window, [(i, window)]))
+    return groups
+
+
+def plot_chips(filename, geojson, bands="R,G,B", cutoff=None, gap=8, max_size=4096):
+    """Read the pixels under each plot from a georeferenced TIF file.
+
+    Only the windows covering the plots are read from disk. Windows of nearby plots
+    are merged into a single read to limit seeks.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the TIF image file.
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shape file containing the plot boundaries, or a PlotIndex.
+    bands : str or list, optional
+        Comma-separated string listing the order of bands (e.g., "R,G,B") or a
+        list of wavelengths. Default is "R,G,B".
+    cutoff : float, optional
+        Percentile above which to remove points (only used for grayscale
+        images). Default is None.
+    gap : int, optional
+        Plot windows less than this many pixels apart are read together. Default is 8.
+    max_size : int, optional
+        Largest edge length in pixels of a merged read. Default is 4096.
+
+    Yields
+    ------
+    plot_id : str
+        ID of the plot
+    chip : plantcv.geospatial.GEO or plantcv.geospatial.DSM
+        Image of the window covering the plot, with a matching transform
+    """
+    img = geotif(filename=filename, bands=bands, cutoff=cutoff, lazy=True)
+    if isinstance(geojson, PlotIndex):
+        gdf, ids = geojson.gdf, geojson.ids
+    else:
+        gdf = geopandas.read_file(geojson)
+        ids = _resolve_ids(gdf)
+    # Reproject the plots to the CRS of the image if needed
+    if gdf.crs is not None and img.crs is not None and not gdf.crs == img.crs:
+        gdf = gdf.to_crs(crs=img.crs)
+    plot_windows = []
+    for i, geometry in enumerate(gdf.geometry):
+        window = _zone_window(geometry, img.transform, img.shape[:2])
+        if window is not None:
+            plot_windows.append((i, window))
+    if len(plot_windows) < len(ids):
+        warn(f"{len(ids) - len(plot_windows)} plots are outside of the {filename} image area and were skipped.")
+    try:
+        for (row_start, row_stop, col_start, col_stop), members in _merge_windows(plot_windows, gap, max_size):
+            img_data, _ = img._read_array(Window(col_start, row_start, col_stop - col_start, row_stop - row_start))
+            for i, (r0, r1, c0, c1) in members:
+                chip = img_data[r0 - row_start:r1 - row_start, c0 - col_start:c1 - col_start]
+                yield ids[i], img._wrap(chip, img.transform * img.transform.translation(c0, r0))
+    finally:
+        img.close()
@@ -67,12 +67,14 @@ def resize(img, size, interpolation="auto"):
             crs=img.crs,
             transform=new_transform,
             cutoff=getattr(img, "cutoff", None),
-            nodata=getattr(img, "nodata", None)
+            nodata=getattr(img, "nodata", None),
+            cutoff_method=getattr(img, "cutoff_method", "exact")
         )
     else:
         fatal_error("Input must be a GEO or DSM object.")
-    _debug(visual=resized_img.thumb,
-           filename=os.path.join(params.debug_outdir, str(params.device) + "_thumbnail.png"))
+    if params.debug is not None:
+        _debug(visual=resized_img.thumb,
+               filename=os.path.join(params.debug_outdir, str(params.device) + "_thumbnail.png"))
     return resized_img
 
 
@@ -40,7 +40,10 @@ def subtract_dsm(dsm1, dsm0):
     # Fill in attributes
 
     final_data.__init__(input_array=final_data, filename=None, crs=dsm1.crs,
-                        transform=dsm1.transform, cutoff=dsm1.cutoff, nodata=dsm1.nodata)
+                        transform=dsm1.transform, cutoff=dsm1.cutoff, nodata=dsm1.nodata,
+                        cutoff_method=getattr(dsm1, "cutoff_method", "exact"))
 
-    _debug(visual=final_data.thumb, filename=os.path.join(params.debug_outdir, f"{params.device}_substracted_dsm.png"))
+    if params.debug is not None:
+        _debug(visual=final_data.thumb,
+               filename=os.path.join(params.debug_outdir, f"{params.device}_substracted_dsm.png"))
     return final_data
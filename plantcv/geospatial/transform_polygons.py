@@ -1,8 +1,76 @@
 # Transform georeferenced GeoJSON/shapefile polygons into python coordinates
-import fiona
+import numpy as np
+import shapely
+import geopandas
+from plantcv.geospatial.plot_index import PlotIndex
 
 
-def transform_polygons(img, geojson):
+def _pack_polygons(geometries, transform):
+    """Pixel coordinates of every ring of every polygon part, in contiguous arrays.
+
+    Parameters
+    ----------
+    geometries : array-like of shapely geometries
+        Polygon or multipolygon geometries in the CRS of the transform
+    transform : affine.Affine
+        Affine transform of the image
+
+    Returns
+    -------
+    vertices : numpy.ndarray
+        int32 array of (col, row) vertices with shape (n_vertices, 2), without the closing
+        vertex of each ring
+    ring_offsets : numpy.ndarray
+        Ring i owns vertices[ring_offsets[i]:ring_offsets[i + 1]]
+    part_offsets : numpy.ndarray
+        Polygon part i owns rings part_offsets[i] to part_offsets[i + 1] - 1, the first
+        ring of a part is its exterior and the others are holes
+    geometry_offsets : numpy.ndarray
+        Geometry i owns parts geometry_offsets[i] to geometry_offsets[i + 1] - 1
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    parts, part_geometry = shapely.get_parts(geometries, return_index=True)
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    coords, vertex_ring = shapely.get_coordinates(rings, return_index=True)
+    # Drop the closing vertex of each ring
+    ring_lengths = np.bincount(vertex_ring, minlength=len(rings))
+    keep = np.ones(len(coords), dtype=bool)
+    keep[np.cumsum(ring_lengths)[ring_lengths > 0] - 1] = False
+    coords = coords[keep]
+    ring_offsets = np.concatenate(([0], np.cumsum(ring_lengths - (ring_lengths > 0))))
+    part_offsets = np.concatenate(([0], np.cumsum(np.bincount(ring_part, minlength=len(parts)))))
+    geometry_offsets = np.concatenate(([0], np.cumsum(np.bincount(part_geometry, minlength=len(geometries)))))
+    vertices = _to_pixels(coords[:, 0], coords[:, 1], transform)
+    return vertices, ring_offsets, part_offsets, geometry_offsets
+
+
+def _to_pixels(x, y, transform):
+    """Integer pixel coordinates of world coordinates.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        World x coordinates
+    y : numpy.ndarray
+        World y coordinates, same shape as x
+    transform : affine.Affine
+        Affine transform of the image
+
+    Returns
+    -------
+    numpy.ndarray
+        int32 (col, row) coordinates with shape x.shape + (2,), truncated toward zero as int()
+    """
+    # tilde inverts the affine transform to map world coordinates to pixel locations,
+    # terms are summed in the same order as affine.Affine so results match vertex by vertex
+    inverse = ~transform
+    pixels = np.empty(np.shape(x) + (2,), dtype=np.int32)
+    pixels[..., 0] = x * inverse.a + y * inverse.b + inverse.c
+    pixels[..., 1] = x * inverse.d + y * inverse.e + inverse.f
+    return pixels
+
+
+def transform_polygons(img, geojson, packed=False):
     """
     Transform a polygon or multipolygon shapefile or GeoJSON into image pixel coordinates.
 
@@ -10,31 +78,59 @@ def transform_polygons(img, geojson):
     ----------
     img : plantcv.geospatial.images.GEO object
         A GEO image object returned by ``read_geotif``.
-    geojson : str
-        Path to the shapefile or GeoJSON file containing polygon or multipolygon geometries.
+    geojson : str or plantcv.geospatial.PlotIndex
+        Path to the shapefile or GeoJSON file containing polygon or multipolygon geometries,
+        or a PlotIndex.
+    packed : bool, optional
+        If True, return every part and hole of every geometry as contiguous int32 arrays
+        and offsets instead of lists. Default is False.
 
     Returns
     -------
     coord : list of list of list of int
         Pixel coordinates as a list of polygons, where each polygon is a list
-        of ``[col, row]`` integer pairs. The closing vertex of each polygon
-        is dropped to avoid duplication.
+        of ``[col, row]`` integer pairs (the exterior of the first part of each
+        geometry). The closing vertex of each polygon is dropped to avoid duplication.
+    vertices, ring_offsets, part_offsets, geometry_offsets : numpy.ndarray
+        If packed, int32 ``(col, row)`` vertices of every ring and the offsets of the rings
+        (in vertices), polygon parts (in rings) and geometries (in parts). The first ring
+        of each part is its exterior, the other rings are its holes.
+    """
+    if isinstance(geojson, PlotIndex):
+        # Plot geometries are already in the CRS of the image
+        geometries = geojson.geometries
+    else:
+        geometries = geopandas.read_file(geojson).geometry
+    packed_polygons = _pack_polygons(geometries.values, img.transform)
+    if packed:
+        return packed_polygons
+    return [exterior.tolist() for exterior in _exteriors(*packed_polygons)]
+
+
+def _exteriors(vertices, ring_offsets, part_offsets, geometry_offsets):
+    """Exterior ring of the first part of each geometry, from _pack_polygons.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        Packed vertices
+    ring_offsets : numpy.ndarray
+        Vertex offsets of the rings
+    part_offsets : numpy.ndarray
+        Ring offsets of the parts
+    geometry_offsets : numpy.ndarray
+        Part offsets of the geometries
+
+    Returns
+    -------
+    list
+        int32 array of (col, row) vertices of each geometry, empty for empty geometries
     """
-    geo_transform = img.transform
-    coord = []
-    with fiona.open(geojson, 'r') as shapefile:
-        for row in shapefile:
-            temp_list = []
-            # Polygon
-            if len(row.geometry["coordinates"][0]) > 1:
-                square = row.geometry["coordinates"][0][:-1]
-            # Multi Polygon
-            else:
-                square = row.geometry["coordinates"][0][0][:-1]
-            for j in square:
-                # tilde inverts affine.Affine class geo_transform matrix
-                # to map world coordinates to pixel locations
-                vertex = ~(geo_transform) * j
-                temp_list.append([int(vertex[0]), int(vertex[1])])
-            coord.append(temp_list)
-    return coord
+    exteriors = []
+    for first, stop in zip(geometry_offsets[:-1], geometry_offsets[1:]):
+        if first == stop:
+            exteriors.append(vertices[:0])
+            continue
+        ring = part_offsets[first]
+        exteriors.append(vertices[ring_offsets[ring]:ring_offsets[ring + 1]])
+    return exteriors
@@ -0,0 +1,8 @@
+from plantcv.geospatial._lazy import _attach
+
+
+__all__ = ["geotif"]
+
+__getattr__, __dir__ = _attach(__name__, {
+    "geotif": ("plantcv.geospatial.write.geotif", "geotif"),
+})
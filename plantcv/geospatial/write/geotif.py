@@ -0,0 +1,103 @@
+# Write GEO and DSM images to Cloud-Optimized GeoTIFF files
+
+import os
+import tempfile
+import numpy as np
+import rasterio
+import rasterio.shutil
+from rasterio.enums import Resampling
+from rasterio.windows import Window
+from plantcv.plantcv import fatal_error
+from plantcv.geospatial.images import LazyImage
+
+
+def _row_blocks(img, rows):
+    """Read an image in strips of rows, without copying the full array.
+
+    Parameters
+    ----------
+    img : plantcv.geospatial.GEO, DSM, LazyGEO or LazyDSM object
+        Image to write
+    rows : int
+        Number of rows per strip
+
+    Yields
+    ------
+    window : rasterio.windows.Window
+        Window of the strip
+    data : numpy.ndarray
+        Strip data with shape (bands, rows, columns)
+    """
+    height, width = img.shape[:2]
+    for row in range(0, height, rows):
+        window = Window(0, row, width, min(rows, height - row))
+        if isinstance(img, LazyImage):
+            data, _ = img._read_array(window)
+        else:
+            data = np.asarray(img)[row:row + window.height]
+        if data.ndim == 2:
+            data = data[:, :, np.newaxis]
+        yield window, np.moveaxis(data, 2, 0)
+
+
+def geotif(img, filename, compress="deflate", blocksize=512, overviews=True, resampling="average"):
+    """Write a GEO or DSM image to a Cloud-Optimized GeoTIFF (COG).
+
+    The image is streamed to a tiled GeoTIFF in strips of rows, then copied to a COG
+    with internal overviews, so the full array is never copied in memory.
+
+    Parameters
+    ----------
+    img : plantcv.geospatial.GEO, DSM, LazyGEO or LazyDSM object
+        Georeferenced image, e.g. from read.geotif, subtract_dsm or resize.
+    filename : str
+        Path of the output file.
+    compress : str, optional
+        Compression, e.g. "deflate", "lzw", "zstd" or None. Default is "deflate".
+    blocksize : int, optional
+        Edge length in pixels of the internal tiles. Default is 512.
+    overviews : bool, optional
+        Add internal overviews (reduced resolution copies). Default is True.
+    resampling : str, optional
+        Resampling method of the overviews, e.g. "average", "nearest" or "bilinear".
+        Default is "average".
+
+    Returns
+    -------
+    str
+        Path of the output file
+    """
+    crs = getattr(img, "crs", None)
+    transform = getattr(img, "transform", None)
+    if transform is None:
+        fatal_error("The image has no transform, only georeferenced GEO and DSM images can be written.")
+    height, width = img.shape[:2]
+    count = img.shape[2] if len(img.shape) > 2 else 1
+    dtype = np.dtype(img.dtype)
+    profile = {"driver": "GTiff", "width": width, "height": height, "count": count, "dtype": dtype.name,
+               "crs": crs, "transform": transform, "nodata": img.nodata, "tiled": True,
+               "blockxsize": blocksize, "blockysize": blocksize, "BIGTIFF": "IF_SAFER"}
+    if compress is not None:
+        profile["compress"] = compress
+    # Stream the image to a tiled GeoTIFF next to the output, then copy it to a COG
+    out_dir = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_file = tempfile.mkstemp(suffix=".tif", dir=out_dir)
+    os.close(fd)
+    try:
+        with rasterio.open(tmp_file, "w", **profile) as dst:
+            for window, data in _row_blocks(img, blocksize):
+                dst.write(data, window=window)
+            wavelengths = getattr(img, "wavelengths", None)
+            if wavelengths is not None and len(wavelengths) == count:
+                for band, wavelength in enumerate(wavelengths, start=1):
+                    dst.set_band_description(band, str(wavelength))
+        options = {"blocksize": blocksize, "overviews": "AUTO" if overviews else "NONE",
+                   "overview_resampling": Resampling[resampling].name, "BIGTIFF": "IF_SAFER"}
+        if compress is not None:
+            options["compress"] = compress
+            # Horizontal differencing compresses integers better, floating point prediction floats
+            options["predictor"] = "FLOATING_POINT" if dtype.kind == "f" else "STANDARD"
+        rasterio.shutil.copy(tmp_file, filename, driver="COG", **options)
+    finally:
+        os.remove(tmp_file)
+    return filename
@@ -1,8 +1,14 @@
 """Tests for geospatial.analyze.chm"""
 
 import dill as pickle
+import numpy as np
+import rasterio
+import geopandas
+from affine import Affine
+from shapely.geometry import box
 from plantcv.plantcv import outputs
 from plantcv.geospatial.analyze import chm
+from plantcv.geospatial.read import geotif
 
 
 def test_analyze_chm(test_data):
@@ -14,4 +20,43 @@ def test_analyze_chm(test_data):
         img = pickle.load(f)
     img.nodata = 0
     _ = chm(dsm=img, geojson=test_data.poly_crop)
-    assert outputs.observations["default_888"]["height_mean"]["value"] > 0
\ No newline at end of file
+    assert outputs.observations["default_888"]["height_mean"]["value"] > 0
+
+
+def test_analyze_chm_lazy(tmpdir):
+    """Test for PlantCV."""
+    # Write a tiled DSM with nodata and NaN values spanning several 1024 pixel tiles
+    rng = np.random.default_rng(0)
+    transform = Affine(0.1, 0, 500000, 0, -0.1, 4000000)
+    heights = rng.normal(5, 2, (1100, 2100)).astype(np.float32)
+    heights[rng.random(heights.shape) < 0.05] = -9999
+    heights[:3] = np.nan
+    filename = str(tmpdir.join("dsm.tif"))
+    with rasterio.open(filename, "w", driver="GTiff", height=1100, width=2100, count=1, dtype="float32",
+                       crs="EPSG:32615", transform=transform, nodata=-9999, tiled=True,
+                       blockxsize=256, blockysize=256) as dst:
+        dst.write(heights, 1)
+    # Plots across tile edges, overlapping plots, and a plot in a single tile
+    windows = [(0, 60, 5, 75), (980, 1090, 1000, 1070), (990, 1050, 1040, 1100), (500, 560, 2000, 2100),
+               (200, 250, 300, 380)]
+    plots = [box(*(transform * (col0 + 0.3, row1 - 0.4)), *(transform * (col1 - 0.2, row0 + 0.1)))
+             for row0, row1, col0, col1 in windows]
+    geojson = str(tmpdir.join("plots.geojson"))
+    geopandas.GeoDataFrame(geometry=plots, crs="EPSG:32615").to_file(geojson)
+    results = []
+    for lazy in (False, True):
+        outputs.clear()
+        dsm = geotif(filename=filename, bands="gray", lazy=lazy)
+        _ = chm(dsm=dsm, geojson=geojson, bins=7)
+        results.append(outputs.observations)
+        if not lazy:
+            # The input DSM is not modified
+            assert np.isnan(dsm[0, 0, 0])
+    # Lazily read images are reduced over the same tiles in the same order, so results are identical
+    assert results[0] == results[1]
+    # And match the statistics of each plot computed directly
+    for plot, (row0, row1, col0, col1) in enumerate(windows):
+        values = heights[row0:row1, col0:col1]
+        values = values[(values != -9999) & ~np.isnan(values)].astype(np.float64)
+        assert np.isclose(results[0][f"default_{plot + 1}"]["height_mean"]["value"], values.mean())
+        assert np.isclose(results[0][f"default_{plot + 1}"]["height_std"]["value"], values.std())
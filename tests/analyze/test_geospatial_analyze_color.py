@@ -1,6 +1,11 @@
 import dill as pickle
+import numpy as np
+from scipy import stats
 from plantcv.plantcv import outputs
 from plantcv.geospatial.analyze import color as analyze_color
+from plantcv.geospatial.analyze.color import _color_histograms, _histogram_color_stats, _hue_circ_stats
+from plantcv.geospatial import PlotIndex
+from plantcv.geospatial.read import geotif
 
 
 def test_analyze_color(test_data):
@@ -14,3 +19,47 @@ def test_analyze_color(test_data):
     analyze_color(img=img, bin_mask=bin_mask, geojson=test_data.poly_crop_noid, colorspaces="all")
     assert round(outputs.observations["default_1"]["hue_circular_mean"]["value"]) == 99
     assert outputs.observations["default_1"]["hue_frequencies"]["value"][0] == 199040
+
+
+def test_analyze_color_parallel(test_data):
+    """Test for PlantCV."""
+    img = geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    bin_mask = img[:, :, 2]  # Make a grayscale img to use as the mask
+    results = []
+    for n_jobs in (1, 2):
+        # Clear previous outputs
+        outputs.clear()
+        analyze_color(img=img, bin_mask=bin_mask, geojson=test_data.geojson_with_id, colorspaces="all",
+                      n_jobs=n_jobs)
+        results.append(outputs.observations)
+    assert results[0] == results[1]
+
+
+def test_analyze_color_histograms(test_data):
+    """Test for PlantCV."""
+    img = geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    bin_mask = img[:, :, 2]  # Make a grayscale img to use as the mask
+    plots = PlotIndex(geojson=test_data.geojson_with_id, img=img)
+    histograms = _color_histograms(img.thumb, plots.zones(img), mask=bin_mask, colorspaces="rgb")
+    color_values = _histogram_color_stats(histograms["red"], bins=10)
+    for i in range(len(plots)):
+        # Both plots overlap, so their footprints are kept as pixel indices
+        pixels = plots.pixels[plots.offsets[i]:plots.offsets[i + 1]]
+        red = img.thumb[:, :, 2].reshape(-1)[pixels][bin_mask.reshape(-1)[pixels] != 0]
+        assert np.isclose(color_values["mean"][i], red.mean())
+        assert np.isclose(color_values["std"][i], red.std())
+        assert color_values["histogram"][i].tolist() == np.histogram(red, 10, range=(0, 255))[0].tolist()
+
+
+def test_analyze_color_hue_circ_stats():
+    """Test for PlantCV."""
+    rng = np.random.default_rng(9)
+    labels = np.sort(rng.integers(0, 3, 400))
+    hues = rng.integers(0, 180, 400).astype(np.uint8)
+    hue_stats = _hue_circ_stats(hues, labels, n_zones=4)
+    for zone in range(3):
+        zone_hues = hues[(labels == zone) & (hues > 0)]
+        assert np.isclose(hue_stats["hue_circular_mean"][zone], stats.circmean(zone_hues, high=179, low=0) * 2)
+        assert np.isclose(hue_stats["hue_circular_std"][zone], stats.circstd(zone_hues, high=179, low=0) * 2)
+    # Plot without hues
+    assert np.isnan(hue_stats["hue_circular_mean"][3])
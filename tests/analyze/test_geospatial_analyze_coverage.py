@@ -1,7 +1,11 @@
 import pytest
+import numpy as np
 import dill as pickle
+import geopandas
+from shapely.geometry import box
 from plantcv.plantcv import outputs, params
 from plantcv.geospatial.analyze import coverage as analyze_coverage
+from plantcv.geospatial.read import geotif
 
 
 @pytest.mark.parametrize("debug", ["print", "plot", None])
@@ -32,3 +36,21 @@ def test_coverage_with_geo_ids(test_data):
     bin_mask = img[:, :, 2]  # Make a grayscale img to use as the mask
     _ = analyze_coverage(img=img, bin_mask=bin_mask, geojson=test_data.multipoly, label="test")
     assert outputs.observations["test_888"]["percent_coverage"]["value"] <= 1
+
+
+def test_coverage_outside_image(tmpdir, test_data):
+    """Test for PlantCV."""
+    outputs.clear()
+    img = geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    bin_mask = np.full(img.shape[:2], 255, dtype=np.uint8)
+    transform = img.transform
+    # One plot inside the image and one beyond its right edge
+    plots = [box(*(transform * (5, 60)), *(transform * (55, 10))),
+             box(*(transform * (400, 60)), *(transform * (450, 10)))]
+    geojson = str(tmpdir.join("plots.geojson"))
+    geopandas.GeoDataFrame(geometry=plots, crs="EPSG:32615").to_file(geojson)
+    _ = analyze_coverage(img=img, bin_mask=bin_mask, geojson=geojson, label="test")
+    assert outputs.observations["test_1"]["percent_coverage"]["value"] == 1
+    # Plots without pixels have no coverage
+    for variable in ("pixel_count", "coverage", "percent_coverage"):
+        assert outputs.observations["test_2"][variable]["value"] == 0
@@ -3,6 +3,10 @@
 import dill as pickle
 import pytest
 import numpy as np
+import geopandas
+from affine import Affine
+from shapely.geometry import MultiPoint, Point
+from plantcv.geospatial import GEO
 from plantcv.geospatial.convert.to_roi import to_roi
 
 
@@ -15,6 +19,34 @@ def test_geospatial_points_to_roi(test_data):
     assert np.all(rois.contours[0][0][0] == np.array([1801, 496]))
 
 
+def test_geospatial_points_to_roi_in_memory(tmpdir):
+    """Test for plantcv-geospatial."""
+    img = GEO(input_array=np.zeros((100, 100, 3), dtype=np.uint8), filename=None, wavelengths=[670, 560, 480],
+              default_wavelengths=[480, 560, 670], crs="EPSG:32615", transform=Affine(0.01, 0, 500000, 0, -0.01, 4300000),
+              nodata=None)
+    points = geopandas.GeoDataFrame(geometry=[Point(500000.3, 4299999.6), Point(500000.71, 4299999.23)],
+                                    crs="EPSG:32615")
+    multipoints = geopandas.GeoDataFrame(geometry=[MultiPoint([(500000.5, 4299999.5), (500000.7, 4299999.5)])],
+                                         crs="EPSG:32615")
+    for name, gdf in [("points", points), ("multipoints", multipoints)]:
+        geojson = str(tmpdir.join(f"{name}.geojson"))
+        gdf.to_file(geojson, driver="GeoJSON")
+        rois = to_roi(img=img, geojson=geojson, radius=0.05)
+        # Vertices of the first exterior of the shapely buffers, without the closing vertex
+        circles = gdf.geometry.buffer(0.05)
+        assert len(rois.contours) == len(circles)
+        for contour, circle in zip(rois.contours, circles):
+            if circle.geom_type == "MultiPolygon":
+                circle = circle.geoms[0]
+            expected = [[int(c), int(r)] for c, r in [~img.transform * xy for xy in circle.exterior.coords[:-1]]]
+            assert contour[0].tolist() == expected
+    # No circles file is written by default
+    assert sorted(tmpdir.listdir()) == [tmpdir.join("multipoints.geojson"), tmpdir.join("points.geojson")]
+    out_path = str(tmpdir.join("circles.geojson"))
+    to_roi(img=img, geojson=str(tmpdir.join("points.geojson")), radius=0.05, out_path=out_path)
+    assert list(geopandas.read_file(out_path).geom_type) == ["Polygon", "Polygon"]
+
+
 def test_geospatial_polygon_to_roi(test_data):
     """Test for plantcv-geospatial."""
     # read in small 3-band tif image
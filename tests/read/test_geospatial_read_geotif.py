@@ -1,8 +1,29 @@
 """Tests for geospatial.read.geotif."""
 
 import pytest
+import numpy as np
+import rasterio
+from affine import Affine
 from plantcv.geospatial.read import geotif
-from plantcv.geospatial.images import GEO, DSM
+from plantcv.geospatial.read.geotif import _count_unique, _mask_bands, _is_empty
+from plantcv.geospatial.images import GEO, DSM, LazyGEO, LazyDSM
+
+
+def _write_tif(filename, img_data):
+    """Write a tiled GeoTIFF with 256 pixel blocks and a no-data value of 0."""
+    with rasterio.open(filename, "w", driver="GTiff", width=img_data.shape[2], height=img_data.shape[1],
+                       count=img_data.shape[0], dtype=img_data.dtype, crs="EPSG:32615", nodata=0,
+                       transform=Affine(0.01, 0, 500000, 0, -0.01, 4300000), tiled=True,
+                       blockxsize=256, blockysize=256) as dst:
+        dst.write(img_data)
+    return filename
+
+
+def _sparse_tif(tmpdir):
+    """Write a 2048 x 2048 RGB GeoTIFF whose only data is two pixels far from its center."""
+    img_data = np.zeros((3, 2048, 2048), dtype=np.uint8)
+    img_data[:, 101, 202:204] = [[10, 20], [30, 40], [50, 60]]
+    return _write_tif(str(tmpdir.join("sparse.tif")), img_data)
 
 
 def test_geospatial_read_geotif(test_data):
@@ -25,6 +46,18 @@ def test_geospatial_read_geotif_rgb_uint16(test_data):
     # read in small tif image
     img = geotif(filename=test_data.rgb_uint16_tif, bands="R,G,B")
     assert img.thumb.shape == (284, 261, 3)
+
+
+def test_geospatial_read_geotif_native_dtype(test_data):
+    """Test for plantcv-geospatial."""
+    img = geotif(filename=test_data.rgb_uint16_tif, bands="R,G,B")
+    native = geotif(filename=test_data.rgb_uint16_tif, bands="R,G,B", native_dtype=True)
+    assert native.dtype == np.uint16
+    assert native.thumb.dtype == np.uint8
+    assert np.array_equal(img, np.asarray(native) // 257)
+    lazy = geotif(filename=test_data.rgb_uint16_tif, bands="R,G,B", lazy=True, native_dtype=True)
+    assert lazy.dtype == np.uint16
+    assert np.array_equal(lazy.load(), native)
     
 
 def test_geospatial_read_geotif_bad_input(test_data):
@@ -85,3 +118,184 @@ def test_geospatial_read_geotif_gray_wrong_bands(test_data):
     img = geotif(filename=test_data.gray_tif, cutoff=0.99)
     assert img.shape[0] == 411
     assert isinstance(img, DSM)
+
+
+def test_geospatial_read_geotif_lazy(test_data):
+    """Test for plantcv-geospatial."""
+    # lazily read rgb image with a polygon-type shapefile
+    img = geotif(filename=test_data.rgb_tif, bands=[650, 560, 480], cropto=test_data.square_crop)
+    lazy = geotif(filename=test_data.rgb_tif, bands=[650, 560, 480], cropto=test_data.square_crop, lazy=True)
+    assert isinstance(lazy, LazyGEO)
+    assert lazy.shape == img.shape
+    loaded = lazy.load()
+    assert isinstance(loaded, GEO)
+    assert np.array_equal(loaded, img)
+    assert loaded.transform == img.transform
+    assert lazy.thumb.shape == (80, 83, 3)
+
+
+def test_geospatial_read_geotif_lazy_tiles(test_data):
+    """Test for plantcv-geospatial."""
+    # read in small 5-band tif image tile by tile
+    img = geotif(filename=test_data.cropped_tif, bands="B,G,R,RE,N")
+    with geotif(filename=test_data.cropped_tif, bands="B,G,R,RE,N", lazy=True) as lazy:
+        tiled = np.zeros(img.shape, dtype=img.dtype)
+        for window, tile in lazy.tiles(tile_size=64):
+            # tiles are multiples of the file blocks
+            assert window.height % lazy.block_shape[0] == 0 or window.row_off + window.height == img.shape[0]
+            row, col = int(window.row_off), int(window.col_off)
+            tiled[row:row + tile.shape[0], col:col + tile.shape[1]] = tile
+            assert tile.transform == img.transform * img.transform.translation(col, row)
+    assert np.array_equal(tiled, img)
+
+
+def test_geospatial_read_geotif_lazy_gray(test_data):
+    """Test for plantcv-geospatial."""
+    # lazily read in small gray image
+    img = geotif(filename=test_data.gray_tif, bands="gray", cutoff=0.99)
+    lazy = geotif(filename=test_data.gray_tif, bands="gray", cutoff=0.99, lazy=True)
+    assert isinstance(lazy, LazyDSM)
+    tile = lazy.read_bounds(bounds=lazy.transform * (0, 20) + lazy.transform * (10, 0))
+    assert isinstance(tile, DSM)
+    assert np.array_equal(tile, img[:20, :10], equal_nan=True)
+
+
+def test_geospatial_read_geotif_cutoff_method(test_data):
+    """Test for plantcv-geospatial."""
+    img = geotif(filename=test_data.gray_tif, bands="gray")
+    cutoff = np.nanquantile(img, 0.99)
+    approx = geotif(filename=test_data.gray_tif, bands="gray", cutoff=0.99, cutoff_method="histogram", lazy=True)
+    assert approx.cutoff_value() != cutoff
+    assert abs(approx.cutoff_value() - cutoff) <= abs(cutoff) * 2 ** -11
+    assert approx.read().cutoff_method == "histogram"
+
+
+def test_geospatial_read_geotif_bad_cutoff_method(test_data):
+    """Test for plantcv-geospatial."""
+    with pytest.raises(RuntimeError):
+        _ = geotif(filename=test_data.gray_tif, bands="gray", cutoff=0.99, cutoff_method="sort")
+
+
+def test_geospatial_read_geotif_reduced(test_data):
+    """Test for plantcv-geospatial."""
+    full = geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    rows, cols = full.shape[0] // 2, full.shape[1] // 2
+    img = geotif(filename=test_data.rgb_tif, bands="R,G,B", out_shape=(rows, cols))
+    assert isinstance(img, GEO)
+    assert img.shape == (rows, cols, 3)
+    # Nearest neighbor decimation keeps the pixel at the center of each output pixel
+    assert np.array_equal(img, full[1:2 * rows:2, 1:2 * cols:2])
+    assert img.transform.a == full.transform.a * full.shape[1] / cols
+    full = geotif(filename=test_data.gray_tif, bands="gray")
+    dsm = geotif(filename=test_data.gray_tif, bands="gray", gsd=abs(full.transform.a) * 4)
+    assert isinstance(dsm, DSM)
+    assert dsm.shape[:2] == (round(full.shape[0] / 4), round(full.shape[1] / 4))
+
+
+def test_geospatial_read_geotif_reduced_sparse(tmpdir):
+    """Test for plantcv-geospatial."""
+    filename = _sparse_tif(tmpdir)
+    full = geotif(filename=filename, bands="R,G,B")
+    img = geotif(filename=filename, bands="R,G,B", out_shape=(512, 512))
+    assert img.shape == (512, 512, 3)
+    assert np.array_equal(img, full[2::4, 2::4])
+    assert geotif(filename=filename, bands="R,G,B", gsd=0.02).shape == (1024, 1024, 3)
+
+
+def test_geospatial_read_geotif_reduced_lazy(test_data):
+    """Test for plantcv-geospatial."""
+    with pytest.raises(RuntimeError):
+        _ = geotif(filename=test_data.rgb_tif, bands="R,G,B", lazy=True, gsd=1)
+
+
+def test_geospatial_read_geotif_count_unique():
+    """Test for plantcv-geospatial."""
+    rng = np.random.default_rng(0)
+    for values in (rng.integers(0, 4, (50, 40)).astype(np.float32), np.full((50, 40), np.nan)):
+        values[rng.random(values.shape) < 0.2] = np.nan
+        for limit in (2, 3, 6):
+            assert _count_unique(values, limit=limit, chunk_size=64) == min(len(np.unique(values)), limit)
+
+
+def test_geospatial_read_geotif_mask_bands():
+    """Test for plantcv-geospatial."""
+    img_data = np.zeros((20, 20, 3), dtype=np.uint8)
+    img_data[:, :, 0] = np.arange(20)
+    img_data[5:, :, 1] = 255
+    assert _mask_bands(img_data) == [1]
+    assert _mask_bands(img_data, declared=[2]) == [2]
+    assert _mask_bands(img_data, declared=[]) == []
+    assert not _is_empty(img_data)
+    assert _is_empty(img_data[:, :, [2]])
+
+
+def test_geospatial_read_geotif_subset(test_data):
+    """Test for plantcv-geospatial."""
+    full = geotif(filename=test_data.cropped_tif, bands="B,G,R,RE,N")
+    img = geotif(filename=test_data.cropped_tif, bands="B,G,R,RE,N", subset="R,N")
+    assert isinstance(img, GEO)
+    assert img.wavelengths == [670, 842]
+    assert np.array_equal(img, full[:, :, [2, 4]])
+    lazy = geotif(filename=test_data.cropped_tif, bands="B,G,R,RE,N", subset=[842], lazy=True)
+    assert isinstance(lazy, LazyGEO)
+    assert lazy.indexes == [5]
+    assert np.array_equal(lazy.load(), full[:, :, [4]])
+
+
+def test_geospatial_read_geotif_subset_sparse(tmpdir):
+    """Test for plantcv-geospatial."""
+    filename = _sparse_tif(tmpdir)
+    full = geotif(filename=filename, bands="R,G,B")
+    img = geotif(filename=filename, bands="R,G,B", subset="R,G")
+    assert img.wavelengths == [670, 560]
+    assert np.array_equal(img, full[:, :, :2])
+
+
+def test_geospatial_read_geotif_bad_subset(test_data):
+    """Test for plantcv-geospatial."""
+    with pytest.raises(RuntimeError):
+        _ = geotif(filename=test_data.cropped_tif, bands="B,G,R,RE,N", subset=[900])
+
+
+def test_geospatial_read_geotif_lazy_sparse(tmpdir):
+    """Test for plantcv-geospatial."""
+    # Bands holding two values in the decimated sample are scanned before being taken as masks
+    filename = _sparse_tif(tmpdir)
+    lazy = geotif(filename=filename, bands="R,G,B", lazy=True)
+    assert lazy.indexes == [1, 2, 3]
+    assert np.array_equal(lazy.load(), geotif(filename=filename, bands="R,G,B"))
+
+
+def test_geospatial_read_geotif_lazy_mask_band(tmpdir):
+    """Test for plantcv-geospatial."""
+    img_data = np.zeros((4, 2048, 2048), dtype=np.uint8)
+    img_data[:3] = np.arange(2048 * 2048, dtype=np.uint32).reshape(2048, 2048) % 251
+    img_data[3, :1500] = 255
+    filename = _write_tif(str(tmpdir.join("rgba.tif")), img_data)
+    lazy = geotif(filename=filename, bands="R,G,B", lazy=True)
+    assert lazy.indexes == [1, 2, 3]
+    assert lazy.mask_index == 4
+
+
+def test_geospatial_read_geotif_internal_mask(tmpdir):
+    """Test for plantcv-geospatial."""
+    img_data = np.zeros((3, 512, 512), dtype=np.uint8)
+    img_data[:2] = np.arange(512 * 512).reshape(512, 512) % 251 + 1
+    # A two-value band is image data when the dataset declares its own mask
+    img_data[2, :, 256:] = 200
+    filename = str(tmpdir.join("masked.tif"))
+    with rasterio.Env(GDAL_TIFF_INTERNAL_MASK=True):
+        with rasterio.open(filename, "w", driver="GTiff", width=512, height=512, count=3, dtype="uint8",
+                           crs="EPSG:32615", transform=Affine(0.01, 0, 500000, 0, -0.01, 4300000)) as dst:
+            dst.write(img_data)
+            valid = np.zeros((512, 512), dtype=np.uint8)
+            valid[100:] = 255
+            dst.write_mask(valid)
+    img = geotif(filename=filename, bands="R,G,B")
+    assert img.shape == (512, 512, 3)
+    assert not img[:100].any()
+    assert np.array_equal(img[100:], img_data[:, 100:].transpose(1, 2, 0))
+    lazy = geotif(filename=filename, bands="R,G,B", lazy=True)
+    assert lazy.indexes == [1, 2, 3]
+    assert lazy.dataset_mask
+    assert np.array_equal(lazy.load(), img)
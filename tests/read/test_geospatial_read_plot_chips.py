@@ -0,0 +1,32 @@
+"""Tests for geospatial.read.plot_chips."""
+
+import numpy as np
+import geopandas
+from shapely.geometry import box
+from plantcv.geospatial.read import geotif, plot_chips
+from plantcv.geospatial.read.plot_chips import _merge_windows
+from plantcv.geospatial.images import GEO
+
+
+def test_geospatial_read_plot_chips(test_data, tmpdir):
+    """Test for plantcv-geospatial."""
+    img = geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    t = img.transform
+    # Grid of plots, plus a plot outside of the image
+    plots = [box(*(t * (col, row + 40)), *(t * (col + 30, row))) for row in (10, 60, 200) for col in (5, 40, 150)]
+    plots.append(box(0, 0, 1, 1))
+    geojson = str(tmpdir.join("plots.geojson"))
+    geopandas.GeoDataFrame({"ID": [f"p{i}" for i in range(len(plots))]}, geometry=plots,
+                           crs=img.crs).to_file(geojson)
+    chips = dict(plot_chips(filename=test_data.rgb_tif, geojson=geojson, bands="R,G,B"))
+    assert sorted(chips) == [f"p{i}" for i in range(9)]
+    for chip in chips.values():
+        assert isinstance(chip, GEO)
+        col, row = [round(v) for v in ~img.transform * (chip.transform.c, chip.transform.f)]
+        assert np.array_equal(chip, img[row:row + chip.shape[0], col:col + chip.shape[1]])
+
+
+def test_geospatial_read_plot_chips_merge_windows():
+    """Test for plantcv-geospatial."""
+    groups = _merge_windows([(0, (0, 10, 0, 10)), (1, (0, 10, 12, 20)), (2, (0, 10, 50, 60))], gap=4)
+    assert [window for window, _ in groups] == [(0, 10, 0, 20), (0, 10, 50, 60)]
@@ -1,6 +1,17 @@
+import sys
+import subprocess
 from plantcv import geospatial as gs
 
 
 def test_geospatial():
     """PlantCV Test"""
     assert gs.__name__ == "plantcv.geospatial"
+
+
+def test_geospatial_lazy_imports():
+    """PlantCV Test"""
+    # Run in a fresh interpreter, other tests may already have imported napari
+    code = ("import sys; import plantcv.geospatial as gcv; gcv.read.geotif; gcv.read.plot_chips; "
+            "gcv.analyze.color; gcv.analyze.coverage; gcv.analyze.chm; gcv.PlotIndex; "
+            "assert 'napari' not in sys.modules and 'PySide6' not in sys.modules")
+    assert subprocess.run([sys.executable, "-c", code], check=False).returncode == 0
@@ -1,7 +1,14 @@
 """Tests for geospatial._helpers"""
 
+import gc
+import weakref
 import dill as pickle
-from plantcv.geospatial._helpers import _transform_geojson_crs
+import numpy as np
+from matplotlib.figure import Figure
+from plantcv.plantcv import params
+from plantcv.geospatial.read import geotif
+from plantcv.geospatial._helpers import _transform_geojson_crs, _show_geojson, _decimate
+
 
 def test_geospatial_helpers_transform_geojson_crs(test_data):
     """Test for plantcv-geospatial."""
@@ -10,3 +17,33 @@ def test_geospatial_helpers_transform_geojson_crs(test_data):
         img = pickle.load(f)
     gdf = _transform_geojson_crs(img=img, geojson=test_data.epsg4326_geojson)
     assert gdf.crs == img.crs
+
+
+def test_geospatial_helpers_show_geojson(test_data, tmpdir):
+    """Test for plantcv-geospatial."""
+    params.debug_outdir = str(tmpdir)
+    params.debug = "print"
+    img = geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    fig = _show_geojson(img=img, geojson=test_data.geojson_with_id, ids=None)
+    params.debug = None
+    assert isinstance(fig, Figure)
+    assert fig.get_axes()[0].get_title() == "GeoJSON shapes on GeoTIFF"
+    # The figure does not keep the image alive
+    ref = weakref.ref(img)
+    del img
+    gc.collect()
+    assert ref() is None
+
+
+def test_geospatial_helpers_show_geojson_no_debug(test_data):
+    """Test for plantcv-geospatial."""
+    params.debug = None
+    img = geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    # The geojson is not read when debug is off
+    assert _show_geojson(img=img, geojson="missing.geojson", ids=None) is None
+
+
+def test_geospatial_helpers_decimate():
+    """Test for plantcv-geospatial."""
+    assert _decimate(np.zeros((5000, 300, 3)), max_size=2048).shape == (1667, 100, 3)
+    assert _decimate(np.zeros((50, 30)), max_size=2048).shape == (50, 30)
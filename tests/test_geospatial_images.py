@@ -1,33 +1,167 @@
 """Tests for geospatial.images"""
 
+import pickle
 import numpy as np
+from affine import Affine
+from rasterio.windows import Window
 from plantcv.geospatial import Image, GEO, DSM
+from plantcv.geospatial.images import _to_uint8, _postprocess
+
 
 def test_image():
     """Test creating an Image class image."""
     img = Image(input_array=np.zeros((10, 10), dtype=np.uint8), filename="image.png")
     assert isinstance(img, Image)
 
+
 def test_image_none():
     """Test creating an Image class image."""
     img = Image(input_array=None, filename=None)
     assert isinstance(img, Image)
 
+
 def test_image_slice():
     """Test subsetting an Image."""
     img = Image(input_array=np.zeros((10, 10), dtype=np.uint8), filename="image.png")
     assert img[0:5, 0:5].shape == (5, 5)
 
+
+def test_dsm_slice_transform():
+    """Test slicing a DSM into views with an offset transform."""
+    transform = Affine(0.5, 0, 100, 0, -0.5, 200)
+    dsm = DSM(input_array=np.arange(400, dtype=np.float32).reshape(20, 20, 1), filename="dsm.tif",
+              crs=None, transform=transform, cutoff=None, nodata=None)
+    view = dsm[5:10, 2:8]
+    assert np.shares_memory(view, dsm)
+    assert view.transform == transform * Affine.translation(2, 5)
+    assert dsm[Window(2, 5, 6, 5)].transform == view.transform
+    assert dsm[::-1, ::2].transform * (0, 0) == transform * (0, 20)
+    assert dsm[:, :, 0].transform == transform
+    # World bounds of the view select the same pixels
+    left, top = view.transform * (0, 0)
+    right, bottom = view.transform * (6, 5)
+    assert np.array_equal(dsm.read_bounds((left, bottom, right, top)), view)
+    tiles = list(dsm.tiles(tile_size=8))
+    assert len(tiles) == 9
+    window, tile = tiles[-1]
+    assert tile.shape == (4, 4, 1)
+    assert tile.transform == transform * Affine.translation(window.col_off, window.row_off)
+
+
 def test_geo():
     """Test creating a GEO class image."""
-    geo = GEO(input_array=np.zeros((10, 10, 3), dtype=np.uint8), filename="geo.tif", 
+    geo = GEO(input_array=np.zeros((10, 10, 3), dtype=np.uint8), filename="geo.tif",
               wavelengths=[630, 540, 480],
-              default_wavelengths=[480, 540, 630], crs = None, 
-              transform = None, nodata = None)
+              default_wavelengths=[480, 540, 630], crs=None,
+              transform=None, nodata=None)
     assert isinstance(geo, GEO)
 
+
 def test_dsm():
     """Test creating a DSM class image."""
-    dsm = DSM(input_array=np.zeros((10, 10), dtype=np.float32), filename="dsm.tif", 
-              crs = None, transform = None, cutoff = 1.0, nodata = None)
+    dsm = DSM(input_array=np.zeros((10, 10), dtype=np.float32), filename="dsm.tif",
+              crs=None, transform=None, cutoff=1.0, nodata=None)
     assert isinstance(dsm, DSM)
+
+
+def test_dsm_cutoff_nan():
+    """Test the cutoff height ignores NaN values."""
+    heights = np.arange(100, dtype=np.float32).reshape(10, 10)
+    heights[0] = np.nan
+    for cutoff_method in ("exact", "histogram"):
+        dsm = DSM(input_array=heights.copy()[:, :, np.newaxis], filename="dsm.tif", crs=None, transform=None,
+                  cutoff=0.9, nodata=None, cutoff_method=cutoff_method)
+        # Heights from the 0.9 quantile of the valid heights (as np.nanquantile) up are no data
+        assert np.isnan(dsm.data_array[9, 1:]).all()
+        assert np.nanmax(dsm.data_array) == 90
+
+
+def test_to_uint8():
+    """Test converting 16-bit data to 8-bit."""
+    values = np.arange(65536, dtype=np.uint16).reshape(256, 256)
+    expected = ((values / 65535.0) * 255.0).astype(np.uint8)
+    assert np.array_equal(_to_uint8(values, chunk_size=1000), expected)
+
+
+def test_postprocess_mask():
+    """Test applying a mask band."""
+    img_data = np.full((4, 4, 2), 65535, dtype=np.uint16)
+    mask_layer = np.zeros((4, 4, 1), dtype=np.uint8)
+    mask_layer[:2] = 1
+    assert _postprocess(img_data.copy(), mask_layer).tolist() == np.where(mask_layer == 0, 0, 255).repeat(2, 2).tolist()
+    assert _postprocess(img_data.copy(), mask_layer, native_dtype=True).dtype == np.uint16
+
+
+def test_geo_thumb_cache():
+    """Test the thumbnail is cached until the data changes."""
+    geo = GEO(input_array=np.ones((40, 30, 3), dtype=np.uint8), filename="geo.tif",
+              wavelengths=[630, 540, 480], default_wavelengths=[480, 540, 630], crs=None,
+              transform=None, nodata=None)
+    assert geo._thumbs == {}
+    thumb = geo.thumb
+    assert geo.thumb is thumb
+    assert geo.thumbnail(max_size=10).shape == (10, 8, 3)
+    geo[0, 0, 0] = 5
+    assert geo._thumbs == {}
+    assert geo.thumb[0, 0, 2] == 5
+    # In-place ufuncs and writes through views change the data too
+    _ = geo.thumb
+    geo *= 2
+    assert geo._thumbs == {}
+    assert geo.thumb[0, 0, 2] == 10
+    np.clip(geo, 0, 4, out=geo)
+    assert geo.thumb[0, 0, 2] == 4
+    geo[0:5][:] = 0
+    assert geo.thumb[0, 0, 2] == 0
+
+
+def test_dsm_thumb():
+    """Test the stretched DSM thumbnail."""
+    dsm = DSM(input_array=np.array([[1, 2], [3, -9999]], dtype=np.float32)[:, :, np.newaxis], filename="dsm.tif",
+              crs=None, transform=None, cutoff=None, nodata=-9999)
+    assert dsm.thumb.tolist() == [[0, 127], [255, 0]]
+
+
+def test_geo_pickle():
+    """Test pickling GEO attributes."""
+    geo = GEO(input_array=np.zeros((10, 10, 3), dtype=np.uint8), filename="geo.tif", wavelengths=[630, 540, 480],
+              default_wavelengths=[480, 540, 630], crs=None, transform=Affine(1, 0, 5, 0, -1, 9), nodata=None)
+    restored = pickle.loads(pickle.dumps(geo))
+    assert restored.wavelengths == geo.wavelengths
+    assert restored.transform == geo.transform
+    assert np.array_equal(restored, geo)
+
+
+def test_geo_shared():
+    """Test pickling GEO images in shared memory as handles."""
+    geo = GEO(input_array=np.ones((200, 200, 3), dtype=np.uint8), filename="geo.tif", wavelengths=[630, 540, 480],
+              default_wavelengths=[480, 540, 630], crs=None, transform=Affine(1, 0, 5, 0, -1, 9), nodata=None)
+    shared = geo.to_shared()
+    view = shared[100:, 50:150:2]
+    pickled = pickle.dumps(view)
+    assert len(pickled) < 1000
+    restored = pickle.loads(pickled)
+    assert np.array_equal(restored, view)
+    assert restored.transform == view.transform
+    assert restored.wavelengths == geo.wavelengths
+    # The restored view is attached to the same memory
+    restored[0, 0, 0] = 7
+    assert shared[100, 50, 0] == 7
+    # Arrays outside of the shared block are pickled with their data
+    assert len(pickle.dumps(shared + 1)) > geo.nbytes
+
+
+def test_dsm_memmap(tmpdir):
+    """Test pickling DSM images of memory-mapped files as handles."""
+    dsm = DSM(input_array=np.arange(400, dtype=np.float32).reshape(20, 20, 1), filename="dsm.tif",
+              crs=None, transform=Affine(1, 0, 0, 0, -1, 20), cutoff=None, nodata=-9999)
+    mapped = dsm.to_memmap(str(tmpdir.join("dsm.npy")))
+    assert len(pickle.dumps(mapped)) < len(pickle.dumps(dsm))
+    restored = pickle.loads(pickle.dumps(mapped[::-1]))
+    assert np.array_equal(restored, dsm[::-1])
+    assert restored.nodata == -9999
+    assert restored.data_array.shape == (20, 20)
+    # Images made from memory-mapped arrays are shared too
+    loaded = DSM(input_array=np.load(str(tmpdir.join("dsm.npy")), mmap_mode="r"), filename="dsm.tif",
+                 crs=None, transform=dsm.transform, cutoff=None, nodata=None)
+    assert len(pickle.dumps(loaded)) < len(pickle.dumps(dsm))
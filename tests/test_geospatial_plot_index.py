@@ -0,0 +1,44 @@
+"""Tests for geospatial.PlotIndex"""
+
+import os
+import numpy as np
+from plantcv.plantcv import outputs
+from plantcv.geospatial import PlotIndex, read, transform_polygons
+from plantcv.geospatial.analyze import coverage
+
+
+def test_geospatial_plot_index(test_data):
+    """Test for plantcv-geospatial."""
+    img = read.geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    plots = PlotIndex(geojson=test_data.geojson_with_id, img=img)
+    assert plots.ids == ["888", "889"]
+    assert len(plots) == 2
+    # Overlapping plots keep their full footprint, outside of the label raster
+    assert np.diff(plots.offsets).tolist() == [3306, 3306]
+    assert not plots.labels.any()
+    # Footprints for the same pixel grid are reused
+    assert plots.zones(img).labels is plots.labels
+
+
+def test_geospatial_plot_index_cache(tmpdir, test_data):
+    """Test for plantcv-geospatial."""
+    cache_dir = str(tmpdir.mkdir("cache"))
+    img = read.geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    plots = PlotIndex(geojson=test_data.square_crop, img=img, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    cached = PlotIndex(geojson=test_data.square_crop, img=img, cache_dir=cache_dir)
+    assert np.array_equal(cached.labels, plots.labels)
+    assert np.array_equal(cached.pixels, plots.pixels)
+    assert transform_polygons(img=img, geojson=cached) == transform_polygons(img=img, geojson=test_data.square_crop)
+
+
+def test_geospatial_plot_index_analyze(test_data):
+    """Test for plantcv-geospatial."""
+    img = read.geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    bin_mask = img[:, :, 2]
+    outputs.clear()
+    _ = coverage(img=img, bin_mask=bin_mask, geojson=test_data.geojson_with_id, label="path")
+    _ = coverage(img=img, bin_mask=bin_mask, geojson=PlotIndex(geojson=test_data.geojson_with_id, img=img),
+                 label="index")
+    assert outputs.observations["index_888"]["pixel_count"]["value"] == \
+        outputs.observations["path_888"]["pixel_count"]["value"]
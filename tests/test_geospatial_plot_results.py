@@ -0,0 +1,54 @@
+"""Tests for geospatial.plot_results"""
+
+import numpy as np
+import pandas as pd
+from plantcv.plantcv import outputs
+from plantcv.geospatial import Plot_results, plot_results
+from plantcv.geospatial.analyze import coverage as analyze_coverage
+from plantcv.geospatial.read import geotif
+
+
+def test_geospatial_plot_results(tmpdir):
+    """Test for plantcv-geospatial."""
+    outputs.clear()
+    results = Plot_results(buffered=True)
+    results.add(samples=["a_1", "a_2"], variable="mean", trait="mean", method="test", scale="none",
+                datatype=float, value=np.array([1.5, np.nan]), label="none")
+    results.add(samples=["a_1", "a_2"], variable="std", trait="std", method="test", scale="none",
+                datatype=float, value=np.array([np.nan, np.nan]), label="none", empty=np.array([False, True]))
+    results.add(samples=["a_1", "a_2"], variable="freq", trait="frequencies", method="test", scale="frequency",
+                datatype=list, value=np.array([[1, 2], [3, 4]]), label=[0, 1, 2])
+    # Nothing reaches the PlantCV outputs until asked
+    assert outputs.observations == {}
+    csv_file = tmpdir.join("results.csv")
+    results.to_csv(str(csv_file))
+    df = pd.read_csv(str(csv_file), index_col="sample")
+    assert df.columns.tolist() == ["mean", "std", "freq_0", "freq_1"]
+    assert df.loc["a_2", "freq_1"] == 4
+    results.to_outputs()
+    assert outputs.observations["a_1"]["freq"]["value"] == [1, 2]
+    # NaN is saved as it is, only values of plots without valid pixels are None
+    assert np.isnan(outputs.observations["a_2"]["mean"]["value"])
+    assert np.isnan(outputs.observations["a_1"]["std"]["value"])
+    assert outputs.observations["a_2"]["std"]["value"] is None
+    results.clear()
+    assert results.to_dataframe().empty
+
+
+def test_geospatial_plot_results_buffered(test_data):
+    """Test for plantcv-geospatial."""
+    img = geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    bin_mask = img[:, :, 2]  # Make a grayscale img to use as the mask
+    outputs.clear()
+    analyze_coverage(img=img, bin_mask=bin_mask, geojson=test_data.geojson_with_id, label="test")
+    expected = outputs.observations
+    outputs.clear()
+    plot_results.buffered = True
+    try:
+        analyze_coverage(img=img, bin_mask=bin_mask, geojson=test_data.geojson_with_id, label="test")
+        assert outputs.observations == {}
+        plot_results.to_outputs()
+    finally:
+        plot_results.buffered = False
+        plot_results.clear()
+    assert outputs.observations == expected
@@ -0,0 +1,36 @@
+"""Tests for geospatial.profiler"""
+
+from plantcv.geospatial import Profiler, profiler
+from plantcv.geospatial.read import geotif
+
+
+def test_geospatial_profiler():
+    """Test for plantcv-geospatial."""
+    events = []
+    profiler.clear()
+    # Disabled by default, nothing is recorded
+    with profiler.stage("read"):
+        pass
+    assert profiler.records == []
+    with profiler.profile(callback=events.append):
+        with profiler.stage("read", "test"):
+            pass
+    assert not profiler.enabled
+    assert events == profiler.records
+    assert events[0]["stage"] == "read" and events[0]["function"] == "test"
+    assert profiler.summary().loc["read", "calls"] == 1
+    profiler.clear()
+
+
+def test_geospatial_profiler_stages(test_data):
+    """Test for plantcv-geospatial."""
+    stage_profiler = Profiler()
+    profiler.clear()
+    with profiler.profile():
+        img = geotif(filename=test_data.rgb_tif, bands="R,G,B", cropto=test_data.square_crop)
+        # The thumbnail is only made on first use
+        _ = img.thumb
+    stages = profiler.to_dataframe()["stage"].tolist()
+    profiler.clear()
+    assert stages[:3] == ["crop", "mask_detection", "thumbnail"]
+    assert stage_profiler.summary().empty
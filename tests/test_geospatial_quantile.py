@@ -0,0 +1,33 @@
+"""Tests for geospatial._quantile"""
+
+import numpy as np
+from plantcv.geospatial._quantile import _streaming_quantile, _array_quantile
+
+
+def test_geospatial_quantile_exact():
+    """Test for plantcv-geospatial."""
+    rng = np.random.default_rng(1)
+    data = rng.normal(300, 5, (50, 40)).astype(np.float32)
+    data[rng.random(data.shape) < 0.1] = -9999
+    data[0, :] = np.nan
+    blocks = np.array_split(data, 3)
+    for q in (0, 0.25, 0.5, 0.99, 1):
+        value = _streaming_quantile(lambda: iter(blocks), q)
+        assert value == np.nanquantile(data, q)
+        assert value.dtype == np.float32
+    # Bins around 0 hold -0.0 and 0.0
+    zeros = np.array([-0.0, 0.0, 1e-40, -1e-40, -3, 0.0, 2], dtype=np.float32)
+    for q in (i / 10 for i in range(11)):
+        assert _array_quantile(zeros, q, chunk_size=3) == np.quantile(zeros, q)
+    # Integer data interpolates in float64, as numpy
+    ints = rng.integers(0, 65535, 1000).astype(np.uint16)
+    assert _array_quantile(ints, 0.3) == np.quantile(ints, 0.3)
+
+
+def test_geospatial_quantile_histogram():
+    """Test for plantcv-geospatial."""
+    rng = np.random.default_rng(1)
+    data = rng.normal(300, 5, 10000).astype(np.float32)
+    value = _array_quantile(data, 0.99, exact=False, chunk_size=1000)
+    assert abs(value - np.quantile(data, 0.99)) <= np.quantile(data, 0.99) * 2 ** -11
+    assert np.isnan(_array_quantile(np.full(10, np.nan), 0.5))
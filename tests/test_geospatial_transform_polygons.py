@@ -1,7 +1,11 @@
 """Tests for geospatial.transform_polygons"""
 
 import dill as pickle
-from plantcv.geospatial import transform_polygons
+import numpy as np
+import geopandas
+from affine import Affine
+from shapely.geometry import MultiPolygon, Polygon, box
+from plantcv.geospatial import GEO, transform_polygons
 
 
 def test_geospatial_transform_polygons(test_data):
@@ -20,3 +24,24 @@ def test_geospatial_transform_single_polygons(test_data):
         img = pickle.load(f)
     coords = transform_polygons(img=img, geojson=test_data.multipolygon)
     assert coords[0] == [[1601, 350], [1931, 350], [1931, 652], [1601, 652]]
+
+
+def test_geospatial_transform_polygons_packed(tmpdir):
+    """Test for plantcv-geospatial."""
+    img = GEO(input_array=np.zeros((100, 100, 3), dtype=np.uint8), filename=None, wavelengths=[670, 560, 480],
+              default_wavelengths=[480, 560, 670], crs=None, transform=Affine(0.5, 0, 100, 0, -0.5, 200), nodata=None)
+    square = box(101, 190, 105, 195)
+    with_hole = Polygon(box(110, 180, 120, 190).exterior.coords, [box(112, 182, 114, 184).exterior.coords])
+    geojson = str(tmpdir.join("plots.geojson"))
+    geopandas.GeoDataFrame(geometry=[MultiPolygon([with_hole, square]), square]).to_file(geojson)
+    vertices, ring_offsets, part_offsets, geometry_offsets = transform_polygons(img=img, geojson=geojson, packed=True)
+    assert vertices.dtype == np.int32
+    assert geometry_offsets.tolist() == [0, 2, 3]
+    assert part_offsets.tolist() == [0, 2, 3, 4]
+    assert np.diff(ring_offsets).tolist() == [4, 4, 4, 4]
+    # The hole of the first part, closing vertex dropped
+    assert sorted(vertices[ring_offsets[1]:ring_offsets[2]].tolist()) == [[24, 32], [24, 36], [28, 32], [28, 36]]
+    # Coordinates are truncated toward zero as int()
+    assert transform_polygons(img=img, geojson=geojson)[1] == [[int(c), int(r)] for c, r in
+                                                               [~img.transform * xy for xy in square.exterior.coords[:-1]]]
+    assert transform_polygons(img=img, geojson=geojson)[0] == vertices[:4].tolist()
@@ -0,0 +1,143 @@
+"""Tests for geospatial._zonal"""
+
+import numpy as np
+from affine import Affine
+from rasterio import features
+from shapely.geometry import box
+from plantcv.geospatial._zonal import (_Zones, _zone_values, _zonal_stats, _zonal_percentiles, _to_values,
+                                       _ZonalAccumulator, _image_zonal_stats)
+
+
+def _footprint(zones, zone):
+    """Boolean raster of the pixels of a zone, from the label raster and the overlapping zone pixels."""
+    footprint = (zones.labels == zone + 1).reshape(-1)
+    footprint[zones.pixels[zones.offsets[zone]:zones.offsets[zone + 1]]] = True
+    return footprint.reshape(zones.shape)
+
+
+def test_geospatial_zonal_zones():
+    """Test for plantcv-geospatial."""
+    transform = Affine(1, 0, 0, 0, -1, 10)
+    # Two overlapping boxes, a box touching the second one, and a box outside of the raster
+    zones = _Zones([box(0, 6, 4, 10), box(2, 6, 6, 10), box(6, 6, 8, 10), box(20, 20, 30, 30)],
+                   transform=transform, shape=(10, 10)).rasterize()
+    assert zones.labels.dtype == np.uint8
+    assert [_footprint(zones, zone).sum() for zone in range(4)] == [16, 16, 8, 0]
+    # Only the overlapping boxes are left out of the label raster
+    assert np.diff(zones.offsets).tolist() == [16, 16, 0, 0]
+    assert zones.pixels[:4].tolist() == [0, 1, 2, 3]
+    assert (zones.labels == 3).sum() == 8
+
+
+def test_geospatial_zonal_zones_tiles():
+    """Test for plantcv-geospatial."""
+    transform = Affine(0.5, 0, 100, 0, -0.5, 200)
+    geoms = [box(101, 181, 109.2, 196.3), box(105.1, 177, 118, 195), box(112, 170, 119.7, 176.4), box(100, 199, 101, 200)]
+    zones = _Zones(geoms, transform=transform, shape=(45, 40), tile_size=8)
+    # Tiles without zones are skipped
+    assert len(zones.tile_windows()) < 6 * 5
+    tiles = {window: zones.tile(window) for window in zones.tile_windows()}
+    zones.rasterize()
+    for zone, geom in enumerate(geoms):
+        expected = features.geometry_mask([geom], out_shape=(45, 40), transform=transform, invert=True)
+        assert np.array_equal(_footprint(zones, zone), expected)
+    # Tiles of the label raster match tiles rasterized on the fly
+    for window, (labels, overlaps) in tiles.items():
+        cached_labels, cached_overlaps = zones.tile(window)
+        assert np.array_equal(cached_labels, labels)
+        assert [(zone, local.tolist()) for zone, local in cached_overlaps] == \
+            [(zone, local.tolist()) for zone, local in overlaps]
+
+
+def test_geospatial_zonal_stats():
+    """Test for plantcv-geospatial."""
+    rng = np.random.default_rng(1)
+    transform = Affine(0.5, 0, 100, 0, -0.5, 200)
+    data = rng.normal(10, 2, (40, 40)).astype(np.float32)
+    data[rng.random((40, 40)) < 0.1] = -999
+    data[0, :] = np.nan
+    geoms = [box(100, 190, 110, 200), box(105, 182, 118, 195)]
+    zones = _Zones(geoms, transform=transform, shape=data.shape, tile_size=16)
+    vals, labels = _zone_values(data, zones, nodata=-999)
+    stats = _zonal_stats(vals, labels, n_zones=2, stats=("count", "sum", "mean", "std", "min", "max", "histogram"),
+                         bins=5, histrange=(5, 15), percentiles=(25, 90))
+    for zone, geom in enumerate(geoms):
+        zone_data = data[features.geometry_mask([geom], out_shape=data.shape, transform=transform, invert=True)]
+        zone_data = zone_data[(zone_data != -999) & ~np.isnan(zone_data)]
+        assert stats["count"][zone] == zone_data.size
+        assert np.isclose(stats["mean"][zone], zone_data.mean())
+        assert np.isclose(stats["std"][zone], zone_data.std())
+        assert stats["min"][zone] == zone_data.min()
+        assert stats["max"][zone] == zone_data.max()
+        assert np.isclose(stats["percentile_90"][zone], np.percentile(zone_data, 90))
+        assert stats["histogram"][zone].tolist() == np.histogram(zone_data, 5, range=(5, 15))[0].tolist()
+
+
+def test_geospatial_zonal_stats_empty_zone():
+    """Test for plantcv-geospatial."""
+    stats = _zonal_stats(np.array([1.0, 3.0]), np.array([0, 0]), n_zones=2, stats=("mean", "median"))
+    assert _to_values(stats["mean"]) == [2.0, None]
+    assert _to_values(stats["median"]) == [2.0, None]
+
+
+def test_geospatial_zonal_accumulator():
+    """Test for plantcv-geospatial."""
+    rng = np.random.default_rng(2)
+    labels = rng.integers(0, 4, 500)
+    vals = rng.normal(3, 1, 500)
+    stats = ("count", "sum", "mean", "std", "min", "max", "median", "histogram")
+    expected = _zonal_stats(vals, labels, n_zones=5, stats=stats, bins=6, histrange=(0, 6), percentiles=(10,))
+    accumulator = _ZonalAccumulator(n_zones=5, stats=stats, bins=6, histrange=(0, 6), percentiles=(10,))
+    # Split the values into "tiles"
+    for part in np.array_split(np.arange(500), 7):
+        accumulator.update(vals[part], labels[part])
+    merged = accumulator.result()
+    for stat in ("count", "min", "max", "median", "percentile_10", "histogram", "bin_edges"):
+        assert np.array_equal(merged[stat], expected[stat], equal_nan=True)
+    for stat in ("sum", "mean", "std"):
+        assert np.allclose(merged[stat], expected[stat], equal_nan=True)
+
+
+def test_geospatial_zonal_accumulator_percentiles():
+    """Test for plantcv-geospatial."""
+    rng = np.random.default_rng(5)
+    labels = rng.integers(0, 9, 2000)
+    vals = rng.normal(0, 5, 2000).astype(np.float32)
+    accumulator = _ZonalAccumulator(n_zones=10, stats=("median",), percentiles=(5, 95))
+    for part in np.array_split(np.arange(2000), 3):
+        accumulator.update(vals[part], labels[part])
+    merged = accumulator.result()
+    for zone in range(9):
+        assert merged["median"][zone] == np.median(vals[labels == zone])
+        assert merged["percentile_95"][zone] == np.percentile(vals[labels == zone], 95)
+    assert np.isnan(merged["percentile_5"][9])
+
+
+def test_geospatial_zonal_percentiles():
+    """Test for plantcv-geospatial."""
+    rng = np.random.default_rng(3)
+    labels = np.sort(rng.integers(0, 6, 1000))
+    count = np.bincount(labels, minlength=8)
+    starts = np.concatenate(([0], np.cumsum(count)))
+    percentiles = (0, 2.5, 10, 33, 50, 66.6, 90, 100)
+    for vals in (rng.normal(0, 5, 1000).astype(np.float32), rng.normal(0, 5, 1000), rng.integers(0, 255, 1000)):
+        stats = _zonal_percentiles(vals, labels, count, percentiles)
+        for q in percentiles:
+            for zone in range(6):
+                assert stats[f"percentile_{q}"][zone] == np.percentile(vals[starts[zone]:starts[zone + 1]], q)
+            # Zones without values
+            assert np.isnan(stats[f"percentile_{q}"][6:]).all()
+
+
+def test_geospatial_zonal_parallel():
+    """Test for plantcv-geospatial."""
+    rng = np.random.default_rng(4)
+    transform = Affine(1, 0, 0, 0, -1, 60)
+    data = rng.normal(10, 2, (60, 60))
+    geoms = [box(x, y, x + 12, y + 12) for x in range(0, 60, 10) for y in range(0, 60, 10)]
+    zones = _Zones(geoms, transform=transform, shape=data.shape, tile_size=16)
+    kwargs = {"stats": ("mean", "std", "histogram"), "histrange": (0, 20), "percentiles": (25,)}
+    serial = _image_zonal_stats(data, zones, **kwargs)
+    parallel = _image_zonal_stats(data, zones, n_jobs=3, **kwargs)
+    for stat in serial:
+        assert np.array_equal(serial[stat], parallel[stat])
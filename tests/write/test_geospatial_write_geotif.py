@@ -0,0 +1,36 @@
+"""Tests for geospatial.write.geotif."""
+
+import pytest
+import numpy as np
+import rasterio
+from plantcv.geospatial import read, write
+from plantcv.geospatial.images import Image
+
+
+def test_geospatial_write_geotif(test_data, tmpdir):
+    """Test for plantcv-geospatial."""
+    img = read.geotif(filename=test_data.rgb_tif, bands="R,G,B")
+    filename = write.geotif(img=img, filename=str(tmpdir.join("cog.tif")), blocksize=128)
+    with rasterio.open(filename) as src:
+        assert src.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+        assert src.block_shapes[0] == (128, 128)
+        assert src.crs == img.crs
+        assert src.transform == img.transform
+        assert src.descriptions == tuple(str(wavelength) for wavelength in img.wavelengths)
+        assert np.array_equal(np.moveaxis(src.read(), 0, 2), img)
+
+
+def test_geospatial_write_geotif_to_cog(test_data, tmpdir):
+    """Test for plantcv-geospatial."""
+    dsm = read.geotif(filename=test_data.gray_tif, bands="gray", lazy=True)
+    filename = dsm.to_cog(str(tmpdir.join("cog.tif")), compress=None, overviews=False)
+    with rasterio.open(filename) as src:
+        assert src.overviews(1) == []
+        assert src.nodata == dsm.nodata
+        assert np.array_equal(src.read(1), dsm.load()[:, :, 0], equal_nan=True)
+
+
+def test_geospatial_write_geotif_bad_input(tmpdir):
+    """Test for plantcv-geospatial."""
+    with pytest.raises(RuntimeError):
+        write.geotif(img=Image(np.zeros((10, 10)), filename=None), filename=str(tmpdir.join("cog.tif")))